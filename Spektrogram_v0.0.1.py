@@ -1,14 +1,49 @@
 import tkinter as tk
-from tkinter import messagebox, ttk
+from tkinter import messagebox, simpledialog, ttk
 import sounddevice as sd
 import numpy as np
 import librosa
 import librosa.display
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from sklearn.metrics.pairwise import cosine_similarity
+from concurrent.futures import ThreadPoolExecutor
+import os
+import queue
 import threading
 import time
+from mfcc_store import MFCCStore, extract_mfcc, pooled_embedding
+from dtw import band_radius, dtw_distance, dtw_search, dtw_similarity, normalize_frames, DEFAULT_BAND_RATIO
+
+# Directory of the persistent MFCC feature store (voice library)
+LIBRARY_DIR = "voice_library"
+# Number of closest library clips shown by a search
+LIBRARY_TOP_K = 5
+# Similarity modes: pooled-embedding cosine, or DTW over time-aligned MFCC frames
+SIMILARITY_MODES = ("Cosine (pooled)", "DTW (aligned frames)")
+# Sakoe-Chiba band width as a fraction of the clip length
+DTW_BAND_RATIO = DEFAULT_BAND_RATIO
+# Thread pool size for batch DTW library searches
+DTW_WORKERS = 4
+# Length of each recording (s) and of the buffers the capture workers push while recording
+RECORD_SECONDS = 7
+CAPTURE_CHUNK_SECONDS = 0.5
+# Worker threads computing features, comparisons and library operations
+ANALYSIS_WORKERS = 2
+# Interval at which the Tk loop drains worker events (ms)
+POLL_INTERVAL_MS = 50
+# Samples per waveform in the overlay plot (min/max envelope of the recording)
+PLOT_POINTS = 4000
+
+
+def waveform_envelope(audio, sample_rate, points=PLOT_POINTS):
+    """Min/max envelope of a waveform for plotting: (time, values) with about `points` samples."""
+    step = max(1, len(audio) // (points // 2))
+    usable = len(audio) // step * step
+    blocks = audio[:usable].reshape(-1, step)
+    values = np.column_stack([blocks.min(axis=1), blocks.max(axis=1)]).ravel()
+    time_axis = np.repeat(np.arange(len(blocks)) * step, 2) / sample_rate
+    return time_axis, values
+
 
 class VoiceSimilarityApp:
     def __init__(self, root):
@@ -17,13 +52,52 @@ class VoiceSimilarityApp:
         self.root.geometry("1200x900")
         self.root.configure(bg='#e0f7fa')
 
-        # Variables to hold recorded audio data
-        self.recorded_audio_1 = None
-        self.recorded_audio_2 = None
+        # Latest recording per slot (1, 2) as (take, audio); every new recording gets a new take number,
+        # so analyses already running keep working on the audio they were started with
+        self.recordings = {}
+        self.takes = 0
         self.sample_rate = 44100
 
+        # MFCCs are computed once per take and shared by the analysis workers
+        self.mfcc_cache = {}
+        self.mfcc_lock = threading.Lock()
+
+        # Voice library, opened on first use; CMVN-normalized frames of its clips for DTW.
+        # MFCCStore is not thread-safe, library operations hold library_lock
+        self.library = None
+        self.library_frames = []
+        self.library_lock = threading.Lock()
+        # Clip count as last seen by a library job, kept on the Tk thread for the default clip name
+        self.library_count = 0
+
+        # Producer/consumer pipeline: capture threads and the analysis pool only put events on this
+        # queue; the Tk loop drains it in poll_events, so no widget is touched off the main thread
+        self.events = queue.Queue()
+        self.pool = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix="analysis")
+        self.capturing = {}         # slot -> seconds recorded so far
+        self.running_jobs = 0
+        self.comparisons = 0
+        self.plotted_comparison = 0
+        self.event_handlers = {
+            'capture_progress': self.on_capture_progress,
+            'captured': self.on_captured,
+            'capture_failed': self.on_capture_failed,
+            'job_done': self.on_job_done,
+            'library_count': self.on_library_count,
+        }
+        # Handlers of analysis job results, by job kind
+        self.result_handlers = {
+            'comparison': self.on_comparison,
+            'library_add': self.on_message,
+            'search': self.on_search,
+        }
+
         # GUI Elements
         self.create_widgets()
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+        self.root.after(POLL_INTERVAL_MS, self.poll_events)
+        if os.path.isdir(LIBRARY_DIR):
+            self.pool.submit(self.load_library)
 
     def create_widgets(self):
         # Title label
@@ -54,6 +128,19 @@ class VoiceSimilarityApp:
         self.analyze_button = ttk.Button(control_frame, text="Analyze Similarity", command=self.analyze_similarity)
         self.analyze_button.pack(pady=5, fill=tk.X)
 
+        # Similarity mode
+        tk.Label(control_frame, text="Similarity Mode", font=("Helvetica", 12), bg='#e0f7fa').pack(pady=5)
+        self.similarity_mode = tk.StringVar(value=SIMILARITY_MODES[0])
+        for mode in SIMILARITY_MODES:
+            tk.Radiobutton(control_frame, text=mode, variable=self.similarity_mode, value=mode,
+                           bg='#e0f7fa', font=("Helvetica", 10)).pack(anchor=tk.W)
+
+        # Voice library buttons
+        self.add_library_button = ttk.Button(control_frame, text="Add First Audio to Library", command=self.add_to_library)
+        self.add_library_button.pack(pady=5, fill=tk.X)
+        self.search_library_button = ttk.Button(control_frame, text="Search Library", command=self.search_library)
+        self.search_library_button.pack(pady=5, fill=tk.X)
+
         # Clear results button
         self.clear_button = ttk.Button(control_frame, text="Clear Results", command=self.clear_results)
         self.clear_button.pack(pady=5, fill=tk.X)
@@ -74,106 +161,290 @@ class VoiceSimilarityApp:
         self.steps_listbox.pack(pady=5, fill=tk.BOTH)
 
     def record_audio_1(self):
-        selected_device = self.device_listbox.curselection()
-        if not selected_device:
-            messagebox.showerror("Error", "Please select an audio input device.")
-            return
-        device_index = selected_device[0]
-        
-        def record():
-            self.progress_label.config(text="Recording first audio started...", fg="green")
-            self.root.update()
-            time.sleep(0.5)
-            self.recorded_audio_1 = sd.rec(int(7 * self.sample_rate), samplerate=self.sample_rate, channels=1, device=device_index)
-            sd.wait()  # Wait until the recording is finished
-            self.progress_label.config(text="First audio recording finished.", fg="blue")
-            self.steps_listbox.insert(tk.END, "First audio recorded.")
-            self.root.update()
-        
-        record_thread = threading.Thread(target=record)
-        record_thread.start()
-        
+        self.record_audio(1)
 
     def record_audio_2(self):
+        self.record_audio(2)
+
+    def record_audio(self, slot):
         selected_device = self.device_listbox.curselection()
         if not selected_device:
             messagebox.showerror("Error", "Please select an audio input device.")
             return
-        device_index = selected_device[0]
-        
-        def record():
-            self.progress_label.config(text="Recording second audio started...", fg="green")
-            self.root.update()
-            time.sleep(0.5)
-            self.recorded_audio_2 = sd.rec(int(7 * self.sample_rate), samplerate=self.sample_rate, channels=1, device=device_index)
-            sd.wait()  # Wait until the recording is finished
-            self.progress_label.config(text="Second audio recording finished.", fg="blue")
-            self.steps_listbox.insert(tk.END, "Second audio recorded.")
-            self.root.update()
-        
-        threading.Thread(target=record).start()
+        if slot in self.capturing:
+            return
+        self.capturing[slot] = 0.0
+        self.update_status()
+        threading.Thread(target=self.capture, args=(slot, selected_device[0]), daemon=True).start()
+
+    def capture(self, slot, device_index):
+        """Capture worker: reads the recording in chunks from its own input stream and pushes events."""
+        chunk = int(CAPTURE_CHUNK_SECONDS * self.sample_rate)
+        remaining = int(RECORD_SECONDS * self.sample_rate)
+        buffers = []
+        try:
+            with sd.InputStream(samplerate=self.sample_rate, channels=1, device=device_index, dtype='float32') as stream:
+                while remaining > 0:
+                    data, _ = stream.read(min(chunk, remaining))
+                    buffers.append(data.copy())
+                    remaining -= len(data)
+                    self.events.put(('capture_progress', (slot, sum(len(b) for b in buffers) / self.sample_rate)))
+        except Exception as error:
+            self.events.put(('capture_failed', (slot, error)))
+            return
+        self.events.put(('captured', (slot, np.concatenate(buffers))))
+
+    def get_mfcc(self, recording):
+        """MFCCs of a (take, audio) recording, extracted on first use and cached (called from workers)."""
+        take, audio = recording
+        with self.mfcc_lock:
+            mfcc = self.mfcc_cache.get(take)
+        if mfcc is None:
+            # Extracted outside the lock so concurrent analyses of different takes do not wait on each other
+            mfcc = extract_mfcc(audio, self.sample_rate)
+            with self.mfcc_lock:
+                # A take replaced while it was being analyzed is not cached again (on_captured dropped it)
+                if take in {current for current, _ in self.recordings.values()}:
+                    self.mfcc_cache[take] = mfcc
+        return mfcc
+
+    def submit(self, kind, job, *args):
+        """Runs job(*args) on the analysis pool; its result is delivered to the Tk loop as a (kind, result) event."""
+        def deliver(future):
+            # Runs on the worker thread: only hands the outcome over to the Tk loop
+            try:
+                self.events.put(('job_done', (kind, future.result(), None)))
+            except Exception as error:
+                self.events.put(('job_done', (kind, None, error)))
+
+        self.running_jobs += 1
+        self.update_status()
+        self.pool.submit(job, *args).add_done_callback(deliver)
+
+    def poll_events(self):
+        """Drains worker events on the Tk thread, then reschedules itself."""
+        self.root.after(POLL_INTERVAL_MS, self.poll_events)
+        while True:
+            try:
+                kind, payload = self.events.get_nowait()
+            except queue.Empty:
+                break
+            self.event_handlers[kind](payload)
+
+    def update_status(self):
+        parts = [f"recording {slot} ({seconds:.1f}/{RECORD_SECONDS} s)" for slot, seconds in sorted(self.capturing.items())]
+        if self.running_jobs:
+            parts.append(f"{self.running_jobs} analysis job(s) running")
+        if parts:
+            self.progress_label.config(text=", ".join(parts).capitalize() + "...", fg="orange")
+        else:
+            self.progress_label.config(text="Ready.", fg="blue")
+
+    def on_capture_progress(self, payload):
+        slot, seconds = payload
+        if slot in self.capturing:
+            self.capturing[slot] = seconds
+            self.update_status()
+
+    def on_captured(self, payload):
+        slot, audio = payload
+        self.capturing.pop(slot, None)
+        self.takes += 1
+        with self.mfcc_lock:
+            # The replaced take's MFCCs are no longer needed (analyses still using it recompute them).
+            # Swapped under the lock so get_mfcc never caches a take that is no longer current
+            if slot in self.recordings:
+                self.mfcc_cache.pop(self.recordings[slot][0], None)
+            self.recordings[slot] = (self.takes, audio)
+        self.steps_listbox.insert(tk.END, f"{'First' if slot == 1 else 'Second'} audio recorded.")
+        self.update_status()
+
+    def on_capture_failed(self, payload):
+        slot, error = payload
+        self.capturing.pop(slot, None)
+        self.update_status()
+        messagebox.showerror("Error", f"Recording {slot} failed: {error}")
+
+    def on_job_done(self, payload):
+        kind, result, error = payload
+        self.running_jobs -= 1
+        self.update_status()
+        if error is not None:
+            self.steps_listbox.insert(tk.END, f"Analysis failed: {error}")
+            messagebox.showerror("Error", f"Analysis failed: {error}")
+        else:
+            self.result_handlers[kind](result)
+
+    def on_message(self, message):
+        self.steps_listbox.insert(tk.END, message)
+
+    def get_library(self):
+        if self.library is None:
+            self.library = MFCCStore(LIBRARY_DIR)
+        return self.library
+
+    def load_library(self):
+        """Opens an existing library in the background so the default clip name knows its size."""
+        with self.library_lock:
+            self.events.put(('library_count', len(self.get_library())))
+
+    def on_library_count(self, count):
+        self.library_count = count
+
+    def use_dtw(self):
+        return self.similarity_mode.get() == SIMILARITY_MODES[1]
+
+    def get_library_frames(self):
+        """(index, frames) of library clips with stored MFCC frames, normalized once per clip."""
+        library = self.get_library()
+        for index in range(len(self.library_frames), len(library)):
+            try:
+                self.library_frames.append(normalize_frames(library.frames(index).T))
+            except KeyError:
+                self.library_frames.append(None)  # Embedding-only clip, cannot be aligned
+        return [(index, frames) for index, frames in enumerate(self.library_frames) if frames is not None]
+
+    def add_to_library(self):
+        if 1 not in self.recordings:
+            messagebox.showerror("Error", "Please record the first audio first.")
+            return
+        name = simpledialog.askstring("Add to Library", "Clip name:", initialvalue=f"clip_{self.library_count + 1}")
+        if not name:
+            return
+        self.submit('library_add', self.library_add, name, self.recordings[1])
+
+    def library_add(self, name, recording):
+        mfcc = self.get_mfcc(recording)
+        with self.library_lock:
+            library = self.get_library()
+            library.add([name], [mfcc])
+            self.events.put(('library_count', len(library)))
+            return f"Added '{name}' to library ({len(library)} clips)."
+
+    def search_library(self):
+        if 1 not in self.recordings:
+            messagebox.showerror("Error", "Please record the first audio first.")
+            return
+        self.submit('search', self.library_search, self.recordings[1], self.use_dtw())
+
+    def library_search(self, recording, use_dtw):
+        """Analysis job: ranks the library clips closest to a recording; returns the lines to show."""
+        mfcc = self.get_mfcc(recording)
+        with self.library_lock:
+            library = self.get_library()
+            self.events.put(('library_count', len(library)))
+            if len(library) == 0:
+                return ["The library is empty."]
+            start = time.perf_counter()
+            lines = []
+            if use_dtw:
+                results = self.search_library_dtw(mfcc, lines)
+            else:
+                results = [(name, score * 100) for _, name, score in library.query_mfcc(mfcc, k=LIBRARY_TOP_K)]
+            elapsed = (time.perf_counter() - start) * 1000
+            lines.insert(0, f"Searched {len(library)} clips in {elapsed:.1f} ms:")
+        lines.extend(f"  {rank}. {name}: {score:.2f}%" for rank, (name, score) in enumerate(results, start=1))
+        return lines
+
+    def search_library_dtw(self, mfcc, lines):
+        """Batch DTW search over the library; LB_Keogh and early abandoning skip most alignments."""
+        clips = self.get_library_frames()
+        if not clips:
+            return []
+        query = normalize_frames(mfcc.T)
+        result = dtw_search(query, [frames for _, frames in clips], band_ratio=DTW_BAND_RATIO,
+                            k=LIBRARY_TOP_K, workers=DTW_WORKERS)
+        lines.append(f"DTW: {result.pruned} pruned by lower bound, "
+                     f"{result.abandoned} abandoned early, {result.completed} aligned.")
+        library = self.get_library()
+        return [(library.names[clips[i][0]], dtw_similarity(distance, query.shape[1]))
+                for i, distance in zip(result.indices, result.distances)]
+
+    def on_search(self, lines):
+        for line in lines:
+            self.steps_listbox.insert(tk.END, line)
 
     def analyze_similarity(self):
-        if self.recorded_audio_1 is None or self.recorded_audio_2 is None:
+        if 1 not in self.recordings or 2 not in self.recordings:
             messagebox.showerror("Error", "Please record both audios first.")
             return
 
-        self.progress_label.config(text="Analyzing similarity...", fg="orange")
-        self.root.update()
-        self.steps_listbox.insert(tk.END, "Starting similarity analysis...")
-
-        # Convert recorded audios to 1D arrays (mono)
-        recorded_audio_1_mono = np.squeeze(self.recorded_audio_1)
-        recorded_audio_2_mono = np.squeeze(self.recorded_audio_2)
-        self.steps_listbox.insert(tk.END, "Converted recordings to mono.")
-
-        # Normalize the audio data to reduce volume-related differences
-        recorded_audio_1_mono = recorded_audio_1_mono = librosa.util.normalize(recorded_audio_1_mono) if np.any(recorded_audio_1_mono) else recorded_audio_1_mono
-        recorded_audio_2_mono = recorded_audio_2_mono = librosa.util.normalize(recorded_audio_2_mono) if np.any(recorded_audio_2_mono) else recorded_audio_2_mono
-        self.steps_listbox.insert(tk.END, "Normalized audio data.")
-
-        # Extract MFCC features
-        hop_length = 512
-        mfcc_recorded_1 = librosa.feature.mfcc(y=recorded_audio_1_mono, sr=self.sample_rate, n_mfcc=13, hop_length=hop_length, htk=True)
-        mfcc_recorded_2 = librosa.feature.mfcc(y=recorded_audio_2_mono, sr=self.sample_rate, n_mfcc=13, hop_length=hop_length, htk=True)
-        self.steps_listbox.insert(tk.END, "Extracted MFCC features from both recordings.")
-
-        # Flatten MFCC features for cosine similarity
-        mfcc_recorded_1_flat = mfcc_recorded_1.flatten().reshape(1, -1)
-        mfcc_recorded_2_flat = mfcc_recorded_2.flatten().reshape(1, -1)
-
-        # Calculate similarity using cosine similarity
-        similarity_score = cosine_similarity(mfcc_recorded_1_flat, mfcc_recorded_2_flat)[0][0] * 100
-        self.steps_listbox.insert(tk.END, f"Calculated similarity using cosine similarity: {similarity_score:.2f}%")
-        messagebox.showinfo("Similarity Result", f"Similarity: {similarity_score:.2f}%")
-
-        self.progress_label.config(text="Analysis complete.", fg="blue")
-        self.root.update()
-
-        # Plot MFCCs and similarity result
-        self.plot_mfcc_and_similarity(mfcc_recorded_1, mfcc_recorded_2, similarity_score, recorded_audio_1_mono, recorded_audio_2_mono)
-
-    def plot_mfcc_and_similarity(self, mfcc_recorded_1, mfcc_recorded_2, similarity_score, recorded_audio_1_mono, recorded_audio_2_mono):
+        # Each comparison runs on the analysis pool with the takes current at the click, so several
+        # comparisons (e.g. in both modes, or across re-recordings) can run at once
+        self.comparisons += 1
+        self.steps_listbox.insert(tk.END, f"Comparison #{self.comparisons}: starting similarity analysis...")
+        self.submit('comparison', self.compare, self.comparisons, self.recordings[1], self.recordings[2], self.use_dtw())
+
+    def compare(self, number, recording_1, recording_2, use_dtw):
+        """Analysis job: features, similarity and plot data for two recordings (no Tk calls)."""
+        steps = []
+
+        # Extract MFCC features (cached per take); librosa normalizes the mono recordings first
+        mfcc_recorded_1 = self.get_mfcc(recording_1)
+        mfcc_recorded_2 = self.get_mfcc(recording_2)
+        steps.append("Extracted MFCC features from both recordings.")
+
+        if use_dtw:
+            # Align the normalized MFCC frames with banded DTW, so timing shifts between the
+            # recordings do not count as differences
+            frames_1 = normalize_frames(mfcc_recorded_1.T)
+            frames_2 = normalize_frames(mfcc_recorded_2.T)
+            distance = dtw_distance(frames_1, frames_2, band_radius(len(frames_1), len(frames_2), DTW_BAND_RATIO))
+            similarity_score = dtw_similarity(distance, frames_1.shape[1])
+            steps.append(f"Calculated similarity using DTW (distance {distance:.3f}): {similarity_score:.2f}%")
+        else:
+            # Pool MFCC frames into fixed-length embeddings (per-coefficient mean/std), so clips of
+            # different lengths can be compared
+            embedding_1 = pooled_embedding(mfcc_recorded_1)
+            embedding_2 = pooled_embedding(mfcc_recorded_2)
+
+            # Calculate similarity using cosine similarity (embeddings are L2-normalized)
+            similarity_score = float(embedding_1 @ embedding_2) * 100
+            steps.append(f"Calculated similarity using cosine similarity: {similarity_score:.2f}%")
+
+        # Normalize the audio data to reduce volume-related differences, then reduce it to a plot envelope
+        waveforms = []
+        for _, audio in (recording_1, recording_2):
+            mono = np.squeeze(audio)
+            mono = librosa.util.normalize(mono) if np.any(mono) else mono
+            waveforms.append(waveform_envelope(mono, self.sample_rate))
+
+        return {'number': number, 'steps': steps, 'similarity_score': similarity_score,
+                'mfccs': (mfcc_recorded_1, mfcc_recorded_2), 'waveforms': waveforms}
+
+    def on_comparison(self, result):
+        number = result['number']
+        for step in result['steps']:
+            self.steps_listbox.insert(tk.END, f"Comparison #{number}: {step}")
+        # An older comparison finishing after a newer one does not replace the newer plot
+        if number > self.plotted_comparison:
+            self.plotted_comparison = number
+            self.plot_mfcc_and_similarity(*result['mfccs'], result['similarity_score'], result['waveforms'])
+        messagebox.showinfo("Similarity Result", f"Comparison #{number} similarity: {result['similarity_score']:.2f}%")
+
+    def plot_mfcc_and_similarity(self, mfcc_recorded_1, mfcc_recorded_2, similarity_score, waveforms):
         # Clear previous plots
         for widget in self.plot_frame.winfo_children():
-            widget.pack_forget()
+            widget.destroy()
 
-        fig, axs = plt.subplots(3, 1, figsize=(10, 12))
+        # A standalone Figure (not pyplot) is released with its canvas
+        fig = Figure(figsize=(10, 12))
+        axs = fig.subplots(3, 1)
 
         axs[0].set_title("First Audio MFCC", fontsize=14)
-        librosa.display.specshow(mfcc_recorded_1, sr=self.sample_rate, hop_length=512, x_axis='time', cmap='viridis')
+        librosa.display.specshow(mfcc_recorded_1, sr=self.sample_rate, hop_length=512, x_axis='time', cmap='viridis', ax=axs[0])
         axs[0].set_ylabel("MFCC Coefficients")
         axs[0].set_xlabel("Time [s]")
 
         axs[1].set_title("Second Audio MFCC", fontsize=14)
-        librosa.display.specshow(mfcc_recorded_2, sr=self.sample_rate, hop_length=512, x_axis='time', cmap='viridis')
+        librosa.display.specshow(mfcc_recorded_2, sr=self.sample_rate, hop_length=512, x_axis='time', cmap='viridis', ax=axs[1])
         axs[1].set_ylabel("MFCC Coefficients")
         axs[1].set_xlabel("Time [s]")
 
         axs[2].set_title("Similarity Score", fontsize=14)
-        time_axis = np.linspace(0, len(recorded_audio_1_mono) / self.sample_rate, len(recorded_audio_1_mono))
-        axs[2].plot(time_axis, recorded_audio_1_mono, label='First Audio', color='blue', alpha=0.6)
-        axs[2].plot(time_axis, recorded_audio_2_mono, label='Second Audio', color='green', alpha=0.6)
+        (time_1, wave_1), (time_2, wave_2) = waveforms
+        axs[2].plot(time_1, wave_1, label='First Audio', color='blue', alpha=0.6)
+        axs[2].plot(time_2, wave_2, label='Second Audio', color='green', alpha=0.6)
         axs[2].set_title('Similarity Analysis - Waveform Overlay', fontsize=14)
         axs[2].grid(True)
         axs[2].set_xlabel('Time [s]')
@@ -186,7 +457,7 @@ class VoiceSimilarityApp:
         
         axs[2].set_ylabel("Percentage (%)")
 
-        plt.tight_layout()
+        fig.tight_layout()
         canvas = FigureCanvasTkAgg(fig, master=self.plot_frame)
         canvas.draw()
         canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
@@ -200,6 +471,12 @@ class VoiceSimilarityApp:
             widget.destroy()
         # Clear steps listbox
         self.steps_listbox.delete(0, tk.END)
+        self.update_status()
+
+    def close(self):
+        # Queued analyses are dropped; the interpreter still waits for the running ones before exiting
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -1,34 +1,63 @@
 import sys
+import time
 import numpy as np
-import sounddevice as sd
-import matplotlib.pyplot as plt
-from scipy.signal import spectrogram  # fftpack kaldırıldı
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLabel, QListWidget, QListWidgetItem, QTextEdit,
-    QMessageBox, QInputDialog, QSizePolicy
+    QMessageBox, QInputDialog, QSizePolicy, QDoubleSpinBox
 )
 from PyQt5.QtCore import Qt, QTimer
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
+from audio_stream import AudioCapture, SyntheticInputStream
+from spectral import WaterfallSTFT, amplitude_spectrum, dominant_frequency
+
+# Kayan spektrogram: görüntülenen süre (s), STFT çerçeve uzunluğu ve kayması (örnek),
+# en yüksek frekans (Hz) ve renk ölçeği (dB)
+WATERFALL_SECONDS = 10.0
+WATERFALL_NPERSEG = 1024
+WATERFALL_STRIDE = WATERFALL_NPERSEG // 2
+WATERFALL_MAX_FREQ = 5000
+WATERFALL_DB_RANGE = (-120, -20)
+# Frekans spektrumu ve zaman serisi panellerinin en kısa yeniden çizim aralığı (s);
+# tam çizimleri spektrogram blit'inden çok yavaş olduğundan her hop'ta yapılmaz
+PANEL_REDRAW_INTERVAL = 0.5
 
 class SingleMicrophoneApp(QMainWindow):
-    def __init__(self):
+    def __init__(self, stream_factory=None):
+        """
+        stream_factory: Ses akışı sınıfı (None: sd.InputStream; test için audio_stream.SyntheticInputStream)
+        """
         super().__init__()
         self.setWindowTitle('Tek Mikrofonla Ses Kaydı ve Spektrogram')
         self.setGeometry(100, 100, 1600, 900)  # Başlangıç boyutunu artırdık
 
         # Ses kayıt parametreleri
         self.fs = 44100  # Örnekleme frekansı (Hz)
-        self.duration = 1.0  # Kayıt süresi (saniye)
+        self.duration = 1.0  # Analiz penceresi süresi (saniye)
+        self.hop = 0.25  # Ardışık pencereler arasındaki kayma (saniye); pencereler örtüşür
+        self.buffer_seconds = 10.0  # Halka tampon uzunluğu (saniye)
+
+        # Kesintisiz yakalama: sd.InputStream callback'i halka tampona yazar, arayüz pencereleri okur
+        self.stream_factory = stream_factory
+        self.capture = None
+        self.reader = None
+
+        # Kayan spektrogram: yalnızca yeni gelen örneklerin STFT çerçeveleri hesaplanır
+        self.waterfall = WaterfallSTFT(self.fs, nperseg=WATERFALL_NPERSEG, stride=WATERFALL_STRIDE,
+                                       columns=int(WATERFALL_SECONDS * self.fs / WATERFALL_STRIDE),
+                                       max_freq=WATERFALL_MAX_FREQ)
+        self.waterfall_next = None  # Kayan spektrograma beslenecek sıradaki örneğin mutlak indisi
+        self.spectrogram_background = None  # Blitting için eksen arka planı
+        self.last_panel_redraw = 0.0  # Spektrum / zaman serisi panellerinin son çizim zamanı (perf_counter)
 
         # Zaman serisi verileri
         self.time_data = []        # Saniye cinsinden zaman verisi
         self.dominant_freqs = []   # Dominant frekanslar
 
-        # Timer
+        # Timer: halka tamponu her hop süresinde yoklar (kayıt yapmaz, arayüzü bloklamaz)
         self.timer = QTimer()
-        self.timer.setInterval(int(self.duration * 1000))  # milisaniye cinsinden
+        self.timer.setInterval(int(self.hop * 1000))  # milisaniye cinsinden
         self.timer.timeout.connect(self.record_and_plot)
 
         # UI'yi oluştur
@@ -83,6 +112,27 @@ class SingleMicrophoneApp(QMainWindow):
         self.mic_count_label = QLabel("1")
         control_layout.addWidget(self.mic_count_label)
 
+        # Akış ayarları: analiz penceresi, hop süresi ve halka tampon uzunluğu
+        # (parabolik tepe kestirimi sayesinde 0.1 s gibi kısa pencereler de doğru frekans verir)
+        control_layout.addWidget(QLabel("Analiz Penceresi (s):"))
+        self.window_spin = QDoubleSpinBox()
+        self.window_spin.setRange(0.05, 2.0)
+        self.window_spin.setSingleStep(0.05)
+        self.window_spin.setValue(self.duration)
+        self.window_spin.valueChanged.connect(lambda value: self.hop_spin.setMaximum(value))
+        control_layout.addWidget(self.window_spin)
+        control_layout.addWidget(QLabel("Hop Süresi (s):"))
+        self.hop_spin = QDoubleSpinBox()
+        self.hop_spin.setRange(0.01, self.duration)
+        self.hop_spin.setSingleStep(0.05)
+        self.hop_spin.setValue(self.hop)
+        control_layout.addWidget(self.hop_spin)
+        control_layout.addWidget(QLabel("Tampon Uzunluğu (s):"))
+        self.buffer_spin = QDoubleSpinBox()
+        self.buffer_spin.setRange(2 * self.duration, 120.0)
+        self.buffer_spin.setValue(self.buffer_seconds)
+        control_layout.addWidget(self.buffer_spin)
+
         # "Kalibrasyon Yap" butonu (Opsiyonel)
         self.calibrate_button = QPushButton("Kalibrasyon Yap")
         self.calibrate_button.clicked.connect(self.calibrate)
@@ -133,11 +183,45 @@ class SingleMicrophoneApp(QMainWindow):
 
         self.canvas_time_series.draw()
 
+        # Spektrogram: tek bir imshow öğesi; veriler set_data ile güncellenir, eksen yalnızca blit edilir
+        self.ax_spectrogram.set_ylabel('Frekans [Hz]')
+        self.ax_spectrogram.set_xlabel('Zaman [s]')
+        self.ax_spectrogram.set_title('Spektrogram')
+        self.spectrogram_image = self.ax_spectrogram.imshow(
+            self.waterfall.image(), origin='lower', aspect='auto', cmap='viridis', animated=True,
+            extent=(-self.waterfall.duration, 0, 0, self.waterfall.freqs[-1]),
+            vmin=WATERFALL_DB_RANGE[0], vmax=WATERFALL_DB_RANGE[1], interpolation='nearest')
+        self.colorbar_spectrogram = self.figure_spectrogram.colorbar(
+            self.spectrogram_image, ax=self.ax_spectrogram, label='Güç [dB]')
+        self.canvas_spectrogram.mpl_connect('draw_event', self.on_spectrogram_draw)
+        self.canvas_spectrogram.draw()
+
+    def on_spectrogram_draw(self, event):
+        """Tam çizimden sonra (ilk çizim, yeniden boyutlandırma) blitting arka planını yeniler."""
+        self.spectrogram_background = self.canvas_spectrogram.copy_from_bbox(self.ax_spectrogram.bbox)
+        self.ax_spectrogram.draw_artist(self.spectrogram_image)
+
+    def update_waterfall(self):
+        """Spektrogram görüntüsünü yerinde günceller ve yalnızca eksen alanını yeniden çizer."""
+        self.spectrogram_image.set_data(self.waterfall.image())
+        if self.spectrogram_background is None:
+            self.canvas_spectrogram.draw()
+            return
+        self.canvas_spectrogram.restore_region(self.spectrogram_background)
+        self.ax_spectrogram.draw_artist(self.spectrogram_image)
+        self.canvas_spectrogram.blit(self.ax_spectrogram.bbox)
+
     def list_audio_devices(self):
         """
         Mevcut ses giriş aygıtlarını listeleyip kontrol paneline ekler.
         """
         self.device_list_widget.clear()
+        if self.stream_factory is SyntheticInputStream:
+            item = QListWidgetItem("0: Sentetik Sinyal (440 Hz sinüs) - Max Input Channels: 1")
+            item.setData(Qt.UserRole, 0)
+            self.device_list_widget.addItem(item)
+            return
+        import sounddevice as sd  # Yalnızca gerçek aygıtla gerekli (--synthetic sounddevice olmadan çalışır)
         devices = sd.query_devices()
         input_devices = [dev for dev in devices if dev['max_input_channels'] > 0]
         for idx, dev in enumerate(input_devices):
@@ -163,6 +247,7 @@ class SingleMicrophoneApp(QMainWindow):
                 self.show_error_message("Lütfen bir ses giriş aygıtı seçin.")
                 return
 
+            import sounddevice as sd
             audio = sd.rec(int(self.duration * self.fs), samplerate=self.fs, channels=1, device=device_index)
             sd.wait()
 
@@ -177,38 +262,91 @@ class SingleMicrophoneApp(QMainWindow):
         """
         Ses kaydını başlatır.
         """
-        if self.get_selected_device() is None:
+        device_index = self.get_selected_device()
+        if device_index is None:
             self.show_error_message("Lütfen bir ses giriş aygıtı seçin.")
             return
 
+        self.duration = self.window_spin.value()
+        self.hop = self.hop_spin.value()
+        self.buffer_seconds = self.buffer_spin.value()
+        try:
+            self.capture = AudioCapture(self.fs, channels=1, buffer_seconds=self.buffer_seconds,
+                                        device=device_index, stream_factory=self.stream_factory)
+            self.reader = self.capture.reader(window_seconds=self.duration, hop_seconds=self.hop)
+            self.waterfall_next = self.reader.next_start
+            self.capture.start()
+        except Exception as e:
+            self.capture = None
+            self.show_error_message(f"Ses akışı başlatılamadı: {e}")
+            return
+
+        self.timer.setInterval(int(self.hop * 1000))
         self.timer.start()
         self.start_button.setEnabled(False)
         self.stop_button.setEnabled(True)
-        self.log_text_edit.append("Ses kaydı başlatıldı.")
+        self.log_text_edit.append(f"Ses kaydı başlatıldı (pencere {self.duration:.2f} s, hop {self.hop:.2f} s, "
+                                  f"tampon {self.buffer_seconds:.0f} s).")
 
     def stop_recording(self):
         """
         Ses kaydını durdurur.
         """
         self.timer.stop()
+        if self.capture is not None:
+            self.capture.stop()
+            self.log_text_edit.append(f"Atlanan pencere: {self.reader.dropped}, "
+                                      f"aygıt taşma bildirimi: {self.capture.status_errors}")
+            self.capture = None
         self.start_button.setEnabled(True)
         self.stop_button.setEnabled(False)
         self.log_text_edit.append("Ses kaydı durduruldu.")
 
+    def closeEvent(self, event):
+        """Pencere kapanırken ses akışını durdurur."""
+        self.timer.stop()
+        if self.capture is not None:
+            self.capture.stop()
+        super().closeEvent(event)
+
     def record_and_plot(self):
         """
-        Ses kaydı yapar, spektrogramı, frekans spektrumunu ve zaman serisi grafiğini günceller.
+        Halka tampondaki yeni örtüşen pencereleri okur; her pencerenin dominant frekansını
+        zaman serisine ekler, spektrogram ve frekans spektrumunu en yeni pencereyle günceller.
         """
-        try:
-            device_index = self.get_selected_device()
-            if device_index is None:
-                self.show_error_message("Lütfen bir ses giriş aygıtı seçin.")
-                return
-
-            # Ses kaydı
-            audio = sd.rec(int(self.duration * self.fs), samplerate=self.fs, channels=1, device=device_index)
-            sd.wait()
+        if self.reader is None:
+            return
+        windows = self.reader.pop()
+        if not windows:
+            return
+        # Kayan spektrograma yalnızca daha önce beslenmemiş örnekler verilir
+        for start, window in windows:
+            if start > self.waterfall_next:
+                self.waterfall.reset()  # Atlanan pencere: süreklilik bozuldu
+                self.waterfall_next = start
+            self.waterfall.push(window[self.waterfall_next - start:, 0])
+            self.waterfall_next = start + len(window)
+        self.update_waterfall()
+
+        # Her pencere zaman serisine katkı verir; paneller en yeni pencereyle, en fazla
+        # PANEL_REDRAW_INTERVAL aralıkla yeniden çizilir
+        now = time.perf_counter()
+        redraw = now - self.last_panel_redraw >= PANEL_REDRAW_INTERVAL
+        for start, window in (windows[:-1] if redraw else windows):
+            self.dominant_freqs.append(dominant_frequency(window[:, 0], self.fs))
+            self.time_data.append((start + self.reader.window_size) / self.fs)
+        if redraw:
+            self.last_panel_redraw = now
+            self.log_text_edit.append("Spektrogram güncellendi.")
+            start, audio = windows[-1]
+            self.plot_window(audio, start)
 
+    def plot_window(self, audio, start):
+        """
+        Bir ses penceresinin frekans spektrumunu ve zaman serisi grafiğini günceller.
+        start: Pencerenin akış başından itibaren ilk örnek indisi
+        """
+        try:
             # Ses seviyesini hesaplama (RMS)
             rms = np.sqrt(np.mean(audio**2))
             self.log_text_edit.append(f"Ortalama Ses Seviyesi (RMS): {rms:.6f}")
@@ -216,41 +354,12 @@ class SingleMicrophoneApp(QMainWindow):
             # Filtre uygulanmadan doğrudan sinyal kullanılıyor
             signal = audio[:, 0]
 
-            # Spektrogramı hesapla ve çiz
-            f, t, Sxx = spectrogram(signal, fs=self.fs)
-
-            # Spektrogram çizimi
-            self.ax_spectrogram.clear()
-            self.ax_spectrogram.pcolormesh(t, f, 10 * np.log10(Sxx + 1e-10), shading='gouraud', cmap='viridis')
-            self.ax_spectrogram.set_ylabel('Frekans [Hz]')
-            self.ax_spectrogram.set_xlabel('Zaman [s]')
-            self.ax_spectrogram.set_title('Spektrogram')
-            self.ax_spectrogram.set_ylim([0, 5000])  # İstenilen frekans aralığını ayarlayın
-
-            # Mevcut colorbar'ı temizle
-            if hasattr(self, 'colorbar_spectrogram'):
-                self.colorbar_spectrogram.remove()
-
-            # Yeni colorbar ekle
-            cmap_spectrogram = plt.get_cmap('viridis')
-            mappable_spectrogram = plt.cm.ScalarMappable(cmap=cmap_spectrogram)
-            mappable_spectrogram.set_array(Sxx)
-            self.colorbar_spectrogram = self.figure_spectrogram.colorbar(mappable_spectrogram, ax=self.ax_spectrogram, label='Güç [dB]')
-            self.canvas_spectrogram.draw()
-            self.log_text_edit.append("Spektrogram güncellendi.")
-
-            # FFT Hesaplaması ve Frekans Spektrumu Çizimi
-            fft_vals = np.fft.fft(signal)
-            fft_freq = np.fft.fftfreq(len(fft_vals), 1/self.fs)
+            # Gerçek girişli FFT (rfft, önbellekli Hann penceresi) ve Frekans Spektrumu Çizimi
+            fft_freq, fft_magnitude = amplitude_spectrum(signal, self.fs)
 
-            # Yalnızca pozitif frekansları al
-            pos_mask = fft_freq >= 0
-            fft_freq = fft_freq[pos_mask]
-            fft_magnitude = np.abs(fft_vals[pos_mask]) * 2 / len(fft_vals)  # Normalizasyon
-
-            # Dominant Frekansı Bulma
-            dominant_freq = fft_freq[np.argmax(fft_magnitude)]
-            self.time_data.append(len(self.time_data) + 1)  # Zaman verisi (saniye)
+            # Dominant Frekansı Bulma (parabolik tepe kestirimiyle bin çözünürlüğünün altında)
+            dominant_freq = dominant_frequency(signal, self.fs)
+            self.time_data.append((start + len(signal)) / self.fs)  # Pencere sonunun zamanı (saniye)
             self.dominant_freqs.append(dominant_freq)
 
             # Zaman Serisi Grafiği Güncelleme
@@ -286,13 +395,9 @@ class SingleMicrophoneApp(QMainWindow):
         """
         Spektrogramı, frekans spektrumunu ve zaman serisi grafiğini temizler.
         """
-        # Spektrogramı temizle
-        self.ax_spectrogram.clear()
-        self.ax_spectrogram.set_title('Spektrogram')
-        self.ax_spectrogram.set_xlabel('Zaman [s]')
-        self.ax_spectrogram.set_ylabel('Frekans [Hz]')
-        self.ax_spectrogram.grid(True)
-        self.canvas_spectrogram.draw()
+        # Spektrogramı temizle (kayan spektrogram sıfırlanır, görüntü öğesi korunur)
+        self.waterfall.reset()
+        self.update_waterfall()
 
         # Frekans spektrumunu temizle
         self.ax_spectrum.clear()
@@ -342,7 +447,8 @@ class SingleMicrophoneApp(QMainWindow):
 
 def main():
     app = QApplication(sys.argv)
-    window = SingleMicrophoneApp()
+    # --synthetic: ses aygıtı yerine sentetik sinyal akışı (test için)
+    window = SingleMicrophoneApp(stream_factory=SyntheticInputStream if '--synthetic' in sys.argv else None)
     window.show()
     sys.exit(app.exec_())
 
@@ -0,0 +1,198 @@
+"""
+Önceden hesaplanmış yayılım kaybı tabloları ve vektörize doğrusal ara değerleme.
+
+İleri model her hedef fonksiyonu çağrısında her mikrofon-kaynak çifti için kaybı
+hesaplar. Küresel yayılmada bu tek bir log10'dur, ancak frekansa bağlı modellerde
+(propagation.BroadbandPropagation: bant başına üstel + log) maliyet bant sayısıyla
+artar. AttenuationTable kaybı eşit aralıklı bir mesafe ızgarasında bir kez
+hesaplar; sorgular yalnızca indis hesabı, iki okuma ve bir çarpma-toplamadır.
+
+    1B tablo: kayıp(r)                  -> forward_model'e propagation olarak verilir (loss / slope)
+    2B tablo: kayıp(r, bant), (n, F)    -> loss (..., F) döndürür; band(i) tek bantlı 1B görünüm verir
+
+Çözünürlük doğrudan (step) veya bir hata sınırıyla (tolerance, dB) verilir. Hata
+sınırında adım, segment orta noktalarında ölçülen en büyük ara değerleme hatası
+sınırın altına inene kadar küçültülür (doğrusal ara değerleme hatası ~ adım^2).
+slope(r), ara değerlenen parçalı doğrusal eğrinin segment eğimidir; böylece
+çözücünün gördüğü gradyan tablodaki kayıpla tutarlıdır. Tablo aralığı dışındaki
+mesafeler (ör. kaynak bir mikrofona min_distance'tan yakın) tam modelle hesaplanır.
+"""
+import numpy as np
+
+# Varsayılan tablo aralığı (m): sahne sınırlarının köşegeni (~60 m) ve pay
+DEFAULT_MIN_DISTANCE = 0.05
+DEFAULT_MAX_DISTANCE = 100.0
+# Varsayılan ara değerleme hata sınırı (dB)
+DEFAULT_TOLERANCE = 0.01
+# Hata sınırını sağlamak için izin verilen en fazla tablo noktası
+MAX_TABLE_POINTS = 2_000_000
+INITIAL_TABLE_POINTS = 257
+
+
+class AttenuationTable:
+    """
+    Eşit aralıklı mesafe ızgarasında önceden hesaplanmış kayıp tablosu.
+    loss: Tam kayıp fonksiyonu; (n,) mesafe -> (n,) veya (n, F) kayıp (dB)
+    slope: İsteğe bağlı tam türev fonksiyonu (yalnızca tablo aralığı dışında kullanılır; 1B)
+    step: Izgara aralığı (m); verilmezse tolerance'a göre seçilir
+    tolerance: Segment orta noktalarında izin verilen en büyük ara değerleme hatası (dB)
+    """
+
+    def __init__(self, loss, slope=None, min_distance=DEFAULT_MIN_DISTANCE, max_distance=DEFAULT_MAX_DISTANCE,
+                 step=None, tolerance=DEFAULT_TOLERANCE):
+        if not 0 < min_distance < max_distance:
+            raise ValueError("Tablo aralığı 0 < min_distance < max_distance olmalı")
+        self.exact_loss = loss
+        self.exact_slope = slope
+        self.min_distance = float(min_distance)
+        self.max_distance = float(max_distance)
+        span = self.max_distance - self.min_distance
+
+        if step is not None:
+            self._build(max(2, int(np.ceil(span / step)) + 1))
+        else:
+            points = INITIAL_TABLE_POINTS
+            while True:
+                self._build(points)
+                if self.max_error <= tolerance:
+                    break
+                if points >= MAX_TABLE_POINTS:
+                    raise ValueError(f"{tolerance} dB hata sınırı {MAX_TABLE_POINTS} noktayla sağlanamadı "
+                                     f"(ulaşılan {self.max_error:.2g} dB)")
+                # Hata ~ adım^2: gereken adıma tek seferde yaklaş, küçük payla
+                scale = min(np.sqrt(self.max_error / tolerance) * 1.05, 16.0)
+                points = min(int(np.ceil((points - 1) * max(scale, 1.1))) + 1, MAX_TABLE_POINTS)
+
+    def _build(self, points):
+        distances = np.linspace(self.min_distance, self.max_distance, points)
+        self.step = distances[1] - distances[0]
+        self.inverse_step = 1.0 / self.step
+        self.segments = points - 1
+        self.values = np.asarray(self.exact_loss(distances), dtype=float)
+        self.deltas = np.diff(self.values, axis=0)
+        self.slopes = self.deltas * self.inverse_step
+        # Ara değerleme hatası segment orta noktalarında ölçülür
+        midpoints = distances[:-1] + 0.5 * self.step
+        interpolated = self.values[:-1] + 0.5 * self.deltas
+        self.max_error = float(np.abs(np.asarray(self.exact_loss(midpoints)) - interpolated).max())
+
+    @classmethod
+    def from_model(cls, model, **kwargs):
+        """loss / slope arayüzlü bir yayılım modelinden (ör. BroadbandPropagation) 1B tablo."""
+        return cls(model.loss, model.slope, **kwargs)
+
+    @classmethod
+    def from_bands(cls, model, **kwargs):
+        """Bant başına kayıp (band_loss) sağlayan bir modelden 2B (mesafe × bant) tablo."""
+        return cls(model.band_loss, **kwargs)
+
+    @property
+    def bands(self):
+        """Bant sayısı (1B tabloda None)."""
+        return None if self.values.ndim == 1 else self.values.shape[1]
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + self.deltas.nbytes + self.slopes.nbytes
+
+    def _locate(self, distances):
+        """
+        Segment indisi, segment içi kesir ve aralık dışı maskesi (aralık içindeyse None).
+        Aralık dışı mesafelerin indisi kenar segmente kırpılır; değerleri çağıran tam modelle değiştirir.
+        """
+        position = (distances - self.min_distance) * self.inverse_step
+        index = position.astype(np.intp)
+        outside = None
+        # Küçük dizilerde maske kurmaktan ucuz: önce yalnızca uç değerlere bakılır
+        if distances.min() < self.min_distance or distances.max() > self.max_distance:
+            outside = (distances < self.min_distance) | (distances > self.max_distance)
+            np.clip(index, 0, self.segments - 1, out=index)
+        else:
+            np.minimum(index, self.segments - 1, out=index)
+        return index, position - index, outside
+
+    def loss(self, distances):
+        """Ara değerlenmiş kayıp (dB); 2B tabloda (..., F)."""
+        distances = np.asarray(distances, dtype=float)
+        index, fraction, outside = self._locate(distances)
+        if self.values.ndim > 1:
+            fraction = fraction[..., None]
+        result = self.values[index] + fraction * self.deltas[index]
+        if outside is not None:
+            result[outside] = self.exact_loss(distances[outside])
+        return result
+
+    def slope(self, distances):
+        """Parçalı doğrusal kaybın eğimi (dB/m); tablo dışında tam türev (verilmişse)."""
+        return self.loss_and_slope(distances)[1]
+
+    def loss_and_slope(self, distances):
+        """Kayıp ve eğim tek indis hesabıyla (forward_model Jacobian'ı için)."""
+        distances = np.asarray(distances, dtype=float)
+        index, fraction, outside = self._locate(distances)
+        if self.values.ndim > 1:
+            fraction = fraction[..., None]
+        result = self.values[index] + fraction * self.deltas[index]
+        slope = self.slopes[index]
+        if outside is not None:
+            result[outside] = self.exact_loss(distances[outside])
+            if self.exact_slope is not None:
+                slope[outside] = self.exact_slope(distances[outside])
+        return result, slope
+
+    def band(self, index):
+        """2B tablonun tek bandı için 1B tablo görünümü (dizi kopyalanmaz)."""
+        if self.values.ndim == 1:
+            raise ValueError("1B tablonun bantları yok")
+        view = object.__new__(AttenuationTable)
+        view.__dict__.update(self.__dict__)
+        exact = self.exact_loss
+        view.exact_loss = lambda distances: exact(distances)[..., index]
+        view.exact_slope = None
+        view.values = self.values[:, index]
+        view.deltas = self.deltas[:, index]
+        view.slopes = self.slopes[:, index]
+        return view
+
+    def __repr__(self):
+        shape = f"{self.segments + 1}" + ("" if self.bands is None else f" × {self.bands}")
+        return (f"AttenuationTable({shape} nokta, {self.min_distance:g}-{self.max_distance:g} m, "
+                f"adım {self.step * 1000:.2f} mm, en büyük hata {self.max_error:.2g} dB)")
+
+
+if __name__ == '__main__':
+    from scipy.optimize import check_grad
+
+    from forward_model import predict_db, squared_error, squared_error_and_gradient
+    from propagation import OCTAVE_BANDS, BroadbandPropagation
+
+    rng = np.random.default_rng(0)
+    model = BroadbandPropagation(temperature=15, humidity=30)
+    r = np.concatenate([rng.uniform(DEFAULT_MIN_DISTANCE, DEFAULT_MAX_DISTANCE, 100000), [0.01, 0.05, 100.0, 150.0]])
+    for tolerance in (0.1, 0.01, 0.001):
+        table = AttenuationTable.from_model(model, tolerance=tolerance)
+        assert table.max_error <= tolerance
+        assert np.abs(table.loss(r) - model.loss(r)).max() <= tolerance * 1.01
+    # Aralık dışı: tam model
+    assert np.allclose(table.loss([0.01, 150.0]), model.loss(np.array([0.01, 150.0])))
+
+    # 2B tablo ve bant görünümü
+    bands = AttenuationTable.from_bands(model, tolerance=0.01)
+    assert bands.loss(r).shape == (len(r), len(OCTAVE_BANDS))
+    assert np.abs(bands.loss(r) - model.band_loss(r)).max() <= 0.0101
+    assert np.allclose(bands.band(7).loss(r), bands.loss(r)[:, 7])
+
+    # İleri model: tablo ile tahmin tam modele tolerans içinde yakın, gradyan tabloyla tutarlı
+    table = AttenuationTable.from_model(model, tolerance=0.01)
+    mics = rng.uniform([-15, -15, -10], [25, 25, 10], size=(18, 3))
+    params = np.column_stack([rng.uniform([-15, -15, -10], [25, 25, 10], size=(3, 3)), rng.uniform(60, 90, 3)])
+    assert np.abs(predict_db(mics, params, None, table) - predict_db(mics, params, None, model)).max() <= 0.0101
+    measured = predict_db(mics, params, None, model) + rng.normal(0, 0.5, len(mics))
+    for _ in range(5):
+        trial = params + rng.normal(0, 2.0, size=params.shape)
+        error = check_grad(lambda p: squared_error(p, mics, measured, None, table),
+                           lambda p: squared_error_and_gradient(p, mics, measured, None, table)[1],
+                           trial.ravel(), epsilon=1e-7)
+        norm = np.linalg.norm(squared_error_and_gradient(trial, mics, measured, None, table)[1])
+        assert error <= 1e-3 * max(norm, 1.0), (error, norm)
+    print(f"Kayıp tablosu kontrolü: OK ({table})")
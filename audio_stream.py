@@ -0,0 +1,268 @@
+"""
+Kesintisiz ses yakalama: sd.InputStream callback'i -> halka tampon -> örtüşen pencereler.
+
+Ses aygıtı callback'i her blokta önceden ayrılmış bir NumPy halka tamponuna
+yazar; arayüz (ör. QTimer) tampondan hop_size aralıklarla window_size
+uzunluğunda örtüşen pencereler okur. Yazar ve okuyucu arasında kilit yoktur:
+
+- Tek yazar (ses callback'i) önce örnekleri kopyalar, sonra toplam yazılan
+  örnek sayacını günceller; okuyucu yalnızca sayaçtan küçük indisleri okur.
+- Okuyucu geride kalır ve okumadığı örneklerin üzerine yazılırsa pencere
+  atlanır ve 'dropped' sayacı artar; böylece kayıp sessizce veri bozmaz.
+
+Örnek indisleri mutlaktır (akış başından beri), ardışık pencereler arasında
+boşluk yoktur. SyntheticInputStream, gerçek aygıt olmadan test için
+sd.InputStream ile aynı arayüzü sağlar.
+"""
+import threading
+import time
+
+import numpy as np
+
+# Varsayılan pencere / hop süreleri (s) ve tampon uzunluğu (s)
+DEFAULT_WINDOW_SECONDS = 1.0
+DEFAULT_HOP_SECONDS = 0.25
+DEFAULT_BUFFER_SECONDS = 10.0
+DEFAULT_BLOCKSIZE = 1024
+
+
+class RingBuffer:
+    """
+    Tek yazarlı / tek okuyuculu, önceden ayrılmış halka tampon.
+    capacity: Örnek sayısı; channels: Kanal sayısı
+    """
+
+    def __init__(self, capacity, channels=1, dtype=np.float32):
+        self.capacity = int(capacity)
+        self.data = np.zeros((self.capacity, channels), dtype=dtype)
+        self.written = 0   # Akış başından beri yazılan toplam örnek (yalnızca yazar günceller)
+        self.reserved = 0  # Yazarın yazmakta olduğu aralığın sonu; okuyucu kopyanın geçerliliğini buna göre denetler
+
+    def write(self, block):
+        """(n, channels) bloğu tampona yazar; tampondan uzun bloklarda yalnızca son capacity örnek tutulur."""
+        block = np.asarray(block).reshape(len(block), -1)
+        n = len(block)
+        if n > self.capacity:
+            block = block[-self.capacity:]
+        self.reserved = self.written + n  # Üzerine yazılacak aralık kopyalamadan önce duyurulur
+        start = (self.written + n - len(block)) % self.capacity
+        first = min(len(block), self.capacity - start)
+        self.data[start:start + first] = block[:first]
+        self.data[:len(block) - first] = block[first:]
+        self.written += n  # Örnekler yerleştikten sonra yayımlanır
+
+    def oldest(self):
+        """Tamponda hâlâ bulunan en eski örneğin mutlak indisi."""
+        return max(0, self.written - self.capacity)
+
+    def read(self, start, count, out=None):
+        """
+        [start, start + count) mutlak aralığının kopyasını döndürür.
+        out: İsteğe bağlı önceden ayrılmış (count, channels) dizi; kopya iki dilim atamasıyla buraya yazılır
+        Aralık henüz yazılmamışsa veya üzerine yazılmışsa None döner.
+        """
+        written = self.written
+        if start < max(0, written - self.capacity) or start + count > written:
+            return None
+        if out is None:
+            out = np.empty((count, self.data.shape[1]), dtype=self.data.dtype)
+        begin = start % self.capacity
+        first = min(count, self.capacity - begin)
+        out[:first] = self.data[begin:begin + first]
+        out[first:] = self.data[:count - first]
+        # Kopyalama sırasında yazar aralığın üzerine geçtiyse (veya geçmekteyse) veri tutarsızdır
+        if start < self.reserved - self.capacity:
+            return None
+        return out
+
+
+class HopReader:
+    """
+    Halka tampondan hop_size aralıklarla window_size uzunluğunda örtüşen pencereler okur.
+    Pencereler okuyucunun önceden ayrılmış tamponlarına kopyalanır ve bir sonraki pop
+    çağrısına kadar geçerlidir; daha uzun saklanacaksa kopyalanmalıdır.
+    """
+
+    def __init__(self, ring, window_size, hop_size, start=0):
+        if hop_size <= 0 or window_size <= 0:
+            raise ValueError("window_size ve hop_size pozitif olmalı")
+        if window_size > ring.capacity:
+            raise ValueError("window_size halka tampon kapasitesinden büyük olamaz")
+        self.ring = ring
+        self.window_size = int(window_size)
+        self.hop_size = int(hop_size)
+        self.next_start = int(start)
+        self.dropped = 0  # Okuyucu geride kaldığı için atlanan pencere sayısı
+        self.buffers = []  # Pencere tamponları; bir pop çağrısındaki en fazla pencere sayısı kadar büyür
+
+    def available(self):
+        """Okunmaya hazır pencere sayısı."""
+        ready = self.ring.written - self.window_size - self.next_start
+        return 0 if ready < 0 else ready // self.hop_size + 1
+
+    def pop(self, max_windows=None):
+        """
+        Hazır pencereleri sırayla döndürür: [(başlangıç örneği, (window_size, channels) dizi), ...]
+        Üzerine yazılmış pencereler atlanır ve dropped sayacına eklenir. Yazar kopyalanan aralığın
+        üzerine geçmekteyse (yarım okuma) beklenmez: o ana kadarki pencereler döner, kalanlar bir
+        sonraki çağrıda yeniden denenir.
+        """
+        windows = []
+        while self.available() and (max_windows is None or len(windows) < max_windows):
+            oldest = self.ring.oldest()
+            if self.next_start < oldest:
+                skipped = -(-(oldest - self.next_start) // self.hop_size)
+                self.dropped += skipped
+                self.next_start += skipped * self.hop_size
+                continue
+            if len(windows) == len(self.buffers):
+                self.buffers.append(np.empty((self.window_size, self.ring.data.shape[1]), dtype=self.ring.data.dtype))
+            window = self.ring.read(self.next_start, self.window_size, out=self.buffers[len(windows)])
+            if window is None:
+                break
+            windows.append((self.next_start, window))
+            self.next_start += self.hop_size
+        return windows
+
+
+class SyntheticInputStream:
+    """
+    sd.InputStream yerine geçen sentetik akış (gerçek aygıt olmadan test için).
+    signal: signal(start, frames) -> (frames,) veya (frames, channels) örnekler; start mutlak örnek indisidir
+    realtime: True ise bloklar örnekleme hızında, False ise olabildiğince hızlı üretilir
+    """
+
+    def __init__(self, samplerate, channels=1, blocksize=DEFAULT_BLOCKSIZE, callback=None, dtype='float32',
+                 device=None, signal=None, realtime=True, max_frames=None):
+        self.samplerate = samplerate
+        self.channels = channels
+        self.blocksize = blocksize
+        self.callback = callback
+        self.dtype = dtype
+        self.device = device
+        self.signal = signal if signal is not None else sine_signal(samplerate)
+        self.realtime = realtime
+        self.max_frames = max_frames
+        self.frames_generated = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        start_time = time.perf_counter()
+        while not self._stop.is_set():
+            if self.max_frames is not None and self.frames_generated >= self.max_frames:
+                break
+            block = np.asarray(self.signal(self.frames_generated, self.blocksize), dtype=self.dtype)
+            block = block.reshape(self.blocksize, -1)
+            if block.shape[1] != self.channels:
+                block = np.repeat(block[:, :1], self.channels, axis=1)
+            self.callback(block, self.blocksize, None, None)
+            self.frames_generated += self.blocksize
+            if self.realtime:
+                delay = start_time + self.frames_generated / self.samplerate - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def close(self):
+        self.stop()
+
+    @property
+    def active(self):
+        return self._thread is not None and self._thread.is_alive()
+
+
+def sine_signal(samplerate, frequency=440.0, amplitude=0.5):
+    """Mutlak örnek indisine göre sürekli (faz kaymasız) sinüs üreteci."""
+    def signal(start, frames):
+        t = (start + np.arange(frames)) / samplerate
+        return amplitude * np.sin(2 * np.pi * frequency * t)
+    return signal
+
+
+class AudioCapture:
+    """
+    Callback tabanlı ses yakalama: aygıt akışı blokları halka tampona yazar.
+    stream_factory: sd.InputStream ile aynı parametreleri alan akış sınıfı
+                    (None: sounddevice.InputStream; test için SyntheticInputStream)
+    """
+
+    def __init__(self, samplerate, channels=1, buffer_seconds=DEFAULT_BUFFER_SECONDS, blocksize=DEFAULT_BLOCKSIZE,
+                 device=None, stream_factory=None, **stream_kwargs):
+        self.samplerate = samplerate
+        self.channels = channels
+        self.blocksize = blocksize
+        self.device = device
+        self.ring = RingBuffer(int(buffer_seconds * samplerate), channels)
+        self.status_errors = 0  # Aygıtın bildirdiği taşma / eksik okuma sayısı
+        if stream_factory is None:
+            import sounddevice as sd
+            stream_factory = sd.InputStream
+        self.stream_factory = stream_factory
+        self.stream_kwargs = stream_kwargs
+        self.stream = None
+
+    def _callback(self, indata, frames, time_info, status):
+        """Ses iş parçacığında çalışır: yalnızca kopyalama yapar, bellek ayırmaz."""
+        if status:
+            self.status_errors += 1
+        self.ring.write(indata)
+
+    def reader(self, window_seconds=DEFAULT_WINDOW_SECONDS, hop_seconds=DEFAULT_HOP_SECONDS):
+        """Şu andan itibaren örtüşen pencereleri okuyan bir HopReader oluşturur."""
+        return HopReader(self.ring, int(window_seconds * self.samplerate), int(hop_seconds * self.samplerate),
+                         start=self.ring.written)
+
+    def start(self):
+        self.stream = self.stream_factory(samplerate=self.samplerate, channels=self.channels,
+                                          blocksize=self.blocksize, device=self.device, dtype='float32',
+                                          callback=self._callback, **self.stream_kwargs)
+        self.stream.start()
+
+    def stop(self):
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
+
+    @property
+    def active(self):
+        return self.stream is not None
+
+
+if __name__ == '__main__':
+    # Sentetik akışla kesintisizlik kontrolü: okunan pencereler üretilen sinyalle örnek örnek aynı olmalı
+    fs = 8000
+    signal = sine_signal(fs, frequency=123.0)
+    capture = AudioCapture(fs, buffer_seconds=1.0, blocksize=256, stream_factory=SyntheticInputStream,
+                           signal=signal, max_frames=fs * 2)
+    reader = capture.reader(window_seconds=0.5, hop_seconds=0.125)
+    capture.start()
+    windows = []
+    while capture.stream.active or reader.available():
+        windows.extend((start, window.copy()) for start, window in reader.pop())
+        time.sleep(0.001)
+    capture.stop()
+    starts = [start for start, _ in windows]
+    assert reader.dropped == 0 and starts == list(range(0, starts[-1] + 1, reader.hop_size))
+    for start, window in windows:
+        assert np.allclose(window[:, 0], signal(start, reader.window_size), atol=1e-6)
+
+    # Okuyucu geride kalırsa üzerine yazılan pencereler atlanır ve sayılır
+    ring = RingBuffer(1000)
+    lagging = HopReader(ring, window_size=200, hop_size=100)
+    ring.write(np.arange(3000, dtype=np.float32)[:, None])
+    popped = lagging.pop()
+    assert lagging.dropped > 0 and popped[0][0] >= ring.oldest()
+    assert np.array_equal(popped[0][1][:, 0], np.arange(popped[0][0], popped[0][0] + 200))
+    print(f"Halka tampon kontrolü: OK ({len(windows)} pencere, kayıp yok)")
@@ -0,0 +1,233 @@
+"""
+Çok çekirdekli toplu lokalizasyon (kapsama çalışmaları için senaryo taramaları).
+
+main.py'deki add_random_sound_source -> perform_localization akışı, aynı sahne
+üzerinde çok sayıda bağımsız kaynak için ProcessPoolExecutor ile paralel
+çalıştırılır:
+
+- Sahne geometrisi her işçi sürecine başlatıcı (initializer) ile bir kez
+  gönderilir; işçi kendi Scene / LocalizationEngine nesnesini kurar ve tüm
+  parçalarda yeniden kullanır.
+- Kaynak parametreleri ve sonuç dizileri paylaşılan bellekte
+  (multiprocessing.shared_memory) tutulur; görevler yalnızca [başlangıç, bitiş)
+  indis aralığı taşır, sonuçlar sözlük olarak pickle edilmez.
+- Senaryolar chunk_size büyüklüğünde parçalara bölünerek gönderilir.
+
+Kullanım: python batch_localization.py [--scenarios 2000] [--workers 1,2,4] [--chunk-size 64] [--seed 0]
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from localization_engine import POSITION_BOUNDS, LocalizationEngine, Scene
+
+# Paylaşılan bellekteki diziler: ad -> (sütun sayısı, dtype); sütun sayısı None ise tek boyutlu
+RESULT_LAYOUT = {
+    'position': (3, np.float64),
+    'db': (None, np.float64),
+    'cost': (None, np.float64),
+    'success': (None, np.bool_),
+    'used_mics': (None, np.int32),
+    'nfev': (None, np.int32),
+}
+
+DEFAULT_CHUNK_SIZE = 64
+
+# İşçi sürecine özel durum (_init_worker tarafından doldurulur)
+_worker = {}
+
+
+def random_sources(count, rng=None):
+    """add_random_sound_source ile aynı dağılımlardan (N, 4) [x, y, z, D] kaynak dizisi üretir."""
+    rng = np.random.default_rng() if rng is None else rng
+    low, high = np.array(POSITION_BOUNDS, dtype=float).T
+    return np.column_stack([rng.uniform(low, high, size=(count, 3)), rng.uniform(60, 100, size=count)])
+
+
+class SharedArrays:
+    """Ad -> NumPy dizisi eşlemesi; her dizi ayrı bir paylaşılan bellek bloğunda tutulur."""
+
+    def __init__(self, specs, names=None):
+        """
+        specs: {ad: (şekil, dtype)}
+        names: Var olan bloklara bağlanmak için {ad: paylaşılan bellek adı}; None ise yeni bloklar açılır
+        """
+        self.specs = specs
+        self.blocks = {}
+        self.arrays = {}
+        for key, (shape, dtype) in specs.items():
+            nbytes = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+            if names is None:
+                block = shared_memory.SharedMemory(create=True, size=nbytes)
+            else:
+                block = shared_memory.SharedMemory(name=names[key])
+            self.blocks[key] = block
+            self.arrays[key] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+    @property
+    def names(self):
+        return {key: block.name for key, block in self.blocks.items()}
+
+    def __getitem__(self, key):
+        return self.arrays[key]
+
+    def close(self, unlink=False):
+        self.arrays.clear()
+        for block in self.blocks.values():
+            block.close()
+            if unlink:
+                block.unlink()
+
+
+def _result_specs(count):
+    return {key: ((count,) if columns is None else (count, columns), dtype)
+            for key, (columns, dtype) in RESULT_LAYOUT.items()}
+
+
+def _init_worker(mic_positions, noise_sources, buildings, propagation, method, specs, names):
+    """İşçi başlatıcı: sahneyi (yayılım modeli dahil) bir kez kurar ve paylaşılan dizilere bağlanır."""
+    scene = Scene(mic_positions, noise_sources, buildings, propagation)
+    _worker['scene'] = scene
+    _worker['engine'] = LocalizationEngine(scene, method=method)
+    _worker['arrays'] = SharedArrays(specs, names)
+
+
+def _solve_range(start, stop):
+    """[start, stop) aralığındaki senaryoları çözer ve sonuçları paylaşılan dizilere yazar."""
+    scene, engine, arrays = _worker['scene'], _worker['engine'], _worker['arrays']
+    sources = arrays['sources']
+    for i in range(start, stop):
+        measured_db, blocked = scene.synthesize_measurements(sources[i, :3], sources[i, 3])
+        result = engine.localize(measured_db, blocked)
+        arrays['used_mics'][i] = result.used_mics.sum()
+        arrays['nfev'][i] = result.nfev
+        arrays['success'][i] = result.success
+        if result.position is None:
+            arrays['position'][i] = np.nan
+            arrays['db'][i] = np.nan
+            arrays['cost'][i] = np.nan
+        else:
+            arrays['position'][i] = result.position
+            arrays['db'][i] = result.db
+            arrays['cost'][i] = result.cost
+    return stop - start
+
+
+@dataclass
+class BatchResult:
+    """Toplu lokalizasyon sonuçları (senaryo başına bir satır)."""
+    sources: np.ndarray
+    position: np.ndarray
+    db: np.ndarray
+    cost: np.ndarray
+    success: np.ndarray
+    used_mics: np.ndarray
+    nfev: np.ndarray
+    workers: int
+    elapsed: float
+
+    @property
+    def position_error(self):
+        """Gerçek ve tahmin edilen konum arasındaki mesafe (çözülemeyen senaryolarda NaN)."""
+        return np.linalg.norm(self.position - self.sources[:, :3], axis=1)
+
+    @property
+    def db_error(self):
+        return np.abs(self.db - self.sources[:, 3])
+
+    @property
+    def throughput(self):
+        """Saniyedeki çözüm sayısı."""
+        return len(self.sources) / self.elapsed if self.elapsed > 0 else float('inf')
+
+
+def localize_batch(scene, sources, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, method='SLSQP'):
+    """
+    Aynı sahnedeki çok sayıda kaynak için ölçüm sentezi + lokalizasyon yapar.
+    scene: localization_engine.Scene
+    sources: (N, 4) [x, y, z, D] gerçek kaynaklar
+    workers: İşçi süreç sayısı (None: os.cpu_count(); 1: havuz kurulmadan aynı süreçte)
+    chunk_size: Bir görevde çözülen senaryo sayısı
+    """
+    sources = np.asarray(sources, dtype=float).reshape(-1, 4)
+    count = len(sources)
+    workers = (os.cpu_count() or 1) if workers is None else max(int(workers), 1)
+    chunk_size = max(int(chunk_size), 1)
+
+    specs = _result_specs(count)
+    specs['sources'] = ((count, 4), np.float64)
+    arrays = SharedArrays(specs)
+    start = time.perf_counter()
+    try:
+        arrays['sources'][:] = sources
+        ranges = [(lo, min(lo + chunk_size, count)) for lo in range(0, count, chunk_size)]
+        init_args = (scene.mic_positions, scene.noise_sources, scene.buildings, scene.propagation,
+                     method, specs, arrays.names)
+        if workers == 1:
+            _init_worker(*init_args)
+            try:
+                for lo, hi in ranges:
+                    _solve_range(lo, hi)
+            finally:
+                _worker.pop('arrays').close()
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args) as pool:
+                futures = [pool.submit(_solve_range, lo, hi) for lo, hi in ranges]
+                for future in futures:
+                    future.result()
+        elapsed = time.perf_counter() - start
+        copies = {key: arrays[key].copy() for key in RESULT_LAYOUT}
+    finally:
+        arrays.close(unlink=True)
+    return BatchResult(sources=sources, workers=workers, elapsed=elapsed, **copies)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scenarios', type=int, default=2000, help='Senaryo sayısı')
+    parser.add_argument('--workers', default=None,
+                        help='Virgülle ayrılmış işçi sayıları (varsayılan: 1 ve çekirdek sayısı)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Görev başına senaryo sayısı')
+    parser.add_argument('--seed', type=int, default=0, help='Rastgele sayı üreteci tohumu')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+
+    # Yayılım modeli işçilere taşınmalı: toplu çözüm, aynı sahnede LocalizationEngine ile aynı sonucu verir
+    from localization_engine import LocalizationEngine
+    from propagation import AtmosphericPropagation
+    scene = Scene.random(rng=rng, propagation=AtmosphericPropagation(frequency=8000, temperature=15, humidity=20))
+    check_sources = random_sources(8, rng)
+    for count in (1, 2):
+        batch = localize_batch(scene, check_sources, workers=count)
+        engine = LocalizationEngine(scene)
+        for i, (x, y, z, D) in enumerate(check_sources):
+            result = engine.localize(*scene.synthesize_measurements([x, y, z], D))
+            expected = np.full(3, np.nan) if result.position is None else result.position
+            assert np.allclose(batch.position[i], expected, equal_nan=True), "Toplu çözüm yayılım modelini kullanmıyor"
+    print(f"Yayılım modeli kontrolü ({scene.propagation}): OK")
+
+    scene = Scene.random(rng=rng)
+    sources = random_sources(args.scenarios, rng)
+    cpu_count = os.cpu_count() or 1
+    worker_counts = sorted({1, cpu_count}) if args.workers is None else \
+        [int(count) for count in args.workers.split(',')]
+
+    print(f"{args.scenarios} senaryo, {len(scene.buildings)} bina, {cpu_count} çekirdek, "
+          f"parça boyutu {args.chunk_size}")
+    print(f"{'İşçi':>6}{'süre s':>10}{'çözüm/s':>10}{'hızlanma':>10}{'konum hatası p50':>18}")
+    baseline = None
+    for count in worker_counts:
+        batch = localize_batch(scene, sources, workers=count, chunk_size=args.chunk_size)
+        if baseline is None:
+            baseline = batch
+        else:
+            assert np.allclose(batch.position, baseline.position, equal_nan=True), \
+                "Paralel sonuçlar tek süreçli sonuçlardan farklı"
+        print(f"{count:>6}{batch.elapsed:>10.2f}{batch.throughput:>10.1f}"
+              f"{baseline.elapsed / batch.elapsed:>10.2f}{np.nanpercentile(batch.position_error, 50):>18.3f}")
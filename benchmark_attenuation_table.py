@@ -0,0 +1,103 @@
+"""
+Yayılım kaybı tablosu: ara değerleme doğruluğu ile sorgu hızı arasındaki denge.
+
+Geniş bantlı ISO 9613-1 modeli (BroadbandPropagation, 8 oktav bandı) farklı hata
+sınırlarıyla tablolanır ve şunlar ölçülür:
+
+    tablo           Nokta sayısı, bellek, kurulum süresi, rastgele mesafelerde ölçülen en büyük hata
+    sorgu           Tam model ve tablo için M mesafe / s (--lookups mesafelik tek dizi)
+    ileri model     predict_db çağrı süresi (18 mikrofon, 3 kaynak) ve ızgara tohumlamadaki gibi büyük toplu değerlendirme
+    lokalizasyon    Rastgele sahnelerde ızgara tohumlamalı çözüm: tam model ile tablo arasındaki süre ve konum farkı
+
+Kullanım: python benchmark_attenuation_table.py [--lookups 1000000] [--scenes 20] [--seed 0]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from attenuation_table import DEFAULT_MAX_DISTANCE, DEFAULT_MIN_DISTANCE, AttenuationTable
+from forward_model import predict_db, single_source_grid_cost
+from localization_engine import POSITION_BOUNDS, LocalizationEngine, Scene
+from propagation import BroadbandPropagation
+
+TOLERANCES = (0.1, 0.01, 0.001, 0.0001)
+
+
+def best_time(function, repeats=5):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def run(lookups, scenes, seed):
+    rng = np.random.default_rng(seed)
+    model = BroadbandPropagation(temperature=15, humidity=30)
+    distances = rng.uniform(DEFAULT_MIN_DISTANCE, DEFAULT_MAX_DISTANCE, lookups)
+    exact = model.loss(distances)
+    exact_rate = lookups / best_time(lambda: model.loss(distances))
+    spherical_rate = lookups / best_time(lambda: 20.0 * np.log10(distances))
+
+    print(f"{model}, tablo aralığı {DEFAULT_MIN_DISTANCE}-{DEFAULT_MAX_DISTANCE} m, {lookups} sorgu")
+    print(f"{'Hata sınırı dB':>15}{'nokta':>9}{'KB':>8}{'kurulum ms':>12}{'ölçülen hata dB':>17}{'M sorgu/s':>11}")
+    print(f"{'tam model':>15}{'-':>9}{'-':>8}{'-':>12}{0:>17.1g}{exact_rate / 1e6:>11.1f}")
+    print(f"{'(log10 yalnız)':>15}{'-':>9}{'-':>8}{'-':>12}{'-':>17}{spherical_rate / 1e6:>11.1f}")
+    tables = {}
+    for tolerance in TOLERANCES:
+        start = time.perf_counter()
+        table = AttenuationTable.from_model(model, tolerance=tolerance)
+        build = time.perf_counter() - start
+        tables[tolerance] = table
+        error = np.abs(table.loss(distances) - exact).max()
+        rate = lookups / best_time(lambda: table.loss(distances))
+        print(f"{tolerance:>15g}{table.segments + 1:>9}{table.nbytes / 1024:>8.0f}{build * 1000:>12.1f}"
+              f"{error:>17.2g}{rate / 1e6:>11.1f}")
+
+    # İleri model: tek çağrı ve ızgara tohumlama boyutunda toplu değerlendirme
+    table = tables[0.01]
+    mics = rng.uniform([-15, -15, -10], [25, 25, 10], size=(18, 3))
+    params = np.column_stack([rng.uniform([-15, -15, -10], [25, 25, 10], size=(3, 3)), rng.uniform(60, 90, 3)])
+    points = rng.uniform(*np.array(POSITION_BOUNDS, dtype=float).T, size=(10000, 3))
+    measured = predict_db(mics, params[:1], None, model)
+    print(f"\nİleri model (18 mikrofon): {'küresel':>10}{'tam model':>12}{'tablo':>10}")
+    calls = 2000
+    single = [best_time(lambda: [predict_db(mics, params, None, p) for _ in range(calls)]) / calls * 1e6
+              for p in (None, model, table)]
+    print(f"{'predict_db, 3 kaynak (us)':<26}{single[0]:>10.1f}{single[1]:>12.1f}{single[2]:>10.1f}")
+    batch = [best_time(lambda: single_source_grid_cost(mics, measured, points, p)) * 1000 for p in (None, model, table)]
+    print(f"{'ızgara, 10000 nokta (ms)':<26}{batch[0]:>10.1f}{batch[1]:>12.1f}{batch[2]:>10.1f}")
+
+    # Lokalizasyon: aynı ölçümler tam modelle sentezlenir, tam model ve tabloyla çözülür
+    times = {'tam model': [], 'tablo': []}
+    differences, errors = [], []
+    for _ in range(scenes):
+        scene = Scene.random(rng=rng, propagation=model)
+        blocked = np.ones(len(scene.mic_positions), dtype=bool)
+        while (~blocked).sum() < 4:
+            source_point = rng.uniform(*np.array(POSITION_BOUNDS, dtype=float).T)
+            measured_db, blocked = scene.synthesize_measurements(source_point, rng.uniform(60, 100))
+        positions = {}
+        for name, propagation in (('tam model', model), ('tablo', table)):
+            scene.propagation = propagation
+            result = LocalizationEngine(scene).localize(measured_db, blocked, seeding='grid')
+            times[name].append(result.elapsed)
+            positions[name] = result.position
+        differences.append(np.linalg.norm(positions['tablo'] - positions['tam model']))
+        errors.append(np.linalg.norm(positions['tam model'] - source_point))
+    print(f"\nLokalizasyon ({scenes} sahne, ızgara tohumlama, SLSQP):")
+    for name, elapsed in times.items():
+        print(f"  {name:<10} medyan {np.median(elapsed) * 1000:.1f} ms")
+    print(f"  tablo - tam model konum farkı: medyan {np.median(differences) * 1000:.2f} mm, "
+          f"en büyük {np.max(differences) * 1000:.2f} mm (tam model konum hatası medyan {np.median(errors) * 1000:.2f} mm)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lookups', type=int, default=1000000, help='Sorgu hızı ölçümündeki mesafe sayısı')
+    parser.add_argument('--scenes', type=int, default=20, help='Lokalizasyon karşılaştırmasındaki sahne sayısı')
+    parser.add_argument('--seed', type=int, default=0, help='Rastgele sayı üreteci tohumu')
+    args = parser.parse_args()
+    run(args.lookups, args.scenes, args.seed)
@@ -0,0 +1,110 @@
+"""
+DTW ses benzerliği araması: budamasız DTW ile bant + LB_Keogh + erken bırakma karşılaştırması.
+
+7 saniyelik kayıtlar (44.1 kHz, hop 512 -> ~603 çerçeve, 13 MFCC) benzetilir:
+birkaç "konuşmacı" için yumuşak MFCC dizileri üretilir; her kayıt bunlardan
+birinin rastgele zaman bükmeli ve gürültülü bir kopyasıdır (±%5 uzunluk farkı).
+Sorgu, bir konuşmacının yeni bir kopyasıdır ve en yakın k kayıt aranır:
+
+    python döngüsü   Saf Python tam DTW (--python-pairs çiftte ölçülüp tüm aramaya ölçeklenir)
+    tam DTW          dtw_distance, bant ve budama yok (ters köşegen vektörizasyonu)
+    bant             Sakoe-Chiba bandı, budama yok
+    bant+budama      Bant + LB_Keogh + erken bırakma (sıralı)
+    bant+budama xN   Aynısı, N iş parçacıklı havuzda
+
+Kullanım: python benchmark_dtw.py [--clips 100] [--speakers 10] [--k 5] [--band 0.1] [--workers 4] [--seed 0]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from dtw import dtw_search, normalize_frames
+
+FRAMES = 603   # 7 s * 44100 / 512
+N_MFCC = 13
+
+
+def speaker_template(rng, frames=FRAMES):
+    """Yumuşak değişen MFCC benzeri dizi: katsayı başına hareketli ortalamalı rastgele yürüyüş."""
+    walk = np.cumsum(rng.normal(size=(frames + 40, N_MFCC)), axis=0)
+    smooth = np.apply_along_axis(lambda c: np.convolve(c, np.ones(40) / 40, mode='valid'), 0, walk)[:frames]
+    return smooth * rng.uniform(0.5, 3, N_MFCC) + rng.normal(0, 5, N_MFCC)
+
+
+def warped_copy(rng, template, noise=0.3):
+    """Şablonun monoton rastgele zaman bükmesi (uzunluk ±%5) ve gürültü eklenmiş kopyası."""
+    length = int(len(template) * rng.uniform(0.95, 1.05))
+    speed = np.exp(np.convolve(rng.normal(0, 0.3, length), np.ones(50) / 50, mode='same'))
+    position = np.cumsum(speed)
+    position = (position - position[0]) / (position[-1] - position[0]) * (len(template) - 1)
+    frames = np.array([np.interp(position, np.arange(len(template)), c) for c in template.T]).T
+    return frames + rng.normal(0, noise * template.std(axis=0), frames.shape)
+
+
+def python_dtw(x, y):
+    """Saf Python tam DTW (normalize)."""
+    n, m = len(x), len(y)
+    cost = np.sqrt(((x[:, None, :] - y[None, :, :]) ** 2).sum(axis=2)).tolist()
+    previous = [0.0] + [float('inf')] * m
+    for i in range(n):
+        row = cost[i]
+        current = [float('inf')] * (m + 1)
+        for j in range(m):
+            current[j + 1] = row[j] + min(previous[j], previous[j + 1], current[j])
+        previous = current
+    return previous[m] / (n + m)
+
+
+def run(clips, speakers, k, band, workers, python_pairs, seed):
+    rng = np.random.default_rng(seed)
+    templates = [speaker_template(rng) for _ in range(speakers)]
+    owners = rng.integers(speakers, size=clips)
+    library = [normalize_frames(warped_copy(rng, templates[owner])) for owner in owners]
+    target = int(rng.integers(speakers))
+    query = normalize_frames(warped_copy(rng, templates[target]))
+
+    start = time.perf_counter()
+    for candidate in library[:python_pairs]:
+        python_dtw(query, candidate)
+    python_time = (time.perf_counter() - start) / python_pairs * clips
+
+    configurations = [
+        ('tam DTW', dict(band_ratio=None, prune=False, workers=1)),
+        ('bant', dict(band_ratio=band, prune=False, workers=1)),
+        ('bant+budama', dict(band_ratio=band, prune=True, workers=1)),
+        (f'bant+budama x{workers}', dict(band_ratio=band, prune=True, workers=workers)),
+    ]
+    print(f"{clips} kayıt (~{FRAMES} x {N_MFCC} çerçeve), {speakers} konuşmacı, k={k}, bant oranı {band}")
+    print(f"{'Yöntem':<20}{'süre s':>9}{'hızlanma':>10}{'budanan':>9}{'bırakılan':>11}{'tamamlanan':>12}{'isabet':>8}")
+    print(f"{'python döngüsü':<20}{python_time:>9.2f}{'(tahmin)':>10}")
+    baseline = None
+    banded_exact = None
+    for name, options in configurations:
+        start = time.perf_counter()
+        result = dtw_search(query, library, k=k, **options)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        hits = sum(owners[i] == target for i in result.indices)
+        print(f"{name:<20}{elapsed:>9.2f}{baseline / elapsed:>9.1f}x{result.pruned:>9}{result.abandoned:>11}"
+              f"{result.completed:>12}{hits:>5}/{len(result.indices)}")
+        if options['band_ratio'] is not None:
+            # Budama yalnızca hızlandırır: bantlı aramayla aynı en yakın k sonuç beklenir
+            if banded_exact is None:
+                banded_exact = result.indices
+            elif result.indices != banded_exact:
+                print(f"  UYARI: {name} sonuçları bantlı tam aramadan farklı")
+    print(f"python döngüsüne göre bant+budama: {python_time / elapsed:.0f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clips', type=int, default=100, help='Kütüphanedeki kayıt sayısı')
+    parser.add_argument('--speakers', type=int, default=10, help='Farklı konuşmacı (şablon) sayısı')
+    parser.add_argument('--k', type=int, default=5, help='Döndürülen en yakın kayıt sayısı')
+    parser.add_argument('--band', type=float, default=0.1, help='Sakoe-Chiba bant oranı')
+    parser.add_argument('--workers', type=int, default=4, help='İş parçacığı havuzu boyutu')
+    parser.add_argument('--python-pairs', type=int, default=2, help='Saf Python DTW ile ölçülen çift sayısı')
+    parser.add_argument('--seed', type=int, default=0, help='Rastgele sayı üreteci tohumu')
+    args = parser.parse_args()
+    run(args.clips, args.speakers, args.k, args.band, args.workers, args.python_pairs, args.seed)
@@ -0,0 +1,99 @@
+"""
+SLSQP ile artık vektörü tabanlı en küçük kareler (TRF / LM) çözücülerinin karşılaştırması.
+
+main.py'deki perform_localization senaryosu arayüz olmadan tekrarlanır:
+18 rastgele mikrofon, 2 ambient gürültü kaynağı ve rastgele bir ses kaynağı.
+Her çözücü aynı senaryolar üzerinde çalıştırılır; iterasyon sayısı, hedef
+fonksiyon değerlendirme sayısı, süre ve konum / dB hatası raporlanır.
+
+--noise-sources 0 ile yalnızca ana kaynağın kestirildiği (iyi koşullu) durum ölçülür.
+
+Kullanım: python benchmark_least_squares.py [--scenarios 200] [--seed 0] [--noise-sources 2]
+"""
+import argparse
+import time
+
+import numpy as np
+from scipy.optimize import least_squares, minimize
+
+from forward_model import predict_db, residual_jacobian, residuals, squared_error_and_gradient
+
+# main.py ile aynı sınırlar
+POSITION_BOUNDS = [(-15, 25), (-15, 25), (-10, 10)]
+DB_BOUNDS = (40, 100)
+
+
+def random_scenario(rng, num_mics=18, noise_count=2):
+    """main.py'deki rastgele konum üretimiyle aynı dağılımlardan bir senaryo üretir."""
+    low, high = np.array(POSITION_BOUNDS, dtype=float).T
+    mics = rng.uniform(low, high, size=(num_mics, 3))
+    noise = np.column_stack([rng.uniform(low, high, size=(noise_count, 3)),
+                             rng.uniform(60, 90, size=noise_count)])
+    source = np.append(rng.uniform(low, high), rng.uniform(60, 100))
+    # main.py'de ölçümler yalnızca ana kaynaktan sentezlenir
+    measured = predict_db(mics, source)
+    return mics, noise, source, measured
+
+
+def initial_guess(mics, noise, measured):
+    """main.py'deki başlangıç tahmini: mikrofon merkezi + ortalama dB, gürültüler bilinen değerlerinde."""
+    x0 = np.concatenate([mics.mean(axis=0), [measured.mean()], noise.ravel()])
+    bounds = (POSITION_BOUNDS + [DB_BOUNDS]) * (1 + len(noise))
+    return x0, bounds
+
+
+def solve_slsqp(mics, measured, x0, bounds):
+    res = minimize(squared_error_and_gradient, x0, args=(mics, measured),
+                   method='SLSQP', bounds=bounds, jac=True)
+    return res.x, res.nit, res.nfev
+
+
+def solve_trf(mics, measured, x0, bounds):
+    lower, upper = np.array(bounds, dtype=float).T
+    res = least_squares(residuals, np.clip(x0, lower, upper), jac=residual_jacobian,
+                        args=(mics, measured), bounds=(lower, upper), method='trf')
+    return res.x, res.njev, res.nfev
+
+
+def solve_lm(mics, measured, x0, bounds):
+    res = least_squares(residuals, x0, jac=residual_jacobian, args=(mics, measured), method='lm')
+    # LM, Jacobian değerlendirme sayısını raporlamaz; her başarılı adımda bir Jacobian hesaplanır
+    return res.x, res.njev if res.njev is not None else res.nfev, res.nfev
+
+
+SOLVERS = {
+    'SLSQP': solve_slsqp,
+    'TRF': solve_trf,
+    'LM': solve_lm,
+}
+
+
+def run(scenarios, seed, noise_count):
+    rng = np.random.default_rng(seed)
+    cases = [random_scenario(rng, noise_count=noise_count) for _ in range(scenarios)]
+    print(f"{'Çözücü':<8}{'iter (ort)':>12}{'nfev (ort)':>12}{'süre ms (ort)':>15}"
+          f"{'konum hatası p50':>18}{'konum hatası p95':>18}{'dB hatası p50':>15}")
+    for name, solver in SOLVERS.items():
+        iterations, evaluations, durations, position_errors, db_errors = [], [], [], [], []
+        for mics, noise, source, measured in cases:
+            x0, bounds = initial_guess(mics, noise, measured)
+            start = time.perf_counter()
+            x, nit, nfev = solver(mics, measured, x0, bounds)
+            durations.append(time.perf_counter() - start)
+            iterations.append(nit)
+            evaluations.append(nfev)
+            position_errors.append(np.linalg.norm(x[:3] - source[:3]))
+            db_errors.append(abs(x[3] - source[3]))
+        print(f"{name:<8}{np.mean(iterations):>12.1f}{np.mean(evaluations):>12.1f}"
+              f"{np.mean(durations) * 1000:>15.2f}"
+              f"{np.percentile(position_errors, 50):>18.3f}{np.percentile(position_errors, 95):>18.3f}"
+              f"{np.percentile(db_errors, 50):>15.3f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scenarios', type=int, default=200, help='Rastgele senaryo sayısı')
+    parser.add_argument('--seed', type=int, default=0, help='Rastgele sayı üreteci tohumu')
+    parser.add_argument('--noise-sources', type=int, default=2, help='Ortak kestirilen gürültü kaynağı sayısı')
+    args = parser.parse_args()
+    run(args.scenarios, args.seed, args.noise_sources)
@@ -0,0 +1,248 @@
+"""
+Lokalizasyon algoritma ailelerinin Monte Carlo doğruluk / hız karşılaştırması.
+
+echoTrace_v*.py sürümlerindeki dört algoritma ailesi arayüz olmadan, aynı
+tohumla üretilmiş rastgele sahneler (mikrofon yerleşimi, gürültü kaynakları,
+binalar, gerçek kaynak) üzerinde çalıştırılır:
+
+    tdoa-nm          v0.3.x   Ağırlıklı TDOA kaybı, Nelder-Mead (yalnızca konum)
+    tdoa-chan        tdoa.py  Kapalı form Chan tahmini (yalnızca konum)
+    bfgs-db          v0.4.4   dB ölçümleri, gürültü sabit, BFGS (analitik gradyan)
+    slsqp-joint      main.py  Ana kaynak + gürültü ortak kestirimi, SLSQP (LocalizationEngine)
+    slsqp-grid       main.py  slsqp-joint, kabadan inceye ızgara aramasıyla tohumlanmış
+    lbfgsb-occlusion v0.4.6   Hedef fonksiyonda voksel görünürlük alanı, L-BFGS-B
+
+Her aile için saniyedeki çözüm sayısı, p50/p95 gecikme ve konum / dB hatası
+raporlanır. Ölçüm sentezi ve görünürlük alanı kurulumu (arayüzde sahne başına
+bir kez yapılır) gecikmeye dahil edilmez; yalnızca çözüm süresi ölçülür.
+Sonuçlar isteğe bağlı olarak CSV ve/veya JSON dosyasına yazılır; performans
+gerilemelerini yakalamak için çıktılar sürümler arasında karşılaştırılabilir.
+
+Kullanım: python benchmark_localization.py [--scenarios 100] [--seed 0]
+          [--families tdoa-nm,bfgs-db,...] [--csv sonuc.csv] [--json sonuc.json]
+"""
+import argparse
+import csv
+import json
+import time
+
+import numpy as np
+from scipy.optimize import minimize
+
+from forward_model import power_sum_db, source_db_matrix, squared_error_and_gradient
+from localization_engine import POSITION_BOUNDS, LocalizationEngine, Scene
+from tdoa import SOUND_SPEED, chan, tdoa_loss
+from visibility import VisibilityField
+
+# En az bu kadar mikrofonun gerçek kaynağı gördüğü senaryolar kullanılır
+MIN_VISIBLE_MICS = 4
+
+
+class Case:
+    """Bir Monte Carlo senaryosu: sahne, gerçek kaynak ve senaryo başına ölçüm gürültüsü tohumu."""
+
+    def __init__(self, scene, source_point, source_db, blocked, seed):
+        self.scene = scene
+        self.source_point = source_point
+        self.source_db = source_db
+        self.blocked = blocked      # (K+1, M) ana kaynak + gürültü kaynakları için engellenme maskesi
+        self.seed = seed
+        self._visibility_field = None
+
+    @property
+    def visibility_field(self):
+        """
+        v0.4.6'daki gibi sahne başına bir kez kurulan görünürlük alanı. Alan, sahnenin
+        üretildiği ve kaynakların çekildiği POSITION_BOUNDS kutusu üzerinde kurulur.
+        """
+        if self._visibility_field is None:
+            self._visibility_field = VisibilityField(self.scene.mic_positions, self.scene.building_bvh,
+                                                     bounds=POSITION_BOUNDS)
+        return self._visibility_field
+
+
+def random_case(rng, num_mics=18, noise_count=2):
+    """Gerçek kaynağı en az MIN_VISIBLE_MICS mikrofonun gördüğü rastgele bir senaryo üretir."""
+    scene = Scene.random(num_mics, noise_count, rng=rng)
+    low, high = np.array(POSITION_BOUNDS, dtype=float).T
+    while True:
+        source_point = rng.uniform(low, high)
+        source_db = rng.uniform(60, 100)
+        sources = np.vstack([source_point, scene.noise_params()[:, :3]])
+        blocked = scene.blocked(sources)
+        if (~blocked[0]).sum() >= MIN_VISIBLE_MICS:
+            return Case(scene, source_point, source_db, blocked, int(rng.integers(2 ** 31)))
+
+
+# --- v0.3.x: TDOA + Nelder-Mead -------------------------------------------------
+
+def tdoa_measurements(case):
+    """v0.3.8: gürültü gücüne bağlı zaman damgası gürültüsü ve mikrofon ağırlıkları."""
+    rng = np.random.default_rng(case.seed)
+    mics = case.scene.mic_positions
+    noise_powers = 10 ** (source_db_matrix(mics, case.scene.noise_params()) / 10).sum(axis=1)
+    weights = np.mean(noise_powers) / (noise_powers + 1e-6)
+    # Standart sapma negatif olamaz; düşük gürültülü mikrofonlarda mutlak değer alınır
+    noise_std = np.abs(1e-4 * np.log10(noise_powers + 1e-6))
+    time_stamps = np.linalg.norm(mics - case.source_point, axis=1) / SOUND_SPEED + rng.normal(0, noise_std)
+    return mics, time_stamps, weights
+
+
+def solve_tdoa_nm(case):
+    """v0.3.8: mikrofon merkezinden Nelder-Mead."""
+    mics, time_stamps, weights = tdoa_measurements(case)
+    start = time.perf_counter()
+    result = minimize(tdoa_loss, np.mean(mics, axis=0), args=(mics, time_stamps, weights),
+                      method='Nelder-Mead')
+    return result.x, np.nan, time.perf_counter() - start
+
+
+def solve_tdoa_chan(case):
+    """Chan'ın iki adımlı kapalı form tahmini."""
+    mics, time_stamps, weights = tdoa_measurements(case)
+    start = time.perf_counter()
+    position = chan(mics, time_stamps, weights)
+    return position, np.nan, time.perf_counter() - start
+
+
+# --- v0.4.4: dB ölçümleri, sabit gürültü, BFGS -------------------------------------
+
+def solve_bfgs_db(case):
+    """v0.4.4: gürültü her mikrofona ulaşır, ana kaynak engellenen mikrofonlar dışlanır."""
+    scene = case.scene
+    noise_params = scene.noise_params()
+    params = np.vstack([[*case.source_point, case.source_db], noise_params])
+    visible = np.ones((len(scene.mic_positions), len(params)), dtype=bool)
+    visible[:, 0] = ~case.blocked[0]
+    measured_db = power_sum_db(source_db_matrix(scene.mic_positions, params), visible)
+    used = ~case.blocked[0]
+    mics, targets, fixed = scene.mic_positions[used], measured_db[used], noise_params.ravel()
+
+    def objective_function(pos_dB):
+        error, gradient = squared_error_and_gradient(np.concatenate([pos_dB, fixed]), mics, targets)
+        return error, gradient[:4]
+
+    start = time.perf_counter()
+    x0 = np.append(mics.mean(axis=0), measured_db.mean())
+    res = minimize(objective_function, x0, method='BFGS', jac=True)
+    return res.x[:3], res.x[3], time.perf_counter() - start
+
+
+# --- main.py: ortak kestirim, SLSQP --------------------------------------------------
+
+def solve_slsqp_joint(case, seeding='heuristic'):
+    """main.py: ölçümler yalnızca ana kaynaktan, gürültü kaynakları ortak kestirilir."""
+    measured_db, blocked = case.scene.synthesize_measurements(case.source_point, case.source_db)
+    result = LocalizationEngine(case.scene, method='SLSQP').localize(measured_db, blocked, seeding=seeding)
+    return result.position, result.db, result.elapsed
+
+
+def solve_slsqp_grid(case):
+    return solve_slsqp_joint(case, seeding='grid')
+
+
+# --- v0.4.6: hedef fonksiyonda engelleme, L-BFGS-B ---------------------------------
+
+def solve_lbfgsb_occlusion(case):
+    """v0.4.6: görünür gürültü ölçüme eklenir, görünürlük optimizasyon boyunca alandan okunur."""
+    scene = case.scene
+    measured_db, blocked = scene.synthesize_measurements(case.source_point, case.source_db, include_noise=True)
+    unblocked_indices = np.flatnonzero(~blocked)
+    mics, targets = scene.mic_positions[unblocked_indices], measured_db[unblocked_indices]
+    visibility_field = case.visibility_field
+
+    def objective(params):
+        sources = params.reshape(-1, 4)
+        visible = visibility_field.lookup(sources[:, :3], mic_indices=unblocked_indices).T
+        return squared_error_and_gradient(params, mics, targets, visible)
+
+    start = time.perf_counter()
+    x0 = np.concatenate([mics.mean(axis=0), [85], scene.noise_params().ravel()])
+    # v0.4.6'nın dB sınırları; konum sınırları görünürlük alanıyla aynı sahne kutusu
+    bounds = list(POSITION_BOUNDS) + [(60, 100)] + \
+             (list(POSITION_BOUNDS) + [(50, 90)]) * len(scene.noise_sources)
+    result = minimize(objective, x0, method='L-BFGS-B', bounds=bounds, jac=True)
+    return result.x[:3], result.x[3], time.perf_counter() - start
+
+
+FAMILIES = {
+    'tdoa-nm': solve_tdoa_nm,
+    'tdoa-chan': solve_tdoa_chan,
+    'bfgs-db': solve_bfgs_db,
+    'slsqp-joint': solve_slsqp_joint,
+    'slsqp-grid': solve_slsqp_grid,
+    'lbfgsb-occlusion': solve_lbfgsb_occlusion,
+}
+
+
+def summarize(name, latencies, position_errors, db_errors):
+    """Bir ailenin ölçümlerini rapor satırına dönüştürür."""
+    latencies = np.asarray(latencies)
+    db_errors = np.asarray(db_errors)
+    has_db = not np.all(np.isnan(db_errors))
+    return {
+        'family': name,
+        'scenarios': len(latencies),
+        'solves_per_sec': float(len(latencies) / latencies.sum()),
+        'latency_p50_ms': float(np.percentile(latencies, 50) * 1000),
+        'latency_p95_ms': float(np.percentile(latencies, 95) * 1000),
+        'position_error_p50': float(np.percentile(position_errors, 50)),
+        'position_error_p95': float(np.percentile(position_errors, 95)),
+        'db_error_p50': float(np.nanpercentile(db_errors, 50)) if has_db else None,
+        'db_error_p95': float(np.nanpercentile(db_errors, 95)) if has_db else None,
+    }
+
+
+def run(scenarios, seed, families):
+    rng = np.random.default_rng(seed)
+    cases = [random_case(rng) for _ in range(scenarios)]
+    rows = []
+    for name in families:
+        solver = FAMILIES[name]
+        latencies, position_errors, db_errors = [], [], []
+        for case in cases:
+            position, db, elapsed = solver(case)
+            latencies.append(elapsed)
+            position_errors.append(np.linalg.norm(np.asarray(position) - case.source_point))
+            db_errors.append(abs(db - case.source_db))
+        rows.append(summarize(name, latencies, position_errors, db_errors))
+    return rows
+
+
+def print_table(rows):
+    print(f"{'Aile':<18}{'çözüm/s':>10}{'p50 ms':>9}{'p95 ms':>9}"
+          f"{'konum p50':>11}{'konum p95':>11}{'dB p50':>9}{'dB p95':>9}")
+    for row in rows:
+        db_p50 = '-' if row['db_error_p50'] is None else f"{row['db_error_p50']:.3f}"
+        db_p95 = '-' if row['db_error_p95'] is None else f"{row['db_error_p95']:.3f}"
+        print(f"{row['family']:<18}{row['solves_per_sec']:>10.1f}{row['latency_p50_ms']:>9.2f}"
+              f"{row['latency_p95_ms']:>9.2f}{row['position_error_p50']:>11.3f}"
+              f"{row['position_error_p95']:>11.3f}{db_p50:>9}{db_p95:>9}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scenarios', type=int, default=100, help='Rastgele senaryo sayısı')
+    parser.add_argument('--seed', type=int, default=0, help='Rastgele sayı üreteci tohumu')
+    parser.add_argument('--families', default=','.join(FAMILIES),
+                        help=f"Virgülle ayrılmış aileler ({', '.join(FAMILIES)})")
+    parser.add_argument('--csv', help='Sonuçların yazılacağı CSV dosyası')
+    parser.add_argument('--json', help='Sonuçların yazılacağı JSON dosyası')
+    args = parser.parse_args()
+
+    families = [name.strip() for name in args.families.split(',') if name.strip()]
+    unknown = [name for name in families if name not in FAMILIES]
+    if unknown:
+        parser.error(f"Bilinmeyen aile: {', '.join(unknown)}")
+
+    rows = run(args.scenarios, args.seed, families)
+    print_table(rows)
+    metadata = {'scenarios': args.scenarios, 'seed': args.seed}
+    if args.csv:
+        with open(args.csv, 'w', newline='', encoding='utf-8') as handle:
+            writer = csv.DictWriter(handle, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as handle:
+            json.dump({**metadata, 'results': rows}, handle, indent=2, ensure_ascii=False)
@@ -0,0 +1,66 @@
+"""
+Tek başlangıç, sıralı yeniden başlatma ve paralel çoklu başlangıç karşılaştırması.
+
+main.py'deki senaryo (yalnızca ana kaynaktan sentezlenen ölçümler, gürültü
+kaynaklarının ortak kestirimi) rastgele sahnelerde çözülür:
+
+    tek        Mikrofon merkezi + ortalama dB sezgisel başlangıcı
+    sıralı     Aynı başlangıç kümesi aynı süreçte sırayla, erken durma ile
+    paralel    Aynı başlangıç kümesi süreç havuzunda, erken durma ile
+
+Süreç havuzu her çözümde yeniden kurulur; paralel modun süresi bu başlatma
+maliyetini de içerir. Hızlanma yalnızca birden fazla çekirdekte beklenir.
+
+Kullanım: python benchmark_multistart.py [--scenarios 50] [--starts 8] [--workers 4] [--seed 0]
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from batch_localization import random_sources
+from localization_engine import LocalizationEngine, Scene
+
+
+def run(scenarios, starts, workers, seed):
+    rng = np.random.default_rng(seed)
+    cases = []
+    while len(cases) < scenarios:
+        scene = Scene.random(rng=rng)
+        source = random_sources(1, rng)[0]
+        measured_db, blocked = scene.synthesize_measurements(source[:3], source[3])
+        if (~blocked).sum() >= 4:
+            cases.append((scene, source, measured_db, blocked, int(rng.integers(2 ** 31))))
+
+    modes = {
+        'tek': lambda engine, measured_db, blocked, start_seed: engine.localize(measured_db, blocked),
+        'sıralı': lambda engine, measured_db, blocked, start_seed: engine.localize_multistart(
+            measured_db, blocked, starts=starts, workers=1, rng=start_seed),
+        'paralel': lambda engine, measured_db, blocked, start_seed: engine.localize_multistart(
+            measured_db, blocked, starts=starts, workers=workers, rng=start_seed),
+    }
+    print(f"{scenarios} senaryo, {starts} başlangıç, {workers} süreç ({os.cpu_count()} çekirdek)")
+    print(f"{'Mod':<10}{'süre ms (ort)':>15}{'konum hatası p50':>18}{'konum hatası p95':>18}{'dB hatası p50':>15}")
+    for name, solve in modes.items():
+        durations, position_errors, db_errors = [], [], []
+        for scene, source, measured_db, blocked, start_seed in cases:
+            engine = LocalizationEngine(scene)
+            start = time.perf_counter()
+            result = solve(engine, measured_db, blocked, start_seed)
+            durations.append(time.perf_counter() - start)
+            position_errors.append(np.linalg.norm(result.position - source[:3]))
+            db_errors.append(abs(result.db - source[3]))
+        print(f"{name:<10}{np.mean(durations) * 1000:>15.2f}"
+              f"{np.percentile(position_errors, 50):>18.3f}{np.percentile(position_errors, 95):>18.3f}"
+              f"{np.percentile(db_errors, 50):>15.3f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scenarios', type=int, default=50, help='Rastgele senaryo sayısı')
+    parser.add_argument('--starts', type=int, default=8, help='Çoklu başlangıç sayısı')
+    parser.add_argument('--workers', type=int, default=4, help='Paralel moddaki süreç sayısı')
+    parser.add_argument('--seed', type=int, default=0, help='Rastgele sayı üreteci tohumu')
+    args = parser.parse_args()
+    run(args.scenarios, args.starts, args.workers, args.seed)
@@ -0,0 +1,69 @@
+"""
+Binlerce binalı şehir bloğu sahnesinde BVH ile kaba kuvvet engelleme testinin karşılaştırması.
+
+Binalar 1 km x 1 km'lik bir alana rastgele yerleştirilir; mikrofonlar ve ses
+kaynakları aynı alanda rastgele yüksekliklerdedir. Her bina sayısı için BVH
+kurulum süresi, sorgu süresi ve kaba kuvvet (segments_blocked) süresi ölçülür
+ve iki yöntemin sonuçlarının birebir aynı olduğu doğrulanır.
+
+Kullanım: python benchmark_occlusion.py [--buildings 10000] [--mics 1000] [--sources 4] [--seed 0]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from occlusion import BuildingBVH, segments_blocked
+
+AREA_SIZE = 1000.0
+
+
+def random_city(rng, building_count):
+    """Şehir bloğu benzeri rastgele binalar üretir (alt köşe, üst köşe)."""
+    size = np.column_stack([rng.uniform(5, 20, size=(building_count, 2)),
+                            rng.uniform(10, 40, size=building_count)])
+    position = np.column_stack([rng.uniform(0, AREA_SIZE, size=(building_count, 2)) - size[:, :2] / 2,
+                                np.zeros(building_count)])
+    return position, position + size
+
+
+def random_points(rng, count):
+    """Sahne içinde rastgele mikrofon / kaynak konumları üretir."""
+    return np.column_stack([rng.uniform(0, AREA_SIZE, size=(count, 2)), rng.uniform(1, 50, size=count)])
+
+
+def run(building_counts, mic_count, source_count, seed):
+    rng = np.random.default_rng(seed)
+    mics = random_points(rng, mic_count)
+    sources = random_points(rng, source_count)
+    print(f"{mic_count} mikrofon x {source_count} kaynak = {mic_count * source_count} doğru parçası")
+    print(f"{'Bina':>8}{'BVH kurulum ms':>16}{'BVH sorgu ms':>14}{'Kaba kuvvet ms':>16}{'Hızlanma':>10}{'Engellenmiş %':>15}")
+    for building_count in building_counts:
+        box_min, box_max = random_city(rng, building_count)
+
+        start = time.perf_counter()
+        bvh = BuildingBVH(box_min, box_max)
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        fast = bvh.blocked(sources, mics)
+        query_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        brute = segments_blocked(sources, mics, box_min, box_max)
+        brute_time = time.perf_counter() - start
+
+        assert np.array_equal(fast, brute), "BVH sonucu kaba kuvvet taramasından farklı"
+        print(f"{building_count:>8}{build_time * 1000:>16.1f}{query_time * 1000:>14.1f}"
+              f"{brute_time * 1000:>16.1f}{brute_time / query_time:>10.1f}{fast.mean() * 100:>15.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--buildings', type=int, default=10000, help='En büyük bina sayısı')
+    parser.add_argument('--mics', type=int, default=1000, help='Mikrofon sayısı')
+    parser.add_argument('--sources', type=int, default=4, help='Ses kaynağı sayısı')
+    parser.add_argument('--seed', type=int, default=0, help='Rastgele sayı üreteci tohumu')
+    args = parser.parse_args()
+    counts = [count for count in (100, 1000) if count < args.buildings] + [args.buildings]
+    run(counts, args.mics, args.sources, args.seed)
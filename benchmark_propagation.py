@@ -0,0 +1,104 @@
+"""
+Yayılım kaybı ızgarası: ISO 9613-1 soğurmalı kayıp hesabının nokta / saniye verimi.
+
+(mesafe × oktav bandı × sıcaklık × nem) ızgarası şu yollarla hesaplanır:
+
+    python döngüsü   Nokta başına math ile ISO 9613-1 (db-hz4 tarzı; --loop-points alt kümesinde ölçülüp ölçeklenir)
+    tam broadcast    propagation.attenuation, np.ix_ eksenleriyle (ara diziler her çağrıda ayrılır)
+    ızgara           propagation.attenuation_grid: soğurma (F, T, H) boyutunda bir kez, mesafe tek çarpma-toplama
+    ızgara (out)     Aynısı, önceden ayrılmış çıktı dizisine
+
+Ayrıca ileri modelin (18 mikrofon, 3 kaynak) küresel yayılma ve AtmosphericPropagation ile çağrı süresi.
+
+Kullanım: python benchmark_propagation.py [--distances 1000] [--temperatures 25] [--humidities 21] [--repeats 5] [--seed 0]
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from forward_model import predict_db
+from propagation import (
+    KELVIN, OCTAVE_BANDS, REFERENCE_PRESSURE, REFERENCE_TEMPERATURE, TRIPLE_POINT_TEMPERATURE,
+    AtmosphericPropagation, attenuation, attenuation_grid,
+)
+
+
+def scalar_attenuation(distance, frequency, temperature, humidity, pressure=REFERENCE_PRESSURE):
+    """Tek nokta için ISO 9613-1 kayıp (math ile, vektörizasyonsuz)."""
+    T = temperature + KELVIN
+    pr = pressure / REFERENCE_PRESSURE
+    tr = T / REFERENCE_TEMPERATURE
+    h = humidity * 10.0 ** (-6.8346 * (TRIPLE_POINT_TEMPERATURE / T) ** 1.261 + 4.6151) / pr
+    fro = pr * (24.0 + 4.04e4 * h * (0.02 + h) / (0.391 + h))
+    frn = pr * tr ** -0.5 * (9.0 + 280.0 * h * math.exp(-4.170 * (tr ** (-1.0 / 3.0) - 1.0)))
+    f2 = frequency * frequency
+    alpha = 8.686 * f2 * (1.84e-11 / pr * math.sqrt(tr) + tr ** -2.5 * (
+        0.01275 * math.exp(-2239.1 / T) / (fro + f2 / fro) + 0.1068 * math.exp(-3352.0 / T) / (frn + f2 / frn)))
+    return 20.0 * math.log10(distance) + alpha * distance
+
+
+def best_time(function, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def run(n_distances, n_temperatures, n_humidities, repeats, loop_points, seed):
+    rng = np.random.default_rng(seed)
+    distances = np.linspace(1, 1000, n_distances)
+    temperatures = np.linspace(-20, 40, n_temperatures)
+    humidities = np.linspace(10, 100, n_humidities)
+    shape = (len(distances), len(OCTAVE_BANDS), len(temperatures), len(humidities))
+    points = int(np.prod(shape))
+
+    grid = attenuation_grid(distances, OCTAVE_BANDS, temperatures, humidities)
+    out = np.empty_like(grid)
+    d, f, t, h = np.ix_(distances, OCTAVE_BANDS, temperatures, humidities)
+
+    # Python döngüsü: rastgele noktalarda ölçülür, ızgarayla karşılaştırılır
+    sample = [tuple(rng.integers(n) for n in shape) for _ in range(loop_points)]
+    start = time.perf_counter()
+    loop_values = [scalar_attenuation(distances[i], OCTAVE_BANDS[j], temperatures[k], humidities[l])
+                   for i, j, k, l in sample]
+    loop_rate = loop_points / (time.perf_counter() - start)
+    assert np.allclose(loop_values, [grid[index] for index in sample])
+
+    timings = {
+        'tam broadcast': best_time(lambda: attenuation(d, f, t, h), repeats),
+        'ızgara': best_time(lambda: attenuation_grid(distances, OCTAVE_BANDS, temperatures, humidities), repeats),
+        'ızgara (out)': best_time(lambda: attenuation_grid(distances, OCTAVE_BANDS, temperatures, humidities,
+                                                           out=out), repeats),
+    }
+    assert np.allclose(attenuation(d, f, t, h), grid)
+
+    print(f"Izgara {' × '.join(map(str, shape))} = {points / 1e6:.2f} M nokta")
+    print(f"{'Yöntem':<16}{'süre ms':>10}{'M nokta/s':>12}")
+    print(f"{'python döngüsü':<16}{points / loop_rate * 1000:>10.0f}{loop_rate / 1e6:>12.3f}  (tahmin)")
+    for name, elapsed in timings.items():
+        print(f"{name:<16}{elapsed * 1000:>10.1f}{points / elapsed / 1e6:>12.1f}")
+
+    # İleri model çağrısı: küresel yayılma ve atmosferik soğurma
+    mics = rng.uniform([-15, -15, -10], [25, 25, 10], size=(18, 3))
+    params = np.column_stack([rng.uniform([-15, -15, -10], [25, 25, 10], size=(3, 3)), rng.uniform(60, 90, 3)])
+    atmosphere = AtmosphericPropagation(frequency=4000, temperature=15, humidity=50)
+    calls = 2000
+    for name, model in (('küresel', None), (f'{atmosphere.frequency:g} Hz ISO', atmosphere)):
+        elapsed = best_time(lambda: [predict_db(mics, params, None, model) for _ in range(calls)], repeats) / calls
+        print(f"predict_db ({name}): {elapsed * 1e6:.1f} us")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--distances', type=int, default=1000, help='Mesafe ekseni nokta sayısı (1-1000 m)')
+    parser.add_argument('--temperatures', type=int, default=25, help='Sıcaklık ekseni nokta sayısı (-20-40 °C)')
+    parser.add_argument('--humidities', type=int, default=21, help='Bağıl nem ekseni nokta sayısı (%%10-100)')
+    parser.add_argument('--repeats', type=int, default=5, help='Tekrar sayısı (en iyi süre raporlanır)')
+    parser.add_argument('--loop-points', type=int, default=20000, help='Python döngüsüyle ölçülen nokta sayısı')
+    parser.add_argument('--seed', type=int, default=0, help='Rastgele sayı üreteci tohumu')
+    args = parser.parse_args()
+    run(args.distances, args.temperatures, args.humidities, args.repeats, args.loop_points, args.seed)
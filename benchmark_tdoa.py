@@ -0,0 +1,80 @@
+"""
+Kapalı form TDOA çözücülerinin Nelder-Mead ile karşılaştırması.
+
+echoTrace_v0.3.8 senaryosu arayüz olmadan tekrarlanır: 10 m yarıçaplı
+çember üzerinde 18 mikrofon, 1-3 ambient gürültü kaynağı ve gürültü gücüne
+bağlı zaman damgası gürültüsü. Her yöntem aynı senaryolarda çalıştırılır;
+gecikme ve konum hatası raporlanır.
+
+    nelder-mead      Mevcut yol: mikrofon merkezinden Nelder-Mead
+    spherical        Küresel kesişim (tek doğrusal çözüm)
+    chan             Chan'ın iki adımlı ağırlıklı en küçük kareler yöntemi
+    chan+nm          Chan tahmininden başlatılan Nelder-Mead
+
+Kullanım: python benchmark_tdoa.py [--scenarios 500] [--seed 0]
+"""
+import argparse
+import time
+
+import numpy as np
+from scipy.optimize import minimize
+
+from tdoa import SOUND_SPEED, chan, spherical_intersection, tdoa_loss
+
+
+def circular_mics(num_mics=18, radius=10):
+    angles = np.linspace(0, 2 * np.pi, num=num_mics, endpoint=False)
+    return np.column_stack([radius * np.cos(angles), radius * np.sin(angles)])
+
+
+def random_scenario(rng, mics):
+    """v0.3.8 on_click akışıyla aynı: gürültü güçleri, ağırlıklar ve gürültülü zaman damgaları."""
+    noise_count = rng.integers(1, 4)
+    noise_positions = rng.uniform(-15, 25, size=(noise_count, 2))
+    noise_db = rng.uniform(60, 90, size=noise_count)
+    distances = np.maximum(np.linalg.norm(mics[:, None, :] - noise_positions[None], axis=2), 1e-6)
+    noise_powers = (10 ** ((noise_db - 20 * np.log10(distances)) / 10)).sum(axis=1)
+    weights = np.mean(noise_powers) / (noise_powers + 1e-6)
+
+    source = rng.uniform(-15, 25, size=2)
+    noise_std = np.abs(1e-4 * np.log10(noise_powers + 1e-6))
+    time_stamps = np.linalg.norm(mics - source, axis=1) / SOUND_SPEED + rng.normal(0, noise_std)
+    return source, time_stamps, weights
+
+
+def nelder_mead(mics, time_stamps, weights, x0=None):
+    x0 = np.mean(mics, axis=0) if x0 is None else x0
+    return minimize(tdoa_loss, x0, args=(mics, time_stamps, weights), method='Nelder-Mead').x
+
+
+METHODS = {
+    'nelder-mead': lambda mics, t, w: nelder_mead(mics, t, w),
+    'spherical': lambda mics, t, w: spherical_intersection(mics, t, w)[0],
+    'chan': lambda mics, t, w: chan(mics, t, w),
+    'chan+nm': lambda mics, t, w: nelder_mead(mics, t, w, chan(mics, t, w)),
+}
+
+
+def run(scenarios, seed):
+    rng = np.random.default_rng(seed)
+    mics = circular_mics()
+    cases = [random_scenario(rng, mics) for _ in range(scenarios)]
+    print(f"{'Yöntem':<14}{'p50 us':>10}{'p95 us':>10}{'çözüm/s':>10}{'hata p50 m':>12}{'hata p95 m':>12}")
+    for name, method in METHODS.items():
+        latencies, errors = [], []
+        for source, time_stamps, weights in cases:
+            start = time.perf_counter()
+            estimate = method(mics, time_stamps, weights)
+            latencies.append(time.perf_counter() - start)
+            errors.append(np.linalg.norm(estimate - source))
+        print(f"{name:<14}{np.percentile(latencies, 50) * 1e6:>10.0f}{np.percentile(latencies, 95) * 1e6:>10.0f}"
+              f"{len(latencies) / np.sum(latencies):>10.0f}"
+              f"{np.percentile(errors, 50):>12.3f}{np.percentile(errors, 95):>12.3f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scenarios', type=int, default=500, help='Rastgele senaryo sayısı')
+    parser.add_argument('--seed', type=int, default=0, help='Rastgele sayı üreteci tohumu')
+    args = parser.parse_args()
+    run(args.scenarios, args.seed)
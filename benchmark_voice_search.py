@@ -0,0 +1,77 @@
+"""
+Kütüphane ölçeğinde ses benzerliği araması: MFCC gömme deposu sorgu gecikmesi.
+
+Geçici bir dizinde --clips adet sentetik gömme (MFCCStore.add_embeddings) ile
+bir depo oluşturulur; depo yeniden açılır ve rastgele sorgular yapılır:
+
+    döngü          Eski yaklaşım gibi kayıt başına ayrı kosinüs benzerliği (--loop-clips alt kümesinde,
+                   tüm depoya doğrusal ölçeklenmiş)
+    matris-vektör  MFCCStore.query: tek matris-vektör çarpımı + argpartition ile en iyi k
+
+Kullanım: python benchmark_voice_search.py [--clips 100000] [--queries 200] [--k 10] [--seed 0]
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from mfcc_store import DEFAULT_N_MFCC, MFCCStore
+
+
+def cosine_loop(matrix, embedding, k):
+    """Kayıt başına kosinüs benzerliği (normalize edilmemiş vektörlerle, sklearn cosine_similarity gibi)."""
+    scores = []
+    for row in matrix:
+        scores.append(float(row @ embedding / (np.linalg.norm(row) * np.linalg.norm(embedding))))
+    return sorted(range(len(scores)), key=scores.__getitem__, reverse=True)[:k]
+
+
+def run(clips, queries, k, loop_clips, seed):
+    rng = np.random.default_rng(seed)
+    dim = 2 * DEFAULT_N_MFCC
+    embeddings = rng.normal(size=(clips, dim)).astype(np.float32)
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        MFCCStore(directory).add_embeddings([f'clip_{i}' for i in range(clips)], embeddings)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        store = MFCCStore(directory)
+        store.embeddings  # Parçaları birleştir
+        open_time = time.perf_counter() - start
+
+        targets = rng.integers(clips, size=queries)
+        query_vectors = embeddings[targets] + rng.normal(0, 0.05, size=(queries, dim)).astype(np.float32)
+        latencies, hits = [], 0
+        for target, vector in zip(targets, query_vectors):
+            vector = vector / np.linalg.norm(vector)
+            start = time.perf_counter()
+            result = store.query(vector, k)
+            latencies.append(time.perf_counter() - start)
+            hits += result[0][0] == target
+
+        subset = embeddings[:loop_clips]
+        start = time.perf_counter()
+        for vector in query_vectors[:5]:
+            cosine_loop(subset, vector, k)
+        loop_latency = (time.perf_counter() - start) / 5 * clips / loop_clips
+
+    print(f"{clips} kayıt, {dim} boyutlu gömme, {len(store.shards)} parça, k={k}")
+    print(f"Depo yazma: {build * 1000:.0f} ms, açma + birleştirme: {open_time * 1000:.1f} ms")
+    print(f"{'Yöntem':<15}{'p50 ms':>10}{'p95 ms':>10}")
+    print(f"{'döngü (tahmin)':<15}{loop_latency * 1000:>10.0f}{'-':>10}")
+    print(f"{'matris-vektör':<15}{np.percentile(latencies, 50) * 1000:>10.2f}"
+          f"{np.percentile(latencies, 95) * 1000:>10.2f}")
+    print(f"İlk sonuç doğruluğu: {hits}/{queries}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clips', type=int, default=100000, help='Depodaki kayıt sayısı')
+    parser.add_argument('--queries', type=int, default=200, help='Sorgu sayısı')
+    parser.add_argument('--k', type=int, default=10, help='Döndürülen en benzer kayıt sayısı')
+    parser.add_argument('--loop-clips', type=int, default=5000, help='Döngü yöntemi için alt küme boyutu')
+    parser.add_argument('--seed', type=int, default=0, help='Rastgele sayı üreteci tohumu')
+    args = parser.parse_args()
+    run(args.clips, args.queries, args.k, args.loop_clips, args.seed)
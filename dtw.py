@@ -0,0 +1,275 @@
+"""
+MFCC çerçeve dizileri için dinamik zaman bükmesi (DTW) ve budamalı toplu arama.
+
+Tam DTW O(N·M)'dir. Burada üç budama birlikte kullanılır:
+
+1. Sakoe-Chiba bandı: i. sorgu çerçevesi yalnızca aday dizide ölçeklenmiş
+   konumunun ± radius çerçeve yakınıyla eşlenebilir (farklı uzunluklar
+   desteklenir).
+2. LB_Keogh alt sınırı: adayın bant boyunca zarfı (çerçeve başına
+   katsayı min/maks kutusu) ile sorgu arasındaki mesafe DTW maliyetinin
+   altında kalır; sınırı mevcut en iyi sonucu aşan adaylar hiç hizalanmaz.
+3. Erken bırakma: her yol her ters köşegenden (i + j = sabit) geçtiğinden,
+   bir köşegendeki en küçük birikmiş maliyet eşiği aşınca hesap durur.
+
+DTW, ters köşegenler üzerinde NumPy ile vektörize edilir (bir köşegendeki
+hücreler yalnızca önceki iki köşegene bağlıdır). Çerçeve mesafesi Öklid'dir;
+sonuç yol uzunluğu üst sınırı (N + M) ile normalize edilir.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+from scipy.ndimage import maximum_filter1d, minimum_filter1d
+
+# Varsayılan Sakoe-Chiba bant yarıçapı: dizi uzunluğunun oranı
+DEFAULT_BAND_RATIO = 0.1
+
+
+def normalize_frames(frames):
+    """Katsayı başına ortalama / varyans normalizasyonu (CMVN); (T, d) çerçeveler."""
+    frames = np.asarray(frames, dtype=np.float64)
+    return (frames - frames.mean(axis=0)) / np.maximum(frames.std(axis=0), 1e-8)
+
+
+def band_radius(n, m, band_ratio=DEFAULT_BAND_RATIO):
+    """Bant oranından çerçeve cinsinden yarıçap (None: bant yok)."""
+    if band_ratio is None:
+        return None
+    return max(1, int(round(band_ratio * max(n, m))))
+
+
+def sakoe_chiba_band(n, m, radius=None):
+    """
+    Her sorgu çerçevesi i için aday çerçeve aralığı [lo[i], hi[i]] (dahil).
+    Bant, (0, 0) ile (n - 1, m - 1) arasındaki köşegen etrafında ölçeklenir; radius None ise tam matris.
+    """
+    if radius is None:
+        return np.zeros(n, dtype=np.int64), np.full(n, m - 1, dtype=np.int64)
+    center = np.round(np.arange(n) * ((m - 1) / max(n - 1, 1))).astype(np.int64)
+    # Ölçek 1'den büyükse ardışık merkezler arasında boşluk kalmaması için bant genişletilir
+    radius = radius + int(np.ceil(max(m / max(n, 1), 1.0)))
+    return np.maximum(center - radius, 0), np.minimum(center + radius, m - 1)
+
+
+def dtw_distance(x, y, radius=None, abandon_above=np.inf):
+    """
+    İki çerçeve dizisi arasındaki normalize DTW mesafesi.
+    x: (N, d), y: (M, d) çerçeveler
+    radius: Sakoe-Chiba bant yarıçapı (çerçeve); None ise tam DTW
+    abandon_above: Normalize mesafe bu değeri kesin olarak aşacaksa hesap bırakılır ve np.inf döner
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n, m = len(x), len(y)
+    lo, hi = sakoe_chiba_band(n, m, radius)
+    threshold = abandon_above * (n + m)
+    # k = i + j köşegeninde bant içi satırlar: lo[i] + i <= k <= hi[i] + i; iki sınır da i ile
+    # azalmadığından satırlar bitişik bir aralıktır ve ikili aramayla bulunur
+    index = np.arange(n)
+    first_rows = np.searchsorted(hi + index, np.arange(n + m - 1), side='left')
+    stop_rows = np.searchsorted(lo + index, np.arange(n + m - 1), side='right')
+
+    # Birikmiş maliyet, köşegen ve satır indisine göre tutulur: D[k][i] = D(i, k - i)
+    previous2 = np.full(n + 1, np.inf)   # k - 2 köşegeni (indis i + 1 -> satır i, indis 0 -> satır -1)
+    previous = np.full(n + 1, np.inf)    # k - 1 köşegeni
+    current = np.full(n + 1, np.inf)
+    previous_min = np.inf
+    for k in range(n + m - 1):
+        current.fill(np.inf)
+        current_min = np.inf
+        if first_rows[k] < stop_rows[k]:
+            rows = index[first_rows[k]:stop_rows[k]]
+            cols = k - rows
+            diff = x[rows] - y[cols]
+            cost = np.sqrt((diff * diff).sum(axis=1))
+            if k == 0:
+                best = np.zeros(1)
+            else:
+                # (i - 1, j - 1): k - 2 köşegeninde satır i - 1; (i - 1, j): k - 1'de satır i - 1; (i, j - 1): k - 1'de satır i
+                best = np.minimum(np.minimum(previous2[rows], previous[rows]), previous[rows + 1])
+            current[rows + 1] = cost + best
+            current_min = current[rows + 1].min()
+        # Çapraz adım (i - 1, j - 1) -> (i, j) k - 1 köşegenini atlar; her yol k - 1 veya k köşegeninden
+        # geçtiğinden ancak ikisinin de en küçük değeri eşiği aşınca bırakılabilir
+        if min(previous_min, current_min) > threshold:
+            return np.inf
+        previous_min = current_min
+        previous2, previous, current = previous, current, previous2
+    total = previous[n]
+    return total / (n + m) if np.isfinite(total) else np.inf
+
+
+def keogh_envelope(y, n, radius):
+    """
+    Adayın sorgu uzunluğu n'ye göre bant zarfı: sorgu çerçevesi i için bant içindeki aday
+    çerçevelerin katsayı bazında min / maks değerleri. Dönüş: (n, d) alt, (n, d) üst
+    """
+    y = np.asarray(y, dtype=np.float64)
+    lo, hi = sakoe_chiba_band(n, len(y), radius)
+    if radius is None:
+        return np.broadcast_to(y.min(axis=0), (n, y.shape[1])), np.broadcast_to(y.max(axis=0), (n, y.shape[1]))
+    # Tek genişlikli, merkeze göre simetrik pencere: çift genişlikte SciPy penceresi asimetrik olur ve
+    # bandı kapsamayabilir. Yarı genişlik her satırın [lo, hi] aralığını içerecek kadar seçilir; bandın
+    # üst kümesi üzerindeki zarf daha gevşek ama yine geçerli bir alt sınır verir.
+    center = (lo + hi) // 2
+    half = int(np.maximum(hi - center, center - lo).max())
+    upper = maximum_filter1d(y, size=2 * half + 1, axis=0, mode='nearest')
+    lower = minimum_filter1d(y, size=2 * half + 1, axis=0, mode='nearest')
+    return lower[center], upper[center]
+
+
+def dtw_similarity(distance, dim):
+    """
+    Normalize DTW mesafesinden yüzde benzerlik (CMVN uygulanmış çerçeveler için).
+    İlişkisiz iki normalize çerçeve arasındaki beklenen mesafe ~sqrt(2 * dim) olduğundan
+    bu mesafe %0'a, sıfır mesafe %100'e karşılık gelir. DTW yol uzunluğu en fazla N + M olduğundan
+    mesafe 2 ile çarpılarak çerçeve çifti başına ortalamaya yaklaştırılır.
+    """
+    return float(100 * max(0.0, 1 - 2 * distance / np.sqrt(2 * dim)))
+
+
+def lb_keogh(x, envelope):
+    """
+    LB_Keogh alt sınırı (normalize): sorgu çerçevelerinin zarf kutularına Öklid mesafeleri toplamı / (N + M).
+    envelope: keogh_envelope çıktısı ve adayın uzunluğu: (lower, upper, m)
+    """
+    lower, upper, m = envelope
+    x = np.asarray(x, dtype=np.float64)
+    excess = np.maximum(x - upper, 0) + np.maximum(lower - x, 0)
+    return np.sqrt((excess * excess).sum(axis=1)).sum() / (len(x) + m)
+
+
+@dataclass
+class DTWSearchResult:
+    """Toplu DTW aramasının sonuçları ve budama istatistikleri."""
+    indices: list                                   # En yakın k adayın indisleri (artan mesafe)
+    distances: list                                 # Karşılık gelen normalize DTW mesafeleri
+    lower_bounds: np.ndarray = None                 # Aday başına LB_Keogh
+    pruned: int = 0                                 # Alt sınırla elenen aday sayısı
+    abandoned: int = 0                              # Erken bırakılan hizalama sayısı
+    completed: int = 0                              # Tamamlanan hizalama sayısı
+    all_distances: np.ndarray = field(default=None, repr=False)  # Aday başına mesafe (elenen / bırakılan: inf)
+
+
+class _TopK:
+    """İş parçacıkları arasında paylaşılan en iyi k sonuç; eşik k. en iyi mesafedir."""
+
+    def __init__(self, k):
+        self.k = k
+        self.items = []
+        self.lock = threading.Lock()
+
+    @property
+    def threshold(self):
+        return self.items[-1][0] if len(self.items) >= self.k else np.inf
+
+    def offer(self, distance, index):
+        with self.lock:
+            if distance < self.threshold:
+                self.items.append((distance, index))
+                self.items.sort()
+                del self.items[self.k:]
+
+
+def dtw_search(query, candidates, band_ratio=DEFAULT_BAND_RATIO, k=1, workers=None, prune=True, envelopes=None):
+    """
+    Sorguya DTW ile en yakın k adayı bulur.
+    query: (N, d) çerçeveler; candidates: (M_i, d) çerçeve dizileri
+    band_ratio: Sakoe-Chiba bant oranı (None: tam DTW)
+    workers: İş parçacığı sayısı (1: sıralı; None: ThreadPoolExecutor varsayılanı)
+    prune: False ise alt sınır ve erken bırakma kullanılmaz (karşılaştırma için)
+    envelopes: İsteğe bağlı önceden hesaplanmış aday zarfları (aynı sorgu uzunluğu için yeniden kullanım)
+    """
+    query = np.asarray(query, dtype=np.float64)
+    n = len(query)
+    radii = [band_radius(n, len(candidate), band_ratio) for candidate in candidates]
+    lower_bounds = np.zeros(len(candidates))
+    if prune:
+        if envelopes is None:
+            envelopes = [(*keogh_envelope(candidate, n, radius), len(candidate))
+                         for candidate, radius in zip(candidates, radii)]
+        lower_bounds = np.array([lb_keogh(query, envelope) for envelope in envelopes])
+
+    top = _TopK(k)
+    distances = np.full(len(candidates), np.inf)
+    counts = {'pruned': 0, 'abandoned': 0, 'completed': 0}
+    counts_lock = threading.Lock()
+
+    def align(index):
+        threshold = top.threshold if prune else np.inf
+        if prune and lower_bounds[index] >= threshold:
+            outcome = 'pruned'
+        else:
+            distance = dtw_distance(query, candidates[index], radii[index], abandon_above=threshold)
+            distances[index] = distance
+            outcome = 'completed' if np.isfinite(distance) else 'abandoned'
+            if np.isfinite(distance):
+                top.offer(distance, index)
+        with counts_lock:
+            counts[outcome] += 1
+
+    # En umut verici adaylar önce: eşik hızla düşer, sonraki adaylar daha çok budanır
+    order = np.argsort(lower_bounds, kind='stable')
+    if workers == 1:
+        for index in order:
+            align(index)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(align, order))
+
+    return DTWSearchResult(
+        indices=[index for _, index in top.items], distances=[distance for distance, _ in top.items],
+        lower_bounds=lower_bounds, all_distances=distances, **counts,
+    )
+
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+
+    def python_dtw(x, y):
+        """Referans: saf Python tam DTW."""
+        n, m = len(x), len(y)
+        D = np.full((n + 1, m + 1), np.inf)
+        D[0, 0] = 0
+        for i in range(1, n + 1):
+            for j in range(1, m + 1):
+                D[i, j] = np.linalg.norm(x[i - 1] - y[j - 1]) + min(D[i - 1, j - 1], D[i - 1, j], D[i, j - 1])
+        return D[n, m] / (n + m)
+
+    x = rng.normal(size=(40, 13))
+    y = rng.normal(size=(55, 13))
+    assert np.isclose(dtw_distance(x, y), python_dtw(x, y))
+    # Bant daraldıkça mesafe artmalı veya eşit kalmalı; alt sınır bantlı DTW'yi aşmamalı
+    for radius in (2, 5, 10):
+        banded = dtw_distance(x, y, radius)
+        assert banded >= dtw_distance(x, y) - 1e-12
+        assert lb_keogh(x, (*keogh_envelope(y, len(x), radius), len(y))) <= banded + 1e-12
+        assert dtw_distance(x, y, radius, abandon_above=banded * 0.5) == np.inf
+
+    # Alt sınır, kısa ve uzun her uzunluk / bant bileşiminde bantlı DTW'yi aşmamalı
+    for _ in range(3000):
+        n, m = rng.integers(1, 12, size=2) if rng.random() < 0.8 else rng.integers(50, 200, size=2)
+        a, b = rng.normal(size=(n, 3)), rng.normal(size=(m, 3))
+        radius = int(rng.integers(1, 6))
+        assert lb_keogh(a, (*keogh_envelope(b, n, radius), m)) <= dtw_distance(a, b, radius) + 1e-12, (n, m, radius)
+
+    # Erken bırakma, k - 1 köşegenini atlayan çapraz adımlı yolu kesmemeli
+    diagonal = np.array([[0.0, 0.0], [10.0, 0.0]])
+    assert dtw_distance(diagonal, diagonal, abandon_above=0.1) == 0.0
+
+    # Budamalı arama, budamasız aramayla aynı en yakın adayları bulmalı
+    library = [rng.normal(size=(rng.integers(5, 40), 4)) for _ in range(40)]
+    for _ in range(300):
+        query = rng.normal(size=(rng.integers(5, 40), 4))
+        exact = dtw_search(query, library, k=3, workers=1, prune=False)
+        fast = dtw_search(query, library, k=3, workers=1)
+        assert fast.indices == exact.indices and np.allclose(fast.distances, exact.distances)
+    candidates = [rng.normal(size=(rng.integers(30, 60), 13)) for _ in range(30)]
+    candidates[17] = x[np.sort(rng.integers(0, 40, size=45))] + rng.normal(0, 0.1, (45, 13))
+    exact = dtw_search(x, candidates, k=3, workers=1, prune=False)
+    fast = dtw_search(x, candidates, k=3, workers=2)
+    assert fast.indices == exact.indices and fast.indices[0] == 17
+    assert np.allclose(fast.distances, exact.distances)
+    print(f"DTW kontrolü: OK (budanan {fast.pruned}, bırakılan {fast.abandoned}, tamamlanan {fast.completed})")
@@ -3,7 +3,7 @@ import numpy as np
 from PyQt5 import QtCore, QtWidgets
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QVBoxLayout, QHBoxLayout,
-    QWidget, QPushButton, QTextEdit, QLabel, QScrollArea
+    QWidget, QPushButton, QTextEdit, QLabel, QScrollArea, QCheckBox
 )
 from PyQt5.QtCore import Qt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
@@ -11,6 +11,7 @@ from matplotlib.figure import Figure
 from scipy.optimize import minimize
 import math
 import random
+from tdoa import chan, tdoa_loss
 
 # Ses hızı (m/s)
 SOUND_SPEED = 343
@@ -38,6 +39,9 @@ class SoundSourceLocalization(QMainWindow):
         self.calculation_steps = ""
         self.picked_mic = None
         self.average_db = None  # Ortalama desibel değeri
+        self.refine_tdoa = True  # False: yalnızca kapalı form (Chan) tahmini, Nelder-Mead atlanır
+        self.show_calculation_steps = False  # True: çift başına hesaplama adımları raporu üretilir
+        self._pair_indices = None  # (mikrofon sayısı, üst üçgen çift indisleri) önbelleği
 
         # Ambient Gürültü Kaynakları (Çoklu)
         self.noise_sources = self.generate_multiple_noise_sources()
@@ -73,6 +77,12 @@ class SoundSourceLocalization(QMainWindow):
         self.reset_button.clicked.connect(self.reset_mic_positions)
         control_layout.addWidget(self.reset_button)
 
+        # Çift başına hesaplama adımları raporu (büyük dizilerde yavaş olduğundan varsayılan kapalı)
+        self.steps_checkbox = QCheckBox('Hesaplama adımlarını göster')
+        self.steps_checkbox.setChecked(self.show_calculation_steps)
+        self.steps_checkbox.toggled.connect(self.set_show_calculation_steps)
+        control_layout.addWidget(self.steps_checkbox)
+
         # Hesaplama Adımları
         self.text_box = QTextEdit()
         self.text_box.setReadOnly(True)
@@ -166,45 +176,76 @@ class SoundSourceLocalization(QMainWindow):
         weights = avg_noise_power / (noise_powers + 1e-6)  # 1e-6 ile sıfıra bölünmeyi önleyin
         return weights
 
+    def pair_indices(self, num_mics):
+        """Mikrofon çiftleri (i < j) için üst üçgen indis dizileri; mikrofon sayısı başına bir kez hesaplanır."""
+        if self._pair_indices is None or self._pair_indices[0] != num_mics:
+            self._pair_indices = (num_mics, np.triu_indices(num_mics, k=1))
+        return self._pair_indices[1]
+
+    def pair_residuals(self, source_pos, mic_positions, time_stamps, weights):
+        """
+        Tüm mikrofon çiftleri için TDOA artıklarını tek vektörize geçişte hesaplar.
+        Dönüş: (i, j) indisleri, gözlenen ve tahmini mesafe farkları, artık ve ağırlıklı artık dizileri
+        """
+        i, j = self.pair_indices(len(mic_positions))
+        distances = np.maximum(np.linalg.norm(mic_positions - np.asarray(source_pos), axis=1), 1e-6)
+        observed_delta_d = (time_stamps[i] - time_stamps[j]) * SOUND_SPEED
+        predicted_delta_d = distances[i] - distances[j]
+        residual = observed_delta_d - predicted_delta_d
+        weighted_residual = weights[i] * weights[j] * residual ** 2
+        return i, j, observed_delta_d, predicted_delta_d, residual, weighted_residual
+
     def tdoa_loss(self, source_pos, mic_positions, time_stamps, weights):
-        """Ağırlıklı TDOA kayıp fonksiyonu."""
-        total_loss = 0.0
-        steps = []
-        num_mics = len(mic_positions)
-        for i in range(num_mics):
-            for j in range(i + 1, num_mics):
-                observed_delta_d = (time_stamps[i] - time_stamps[j]) * SOUND_SPEED
-                dist_i = self.calculate_distance(mic_positions[i], source_pos)
-                dist_j = self.calculate_distance(mic_positions[j], source_pos)
-                predicted_delta_d = dist_i - dist_j
-                residual = observed_delta_d - predicted_delta_d
-                weighted_residual = weights[i] * weights[j] * residual ** 2
-                total_loss += weighted_residual
-
-                step_info = (
-                    f"Çift ({i+1}, {j+1}):\n"
-                    f"  Zaman Farkı (t{i+1} - t{j+1}): {time_stamps[i] - time_stamps[j]:.6e} s\n"
-                    f"  Gerçek Mesafe Farkı (d{i+1} - d{j+1}): {observed_delta_d:.6f} m\n"
-                    f"  Tahmini Mesafe Farkı: {predicted_delta_d:.6f} m\n"
-                    f"  Kalan (Residual): {residual:.6f}\n"
-                    f"  Ağırlıklı Residual: {weighted_residual:.6f}\n"
-                )
-                steps.append(step_info)
+        """Ağırlıklı TDOA kayıp fonksiyonu (tdoa.tdoa_loss, O(M); optimizasyon sırasında metin üretmez)."""
+        return tdoa_loss(source_pos, mic_positions, time_stamps, weights, SOUND_SPEED)
 
-        self.calculation_steps = "\n".join(steps)
-        return total_loss
+    def build_calculation_steps(self, source_pos, mic_positions, time_stamps, weights):
+        """Yakınsamadan sonra, bulunan konum için çift başına hesaplama adımları metnini bir kez üretir."""
+        i, j, observed, predicted, residual, weighted = self.pair_residuals(
+            source_pos, mic_positions, time_stamps, weights)
+        steps = []
+        for k in range(len(i)):
+            a, b = i[k] + 1, j[k] + 1
+            steps.append(
+                f"Çift ({a}, {b}):\n"
+                f"  Zaman Farkı (t{a} - t{b}): {time_stamps[i[k]] - time_stamps[j[k]]:.6e} s\n"
+                f"  Gerçek Mesafe Farkı (d{a} - d{b}): {observed[k]:.6f} m\n"
+                f"  Tahmini Mesafe Farkı: {predicted[k]:.6f} m\n"
+                f"  Kalan (Residual): {residual[k]:.6f}\n"
+                f"  Ağırlıklı Residual: {weighted[k]:.6f}\n"
+            )
+        return "\n".join(steps)
 
     def find_sound_source(self, mic_positions, time_stamps, weights):
         """Ses kaynağının konumunu optimize eder."""
-        initial_guess = np.mean(mic_positions, axis=0)
+        # Chan yöntemiyle kapalı form başlangıç tahmini (tek küçük doğrusal çözüm)
+        initial_guess = chan(mic_positions, time_stamps, weights, sound_speed=SOUND_SPEED)
+        if not np.all(np.isfinite(initial_guess)):
+            initial_guess = np.mean(mic_positions, axis=0)
+        if not self.refine_tdoa:
+            # Hızlı yol: Nelder-Mead atlanır
+            self.update_calculation_steps(initial_guess, mic_positions, time_stamps, weights)
+            return initial_guess
         result = minimize(
             self.tdoa_loss,
             initial_guess,
             args=(mic_positions, time_stamps, weights),
             method='Nelder-Mead'
         )
+        self.update_calculation_steps(result.x, mic_positions, time_stamps, weights)
         return result.x
 
+    def set_show_calculation_steps(self, checked):
+        """Hesaplama adımları raporunu açar / kapatır; değişiklik bir sonraki tahminde uygulanır."""
+        self.show_calculation_steps = checked
+
+    def update_calculation_steps(self, source_pos, mic_positions, time_stamps, weights):
+        """Hesaplama adımları isteniyorsa (show_calculation_steps) rapor metnini günceller."""
+        if self.show_calculation_steps:
+            self.calculation_steps = self.build_calculation_steps(source_pos, mic_positions, time_stamps, weights)
+        else:
+            self.calculation_steps = ""
+
     def on_click(self, event):
         if event.inaxes == self.ax:
             if event.button == 1:
@@ -12,6 +12,7 @@ from scipy.optimize import minimize
 import math
 import random
 from mpl_toolkits.mplot3d import Axes3D
+from forward_model import squared_error_and_gradient
 
 # Ses hızı (m/s)
 SOUND_SPEED = 343
@@ -434,40 +435,25 @@ class SoundSourceLocalization3D(QMainWindow):
         filtered_measured_db = [measured_db[i] for i in unblocked_mic_indices]
         filtered_mic_positions = [self.mic_positions[i] for i in unblocked_mic_indices]
 
+        # Ambient gürültü kaynakları sabit parametre bloğu olarak ileri modele eklenir
+        noise_params = np.ravel([list(noise['position']) + [noise['db']] for noise in self.noise_sources])
+
         # Ses kaynağının yerini ve D (desibel) değerini tahmin et
         def objective_function(pos_dB):
             """
             Optimizasyon fonksiyonu.
             pos_dB: [x, y, z, D] tahmin edilen pozisyon ve desibel değeri
             Hedef, tahmin edilen dB değerleri ile ölçülen dB değerleri arasındaki toplam kare hatayı minimize etmektir.
+            Kare hata ile birlikte yalnızca ana kaynağa ait analitik gradyanı döndürür (jac=True).
             """
-            x, y, z, D = pos_dB
-            total_error = 0
-            for i, mic in enumerate(filtered_mic_positions):
-                # Tahmin edilen pozisyondan mikrofon konumuna mesafe
-                distance = self.calculate_distance(mic, pos_dB[:3])
-                if distance <= 0:
-                    predicted_db = D  # Maksimum dB
-                else:
-                    predicted_db = self.calculate_db(distance, D)
-                # Ambient gürültüyü ekle
-                total_power = 10 ** (predicted_db / 10)
-                for noise in self.noise_sources:
-                    n_distance = self.calculate_distance(mic, noise['position'])
-                    n_db = self.calculate_db(n_distance, noise['db'])
-                    n_power = 10 ** (n_db / 10)
-                    total_power += n_power
-                # Tahmin edilen toplam dB değeri
-                total_db = 10 * math.log10(total_power) if total_power > 0 else 0
-                # Hata hesapla
-                error = (total_db - filtered_measured_db[i]) ** 2
-                total_error += error
-            return total_error
+            params = np.concatenate([pos_dB, noise_params])
+            error, gradient = squared_error_and_gradient(params, filtered_mic_positions, filtered_measured_db)
+            return error, gradient[:4]
 
         # Optimizasyon için başlangıç tahminini belirle (mikrofonların ortalaması ve ortalama dB)
         x0 = list(np.mean(filtered_mic_positions, axis=0)) + [self.average_db]
         # Optimizasyon işlemini gerçekleştir (BFGS yöntemi ile)
-        res = minimize(objective_function, x0, method='BFGS')
+        res = minimize(objective_function, x0, method='BFGS', jac=True)
         estimated_pos = res.x[:3]  # Tahmin edilen pozisyon
         estimated_D = res.x[3]  # Tahmin edilen desibel değeri
 
@@ -712,40 +698,25 @@ class SoundSourceLocalization3D(QMainWindow):
         filtered_measured_db = [measured_db[i] for i in unblocked_mic_indices]
         filtered_mic_positions = [self.mic_positions[i] for i in unblocked_mic_indices]
 
+        # Ambient gürültü kaynakları sabit parametre bloğu olarak ileri modele eklenir
+        noise_params = np.ravel([list(noise['position']) + [noise['db']] for noise in self.noise_sources])
+
         # Ses kaynağının yerini ve D (desibel) değerini tahmin et
         def objective_function(pos_dB):
             """
             Optimizasyon fonksiyonu.
             pos_dB: [x, y, z, D] tahmin edilen pozisyon ve desibel değeri
             Hedef, tahmin edilen dB değerleri ile ölçülen dB değerleri arasındaki toplam kare hatayı minimize etmektir.
+            Kare hata ile birlikte yalnızca ana kaynağa ait analitik gradyanı döndürür (jac=True).
             """
-            x, y, z, D = pos_dB
-            total_error = 0
-            for i, mic in enumerate(filtered_mic_positions):
-                # Tahmin edilen pozisyondan mikrofon konumuna mesafe
-                distance = self.calculate_distance(mic, pos_dB[:3])
-                if distance <= 0:
-                    predicted_db = D  # Maksimum dB
-                else:
-                    predicted_db = self.calculate_db(distance, D)
-                # Ambient gürültüyü ekle
-                total_power = 10 ** (predicted_db / 10)
-                for noise in self.noise_sources:
-                    n_distance = self.calculate_distance(mic, noise['position'])
-                    n_db = self.calculate_db(n_distance, noise['db'])
-                    n_power = 10 ** (n_db / 10)
-                    total_power += n_power
-                # Tahmin edilen toplam dB değeri
-                total_db = 10 * math.log10(total_power) if total_power > 0 else 0
-                # Hata hesapla
-                error = (total_db - filtered_measured_db[i]) ** 2
-                total_error += error
-            return total_error
+            params = np.concatenate([pos_dB, noise_params])
+            error, gradient = squared_error_and_gradient(params, filtered_mic_positions, filtered_measured_db)
+            return error, gradient[:4]
 
         # Optimizasyon için başlangıç tahminini belirle (mikrofonların ortalaması ve ortalama dB)
         x0 = list(np.mean(filtered_mic_positions, axis=0)) + [self.average_db]
         # Optimizasyon işlemini gerçekleştir (BFGS yöntemi ile)
-        res = minimize(objective_function, x0, method='BFGS')
+        res = minimize(objective_function, x0, method='BFGS', jac=True)
         estimated_pos = res.x[:3]  # Tahmin edilen pozisyon
         estimated_D = res.x[3]  # Tahmin edilen desibel değeri
 
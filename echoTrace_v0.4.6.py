@@ -9,13 +9,35 @@ from PyQt5.QtCore import Qt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 from scipy.optimize import minimize
+import itertools
 import math
 import random
 from mpl_toolkits.mplot3d import Axes3D
+from forward_model import squared_error_and_gradient
+from occlusion import BuildingBVH, boxes_from_buildings, segments_blocked
+from visibility import VisibilityField
+from scene_artists import SceneArtists, ray_segments
+from localization_worker import LocalizationWorker
 
 # Ses hızı (m/s)
 SOUND_SPEED = 343
 
+# Grafik öğelerinin görünümü (scene_artists.SceneArtists stili)
+PLOT_STYLE = {
+    'mics': dict(color='blue', s=80, label='Mikrofonlar'),
+    'mic_labels': dict(fontsize=7),
+    'noise': dict(color='orange', s=100, marker='x', label='Gürültü 1'),
+    'noise_labels': dict(fontsize=8, color='orange'),
+    'estimated_noise': dict(color='purple', s=80, marker='v', alpha=0.7),
+    'estimated_noise_labels': None,
+    'source': dict(color='red', s=200, marker='o', label='Gerçek Ses Kaynağı'),
+    'source_label': None,
+    'estimate': dict(color='green', s=150, marker='^', label='Tahmin Edilen'),
+    'estimate_label': None,
+    'building': dict(color='gray', alpha=0.7, shade=True),
+    'rays': dict(linewidths=0.5),
+}
+
 class SoundSourceLocalization3D(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -38,23 +60,25 @@ class SoundSourceLocalization3D(QMainWindow):
         
         # Binalar
         self.buildings = self.generate_buildings(random.randint(2, 3))
+        self.building_bvh = BuildingBVH.from_buildings(self.buildings)  # Engelleme sorguları için BVH
+        
+        # Mikrofon görünürlük alanı (mikrofonlar veya binalar değişene kadar önbellekte tutulur)
+        self.visibility_resolution = 1.0  # Voksel kenar uzunluğu (m)
+        self.visibility_field = None
         
         # Hesaplama değişkenleri
         self.calculation_steps = ""
         self.average_db = None
         
-        # Grafik elemanları için referanslar
-        self.mic_scatter = None
-        self.mic_texts = []
-        self.noise_scatter = []
-        self.noise_texts = []
-        self.estimated_noise_scatter = []
-        self.estimated_noise_texts = []
-        self.source_scatter = None
-        self.source_text = None
-        self.estimated_scatter = None
-        self.estimated_text = None
-        self.source_to_mic_lines = []
+        # Grafik elemanları bir kez oluşturulur ve yerinde güncellenir (initial_plot)
+        self.artists = None
+        self.info_labels = []  # Bilgi panelinde yeniden kullanılan QLabel'lar
+        
+        # L-BFGS-B çözümü arka planda çalışır; yeni bir istek devam eden eski isteği geçersiz kılar
+        self.worker = LocalizationWorker(self)
+        self.worker.progress.connect(self.on_localization_progress)
+        self.worker.finished.connect(self.on_localization_finished)
+        self.worker.failed.connect(self.on_localization_failed)
         
         # UI başlatma
         self.initUI()
@@ -105,6 +129,10 @@ class SoundSourceLocalization3D(QMainWindow):
         self.add_source_button.clicked.connect(self.add_random_sound_source)
         control_layout.addWidget(self.add_source_button)
         
+        # Çözüm durumu: arka plandaki optimizasyonun iterasyon sayısı ve güncel hatası
+        self.solve_status_label = QLabel("Optimizasyon: Hazır")
+        control_layout.addWidget(self.solve_status_label)
+        
         # Hesaplama detayları
         control_layout.addWidget(QLabel("Hesaplama Detayları:"))
         self.text_box = QTextEdit()
@@ -183,47 +211,28 @@ class SoundSourceLocalization3D(QMainWindow):
     
     def is_path_blocked(self, start_point, end_point):
         """İki nokta arasındaki yolun bina tarafından engellenip engellenmediğini kontrol eder."""
-        for building in self.buildings:
-            if self.line_intersects_box(start_point, end_point, building):
-                return True
-        return False
+        return bool(self.blocked_matrix([start_point], [end_point])[0, 0])
+    
+    def blocked_matrix(self, start_points, end_points):
+        """Tüm başlangıç-bitiş çiftleri için (N, M) engellenme maskesini tek seferde hesaplar."""
+        return self.building_bvh.blocked(start_points, end_points)
     
     def line_intersects_box(self, p0, p1, box):
         """Çizgi-kutu kesişim kontrolü."""
-        x_min, y_min, z_min = box['position']
-        x_max = x_min + box['size'][0]
-        y_max = y_min + box['size'][1]
-        z_max = z_min + box['size'][2]
-        
-        box_min = np.array([x_min, y_min, z_min])
-        box_max = np.array([x_max, y_max, z_max])
-        p0 = np.array(p0)
-        p1 = np.array(p1)
-        
-        direction = p1 - p0
-        tmin = 0.0
-        tmax = 1.0
-        
-        for i in range(3):
-            if abs(direction[i]) < 1e-8:
-                if p0[i] < box_min[i] or p0[i] > box_max[i]:
-                    return False
-            else:
-                ood = 1.0 / direction[i]
-                t1 = (box_min[i] - p0[i]) * ood
-                t2 = (box_max[i] - p0[i]) * ood
-                t_enter = min(t1, t2)
-                t_exit = max(t1, t2)
-                tmin = max(tmin, t_enter)
-                tmax = min(tmax, t_exit)
-                if tmin > tmax:
-                    return False
-        return True
+        return bool(segments_blocked([p0], [p1], *boxes_from_buildings([box]))[0, 0])
+    
+    def get_visibility_field(self):
+        """Görünürlük alanını döndürür; yalnızca mikrofonlar, binalar veya çözünürlük değiştiğinde yeniden hesaplar."""
+        if (self.visibility_field is None
+                or self.visibility_field.resolution != self.visibility_resolution
+                or not self.visibility_field.matches(self.mic_positions, self.building_bvh)):
+            self.visibility_field = VisibilityField(
+                self.mic_positions, self.building_bvh, resolution=self.visibility_resolution
+            )
+        return self.visibility_field
     
     def initial_plot(self):
-        """Başlangıç grafiğini oluşturur."""
-        self.ax.clear()
-        
+        """Başlangıç grafiğini oluşturur; grafik öğeleri bir kez kurulur."""
         # Eksen ayarları
         self.ax.set_title('3D Ses Kaynağı Lokalizasyon Simülasyonu')
         self.ax.set_xlabel('X (m)')
@@ -234,62 +243,9 @@ class SoundSourceLocalization3D(QMainWindow):
         self.ax.set_zlim([-5, 20])
         self.ax.view_init(elev=25, azim=-60)
         
-        # Mikrofonları çiz
-        self.mic_scatter = self.ax.scatter(
-            self.mic_positions[:, 0],
-            self.mic_positions[:, 1],
-            self.mic_positions[:, 2],
-            color='blue', s=80, label='Mikrofonlar'
-        )
-        
-        # Mikrofon etiketleri
-        self.mic_texts = []
-        for i, pos in enumerate(self.mic_positions):
-            text = self.ax.text(
-                pos[0], pos[1], pos[2],
-                f'M{i+1}', fontsize=7
-            )
-            self.mic_texts.append(text)
-        
-        # Gürültü kaynaklarını çiz
-        self.noise_scatter = []
-        self.noise_texts = []
-        for idx, noise in enumerate(self.noise_sources):
-            scatter = self.ax.scatter(
-                noise['position'][0],
-                noise['position'][1],
-                noise['position'][2],
-                color='orange', s=100, marker='x',
-                label=f'Gürültü {idx+1}' if idx == 0 else ""
-            )
-            self.noise_scatter.append(scatter)
-            
-            text = self.ax.text(
-                noise['position'][0],
-                noise['position'][1],
-                noise['position'][2],
-                f" {noise['db']:.1f} dB",
-                fontsize=8, color='orange'
-            )
-            self.noise_texts.append(text)
-        
-        # Binaları çiz
-        for building in self.buildings:
-            x, y, z = building['position']
-            dx, dy, dz = building['size']
-            self.ax.bar3d(x, y, z, dx, dy, dz,
-                         color='gray', alpha=0.7, shade=True)
-        
-        # Boş ses kaynağı scatter'ları
-        self.source_scatter = self.ax.scatter(
-            [], [], [], color='red', s=200,
-            marker='o', label='Gerçek Ses Kaynağı'
-        )
-        
-        self.estimated_scatter = self.ax.scatter(
-            [], [], [], color='green', s=150,
-            marker='^', label='Tahmin Edilen'
-        )
+        # Mikrofonlar, gürültü kaynakları, binalar, ses kaynakları ve ışınlar
+        self.artists = SceneArtists(self.ax, PLOT_STYLE)
+        self.update_plot()
         
         self.ax.legend(loc='upper right', fontsize=8)
         self.canvas.draw()
@@ -303,26 +259,36 @@ class SoundSourceLocalization3D(QMainWindow):
         self.source_point = np.array([x, y, z])
         self.source_db = np.random.uniform(75, 95)
         
-        # Lokalizasyon işlemini başlat
+        # Önceki kaynağın tahmini, yeni çözüm gelene kadar gösterilmez
+        self.estimated_point = None
+        self.estimated_db = None
+        self.estimated_noise_sources = []
+        
+        # Lokalizasyon işlemini başlat (çözüm arka planda, sonuç on_localization_finished ile gelir)
         self.perform_localization()
         self.update_plot()
     
     def perform_localization(self):
-        """Ses kaynağı lokalizasyonunu gerçekleştirir."""
+        """
+        Ses kaynağı lokalizasyonunu başlatır.
+        Ölçümler ana iş parçacığında hesaplanır; L-BFGS-B optimizasyonu arka plan işçisinde çalışır.
+        """
         if self.source_point is None:
             return
         
         # Mikrofonlarda ölçülen dB değerlerini hesapla
         measured_db = []
-        mic_blocked = []
         self.calculation_steps = "=== ÖLÇÜM SONUÇLARI ===\n\n"
         
+        # Tüm kaynak-mikrofon yolları için engellenme maskeleri (tek seferde)
+        mic_blocked = self.blocked_matrix([self.source_point], self.mic_positions)[0]
+        noise_blocked = self.blocked_matrix([noise['position'] for noise in self.noise_sources], self.mic_positions)
+        
         for i, mic_pos in enumerate(self.mic_positions):
             total_power = 0
             
             # Ana ses kaynağından gelen ses
-            blocked = self.is_path_blocked(self.source_point, mic_pos)
-            mic_blocked.append(blocked)
+            blocked = mic_blocked[i]
             
             if not blocked:
                 dist = self.calculate_distance(mic_pos, self.source_point)
@@ -334,8 +300,8 @@ class SoundSourceLocalization3D(QMainWindow):
                 self.calculation_steps += f"M{i+1}: Kaynak ENGELLENMİŞ\n"
             
             # Gürültü kaynaklarından gelen ses
-            for noise in self.noise_sources:
-                if not self.is_path_blocked(noise['position'], mic_pos):
+            for j, noise in enumerate(self.noise_sources):
+                if not noise_blocked[j, i]:
                     dist = self.calculate_distance(mic_pos, noise['position'])
                     db = self.calculate_db(dist, noise['db'])
                     power = 10 ** (db / 10)
@@ -349,6 +315,7 @@ class SoundSourceLocalization3D(QMainWindow):
         unblocked_indices = [i for i, blocked in enumerate(mic_blocked) if not blocked]
         
         if len(unblocked_indices) < 4:
+            self.worker.cancel()
             self.calculation_steps += "\n⚠️ Yetersiz engellenmemiş mikrofon!\n"
             self.text_box.setPlainText(self.calculation_steps)
             return
@@ -356,42 +323,22 @@ class SoundSourceLocalization3D(QMainWindow):
         filtered_mics = self.mic_positions[unblocked_indices]
         filtered_db = [measured_db[i] for i in unblocked_indices]
         
-        # Optimizasyon
+        # Önceden hesaplanmış görünürlük alanı (optimizasyon boyunca sabit)
+        visibility_field = self.get_visibility_field()
+        self.calculation_steps += f"\nGörünürlük alanı: {visibility_field.describe()}\n"
+        
         def objective(params):
-            """Hedef fonksiyon: ölçülen ve tahmin edilen dB farkını minimize et."""
-            # Ana ses kaynağı parametreleri
-            x, y, z, source_db = params[:4]
-            
-            # Gürültü kaynakları parametreleri
-            noise_params = params[4:].reshape(-1, 4)
+            """
+            Hedef fonksiyon: ölçülen ve tahmin edilen dB farkını minimize et.
+            Engellenme durumu parametrelere göre parçalı sabit olduğundan gradyan,
+            mevcut görünürlük maskesi ile analitik olarak hesaplanır (jac=True).
+            """
+            sources = params.reshape(-1, 4)
             
-            total_error = 0
-            for i, mic_pos in enumerate(filtered_mics):
-                # Tahmin edilen toplam güç
-                predicted_power = 0
-                
-                # Ana kaynak
-                if not self.is_path_blocked([x, y, z], mic_pos):
-                    dist = self.calculate_distance(mic_pos, [x, y, z])
-                    db = self.calculate_db(dist, source_db)
-                    predicted_power += 10 ** (db / 10)
-                
-                # Gürültü kaynakları
-                for n_params in noise_params:
-                    n_x, n_y, n_z, n_db = n_params
-                    if not self.is_path_blocked([n_x, n_y, n_z], mic_pos):
-                        dist = self.calculate_distance(mic_pos, [n_x, n_y, n_z])
-                        db = self.calculate_db(dist, n_db)
-                        predicted_power += 10 ** (db / 10)
-                
-                # Tahmin edilen toplam dB
-                predicted_db = 10 * np.log10(predicted_power) if predicted_power > 0 else 0
-                
-                # Hata
-                error = (predicted_db - filtered_db[i]) ** 2
-                total_error += error
+            # Her mikrofon x kaynak yolu için görünürlük maskesi (voksel alanından okuma)
+            visible = visibility_field.lookup(sources[:, :3], mic_indices=unblocked_indices).T
             
-            return total_error
+            return squared_error_and_gradient(params, filtered_mics, filtered_db, visible)
         
         # Başlangıç tahmini
         x0 = []
@@ -413,8 +360,27 @@ class SoundSourceLocalization3D(QMainWindow):
                 (-15, 25), (-15, 25), (-5, 15), (50, 90)  # Gürültü kaynakları
             ])
         
-        # Optimizasyon
-        result = minimize(objective, x0, method='L-BFGS-B', bounds=bounds)
+        # Optimizasyon (arka planda); her iterasyonda güncel hata ilerleme olarak bildirilir
+        def solve(callback):
+            iteration = itertools.count(1)
+            return minimize(objective, x0, method='L-BFGS-B', bounds=bounds, jac=True,
+                            callback=lambda intermediate_result: callback(next(iteration), intermediate_result.fun))
+        
+        self.text_box.setPlainText(self.calculation_steps)
+        self.worker.submit(solve)
+        self.solve_status_label.setText("Optimizasyon: Çözülüyor...")
+    
+    def on_localization_progress(self, iteration, cost):
+        """Arka plandaki optimizasyonun ilerlemesini gösterir."""
+        self.solve_status_label.setText(f"Optimizasyon: İterasyon {iteration}, Hata: {cost:.4g}")
+    
+    def on_localization_failed(self, message):
+        """Arka plandaki optimizasyon hata ile sonlandı."""
+        self.solve_status_label.setText(f"Optimizasyon: Hata - {message}")
+    
+    def on_localization_finished(self, result):
+        """Güncel lokalizasyon isteğinin optimizasyon sonucunu işler."""
+        self.solve_status_label.setText(f"Optimizasyon: Tamamlandı ({result.nit} iterasyon)")
         
         # Sonuçları kaydet
         self.estimated_point = result.x[:3]
@@ -443,75 +409,66 @@ class SoundSourceLocalization3D(QMainWindow):
         self.calculation_steps += f"dB Hatası: {db_error:.1f} dB\n"
         
         self.text_box.setPlainText(self.calculation_steps)
+        self.update_plot()
     
     def update_plot(self):
-        """Grafiği günceller."""
-        # Grafiği temizle ve yeniden çiz
-        self.initial_plot()
+        """Grafiği günceller; öğeler yeniden oluşturulmaz, verileri yerinde değiştirilir."""
+        artists = self.artists
+        artists.set_mics(self.mic_positions)
+        artists.set_noise_sources(self.noise_sources)
+        artists.set_buildings(self.buildings)
+        artists.set_estimated_noise_sources(self.estimated_noise_sources)
+        artists.set_estimate(self.estimated_point)
+        artists.set_source(self.source_point)
         
-        # Bilgi panelini güncelle
-        for i in reversed(range(self.info_layout.count())):
-            widget = self.info_layout.itemAt(i).widget()
-            if widget:
-                self.info_layout.removeWidget(widget)
-                widget.deleteLater()
+        info = []
         
         # Gerçek ses kaynağı
         if self.source_point is not None:
-            self.source_scatter._offsets3d = (
-                [self.source_point[0]],
-                [self.source_point[1]],
-                [self.source_point[2]]
-            )
-            
-            # Bilgi paneline ekle
-            info = QLabel(f"🔴 Ses Kaynağı: ({self.source_point[0]:.1f}, {self.source_point[1]:.1f}, {self.source_point[2]:.1f}) - {self.source_db:.1f} dB")
-            self.info_layout.addWidget(info)
+            info.append(f"🔴 Ses Kaynağı: ({self.source_point[0]:.1f}, {self.source_point[1]:.1f}, {self.source_point[2]:.1f}) - {self.source_db:.1f} dB")
             
-            # Mikrofonlara çizgiler
-            for mic_pos in self.mic_positions:
-                blocked = self.is_path_blocked(self.source_point, mic_pos)
-                color = 'red' if blocked else 'gray'
-                alpha = 0.3 if blocked else 0.2
-                self.ax.plot(
-                    [self.source_point[0], mic_pos[0]],
-                    [self.source_point[1], mic_pos[1]],
-                    [self.source_point[2], mic_pos[2]],
-                    color=color, alpha=alpha, linewidth=0.5
-                )
+            # Mikrofonlara çizgiler (engellenmiş yollar kırmızı)
+            source_blocked = self.blocked_matrix([self.source_point], self.mic_positions)[0]
+            artists.set_rays(ray_segments(self.source_point, self.mic_positions),
+                             np.where(source_blocked, 'red', 'gray'),
+                             alpha=np.where(source_blocked, 0.3, 0.2))
+        else:
+            artists.set_rays([])
         
         # Tahmin edilen ses kaynağı
         if self.estimated_point is not None:
-            self.estimated_scatter._offsets3d = (
-                [self.estimated_point[0]],
-                [self.estimated_point[1]],
-                [self.estimated_point[2]]
-            )
-            
-            # Bilgi paneline ekle
-            info = QLabel(f"🟢 Tahmin: ({self.estimated_point[0]:.1f}, {self.estimated_point[1]:.1f}, {self.estimated_point[2]:.1f}) - {self.estimated_db:.1f} dB")
-            self.info_layout.addWidget(info)
+            info.append(f"🟢 Tahmin: ({self.estimated_point[0]:.1f}, {self.estimated_point[1]:.1f}, {self.estimated_point[2]:.1f}) - {self.estimated_db:.1f} dB")
         
         # Gürültü kaynakları bilgisi
         for i, noise in enumerate(self.noise_sources):
-            info = QLabel(f"🟠 Gürültü {i+1}: ({noise['position'][0]:.1f}, {noise['position'][1]:.1f}, {noise['position'][2]:.1f}) - {noise['db']:.1f} dB")
-            self.info_layout.addWidget(info)
+            info.append(f"🟠 Gürültü {i+1}: ({noise['position'][0]:.1f}, {noise['position'][1]:.1f}, {noise['position'][2]:.1f}) - {noise['db']:.1f} dB")
         
         # Tahmin edilen gürültü kaynakları
         for i, est_noise in enumerate(self.estimated_noise_sources):
-            scatter = self.ax.scatter(
-                est_noise['position'][0],
-                est_noise['position'][1],
-                est_noise['position'][2],
-                color='purple', s=80, marker='v', alpha=0.7
-            )
-            info = QLabel(f"🟣 Gürültü {i+1} Tahmini: ({est_noise['position'][0]:.1f}, {est_noise['position'][1]:.1f}, {est_noise['position'][2]:.1f}) - {est_noise['db']:.1f} dB")
-            self.info_layout.addWidget(info)
-        
-        self.canvas.draw()
+            info.append(f"🟣 Gürültü {i+1} Tahmini: ({est_noise['position'][0]:.1f}, {est_noise['position'][1]:.1f}, {est_noise['position'][2]:.1f}) - {est_noise['db']:.1f} dB")
+        
+        # Bilgi paneli: var olan etiketler yeniden kullanılır
+        while len(self.info_labels) < len(info):
+            label = QLabel()
+            self.info_layout.addWidget(label)
+            self.info_labels.append(label)
+        for label, line in zip(self.info_labels, info):
+            label.setText(line)
+            label.setVisible(True)
+        for label in self.info_labels[len(info):]:
+            label.setVisible(False)
+        
+        self.canvas.draw_idle()
+    
+    def closeEvent(self, event):
+        """Pencere kapanırken arka plandaki optimizasyonu durdurur."""
+        self.worker.shutdown()
+        super().closeEvent(event)
     
     def clear(self):
         """Ses kaynağını ve tahminleri temizler."""
+        self.worker.cancel()  # Devam eden optimizasyonun sonucu artık gösterilmez
+        self.solve_status_label.setText("Optimizasyon: Hazır")
         self.source_point = None
         self.source_db = None
         self.estimated_point = None
@@ -526,6 +483,7 @@ class SoundSourceLocalization3D(QMainWindow):
         self.mic_positions = np.copy(self.default_mic_positions)
         self.noise_sources = self.generate_multiple_noise_sources(count=2)
         self.buildings = self.generate_buildings(random.randint(2, 3))
+        self.building_bvh = BuildingBVH.from_buildings(self.buildings)  # Binalar değişti, BVH'yi yeniden kur
         self.clear()
     
     def randomize_positions(self):
@@ -533,6 +491,7 @@ class SoundSourceLocalization3D(QMainWindow):
         self.mic_positions = self.generate_random_mic_positions(num_mics=18)
         self.noise_sources = self.generate_multiple_noise_sources(count=2)
         self.buildings = self.generate_buildings(random.randint(1, 3))
+        self.building_bvh = BuildingBVH.from_buildings(self.buildings)  # Binalar değişti, BVH'yi yeniden kur
         self.clear()
 
 
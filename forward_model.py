@@ -0,0 +1,297 @@
+"""
+Vektörize ileri model.
+
+Mikrofon konumları (M, 3) ve kaynak parametre bloğu (K, 4) -> [x, y, z, D]
+verildiğinde, her mikrofonda beklenen toplam dB değerini tek bir
+broadcast dizi işlemiyle hesaplar. Varsayılan küresel yayılmada predict_db
+kaynak güçlerini doğrudan toplar (10 ** (D / 10) / r^2). Bir yayılım modeli
+verildiğinde, |D| >= POWER_DOMAIN_DB_LIMIT olduğunda veya doğrudan toplam
+sıfıra indiğinde (log10 -> -inf) güç toplamı log-sum-exp ile (power_sum_db)
+yapılır; Jacobian her zaman log-sum-exp ağırlıklarını kullanır.
+
+Hem optimizasyon hedef fonksiyonu hem de ölçüm sentezi bu fonksiyonları kullanır.
+
+Varsayılan yayılım kaybı küresel yayılmadır (20 * log10(r)). İsteğe bağlı
+propagation nesnesi (ör. propagation.AtmosphericPropagation veya
+attenuation_table.AttenuationTable) loss(r), slope(r) = d kayıp / dr ve
+loss_and_slope(r) sağlayarak farklı bir kayıp modeli verir.
+"""
+import numpy as np
+
+# Sıfıra bölme / log10(0) hatasını önlemek için minimum mesafe (calculate_distance ile aynı)
+MIN_DISTANCE = 1e-6
+
+# dB <-> doğal logaritma dönüşüm katsayısı: 10 ** (dB / 10) = exp(dB * DB_TO_LN)
+DB_TO_LN = np.log(10.0) / 10.0
+
+# predict_db küresel yayılmada |D| bu sınırın altındaysa gücü doğrudan toplar (10 ** 30 / MIN_DISTANCE ** 2
+# taşmaz); daha büyük dB değerlerinde (ör. sınırsız bir çözücünün ara adımları) log-sum-exp kullanılır
+POWER_DOMAIN_DB_LIMIT = 300.0
+
+
+def as_source_params(params):
+    """
+    Kaynak parametrelerini (K, 4) dizisine dönüştürür.
+    params: Düz [x1, y1, z1, D1, x2, ...] vektörü veya (K, 4) dizi
+    """
+    return np.asarray(params, dtype=float).reshape(-1, 4)
+
+
+def source_distances(mic_positions, params):
+    """
+    Her mikrofon ile her kaynak arasındaki mesafeyi hesaplar.
+    mic_positions: (M, 3) mikrofon konumları
+    params: (K, 4) kaynak parametreleri
+    Dönüş: (M, K) mesafe matrisi (en az MIN_DISTANCE)
+    """
+    mics = np.asarray(mic_positions, dtype=float)
+    sources = as_source_params(params)
+    diff = mics[:, None, :] - sources[None, :, :3]
+    return np.maximum(np.sqrt((diff * diff).sum(axis=2)), MIN_DISTANCE)
+
+
+def propagation_loss(distances, propagation=None):
+    """Mesafelerdeki yayılım kaybı (dB); propagation None ise küresel yayılma 20 * log10(r)."""
+    if propagation is None:
+        return 20.0 * np.log10(distances)
+    return propagation.loss(distances)
+
+
+def source_db_matrix(mic_positions, params, propagation=None):
+    """
+    Her kaynağın her mikrofonda oluşturduğu dB değerini hesaplar.
+    dB = D - kayıp(r)   (varsayılan kayıp: 20 * log10(r))
+    Dönüş: (M, K) dB matrisi
+    """
+    sources = as_source_params(params)
+    distances = source_distances(mic_positions, sources)
+    return sources[None, :, 3] - propagation_loss(distances, propagation)
+
+
+def power_sum_db(db_matrix, visible=None):
+    """
+    Kaynak katkılarını güç olarak toplar ve toplam dB'ye çevirir (log-sum-exp).
+    db_matrix: (M, K) kaynak başına dB değerleri
+    visible: (M, K) bool maske; False olan katkılar toplama alınmaz (engellenmiş yol)
+    Hiç katkı almayan mikrofonlar için 0 dB döner (eski davranışla aynı).
+    """
+    scaled = np.asarray(db_matrix, dtype=float) * DB_TO_LN
+    if visible is None:
+        peak = scaled.max(axis=1)
+        return (peak + np.log(np.exp(scaled - peak[:, None]).sum(axis=1))) / DB_TO_LN
+    visible = np.asarray(visible, dtype=bool)
+    masked = np.where(visible, scaled, -np.inf)
+    peak = masked.max(axis=1)
+    has_power = visible.any(axis=1)
+    peak[~has_power] = 0.0
+    power = np.exp(masked - peak[:, None]).sum(axis=1)
+    total = peak + np.log(np.where(has_power, power, 1.0))
+    return np.where(has_power, total / DB_TO_LN, 0.0)
+
+
+def predict_db(mic_positions, params, visible=None, propagation=None):
+    """
+    Mikrofonlarda beklenen toplam dB değerlerini hesaplar.
+    mic_positions: (M, 3) mikrofon konumları
+    params: (K, 4) veya düz (4K,) kaynak parametreleri [x, y, z, D]
+    visible: İsteğe bağlı (M, K) görünürlük maskesi
+    propagation: İsteğe bağlı yayılım modeli (None: küresel yayılma)
+    Dönüş: (M,) toplam dB
+
+    Küresel yayılmada kaynak gücü 10 ** (D / 10) / r^2 olduğundan güç doğrudan toplanır;
+    (M, K) log10 ve exp yerine yalnızca K üs ve bir bölme hesaplanır.
+    """
+    sources = as_source_params(params)
+    if propagation is not None or np.abs(sources[:, 3]).max() >= POWER_DOMAIN_DB_LIMIT:
+        return power_sum_db(source_db_matrix(mic_positions, sources, propagation), visible)
+    diff = np.asarray(mic_positions, dtype=float)[:, None, :] - sources[None, :, :3]
+    squared = np.maximum(np.einsum('mkj,mkj->mk', diff, diff), MIN_DISTANCE * MIN_DISTANCE)
+    power = 10.0 ** (0.1 * sources[:, 3]) / squared
+    if visible is None:
+        total = power.sum(axis=1)
+        if total.min() > 0:
+            return 10.0 * np.log10(total)
+        # Çok uzak kaynaklarda güç sıfıra inebilir (log10 -> -inf): log-sum-exp ile hesaplanır
+        return power_sum_db(source_db_matrix(mic_positions, sources), None)
+    visible = np.asarray(visible, dtype=bool)
+    total = np.where(visible, power, 0.0).sum(axis=1)
+    underflow = (total <= 0) & visible.any(axis=1)
+    if underflow.any():
+        return power_sum_db(source_db_matrix(mic_positions, sources), visible)
+    # Hiç katkı almayan mikrofonlar için 0 dB (power_sum_db ile aynı)
+    return np.where(total > 0, 10.0 * np.log10(np.where(total > 0, total, 1.0)), 0.0)
+
+
+def squared_error(params, mic_positions, measured_db, visible=None, propagation=None):
+    """Ölçülen ve tahmin edilen dB değerleri arasındaki toplam kare hatayı döndürür."""
+    residual = predict_db(mic_positions, params, visible, propagation) - measured_db
+    return float(np.dot(residual, residual))
+
+
+def predict_db_jacobian(mic_positions, params, visible=None, propagation=None):
+    """
+    Tahmin edilen dB değerlerini ve parametrelere göre Jacobian matrisini hesaplar.
+    Her kaynağın toplam dB'ye etkisi, mikrofondaki güç payı w_mk ile ağırlıklandırılır:
+        dL/dD_k = w_mk
+        dL/dp_k = w_mk * -kayıp'(r) * (p_k - mic) / r     (küresel yayılmada kayıp'(r) = 20 / (ln10 * r))
+    Dönüş: (M,) tahmin edilen dB, (M, 4K) Jacobian
+    """
+    mics = np.asarray(mic_positions, dtype=float)
+    sources = as_source_params(params)
+    diff = sources[None, :, :3] - mics[:, None, :]
+    raw_distances = np.sqrt((diff * diff).sum(axis=2))
+    distances = np.maximum(raw_distances, MIN_DISTANCE)
+    if propagation is None:
+        db = sources[None, :, 3] - 20.0 * np.log10(distances)
+    else:
+        loss, slope = propagation.loss_and_slope(distances)
+        db = sources[None, :, 3] - loss
+    predicted = power_sum_db(db, visible)
+
+    # Güç payları: exp(a * dB_k) / toplam güç (engellenmiş katkılar için 0)
+    scaled = db * DB_TO_LN
+    if visible is not None:
+        scaled = np.where(visible, scaled, -np.inf)
+    weights = np.exp(scaled - predicted[:, None] * DB_TO_LN)
+
+    # Mesafe alt sınıra takıldığında konum türevi sıfırdır
+    if propagation is None:
+        gain = -20.0 / (np.log(10.0) * distances ** 2)
+    else:
+        gain = -slope / distances
+    scale = np.where(raw_distances > MIN_DISTANCE, gain, 0.0)
+    jacobian = np.empty(diff.shape[:2] + (4,))
+    jacobian[..., :3] = (weights * scale)[..., None] * diff
+    jacobian[..., 3] = weights
+    return predicted, jacobian.reshape(len(mics), -1)
+
+
+def squared_error_and_gradient(params, mic_positions, measured_db, visible=None, propagation=None):
+    """
+    Toplam kare hatayı ve analitik gradyanını birlikte döndürür.
+    scipy.optimize.minimize(..., jac=True) ile doğrudan kullanılabilir.
+    """
+    predicted, jacobian = predict_db_jacobian(mic_positions, params, visible, propagation)
+    residual = predicted - measured_db
+    return float(np.dot(residual, residual)), 2.0 * residual @ jacobian
+
+
+def residuals(params, mic_positions, measured_db, visible=None, propagation=None):
+    """Mikrofon başına dB artıklarını (tahmin - ölçüm) döndürür; scipy.optimize.least_squares için."""
+    return predict_db(mic_positions, params, visible, propagation) - measured_db
+
+
+def residual_jacobian(params, mic_positions, measured_db, visible=None, propagation=None):
+    """Artık vektörünün (M, 4K) Jacobian matrisini döndürür; scipy.optimize.least_squares için."""
+    return predict_db_jacobian(mic_positions, params, visible, propagation)[1]
+
+
+def single_source_grid_cost(mic_positions, measured_db, points, propagation=None):
+    """
+    Tek kaynak modelinin kare hatasını çok sayıda aday konum için tek geçişte hesaplar.
+    Konum sabitken en iyi D kapalı formdadır: D* = ortalama(ölçüm + kayıp(r)).
+    mic_positions: (M, 3) mikrofon konumları
+    measured_db: (M,) ölçülen dB değerleri
+    points: (P, 3) aday kaynak konumları
+    Dönüş: (P,) kare hata, (P,) en iyi D
+    """
+    mics = np.asarray(mic_positions, dtype=float)
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    diff = points[:, None, :] - mics[None, :, :]
+    attenuation = propagation_loss(np.maximum(np.sqrt((diff * diff).sum(axis=2)), MIN_DISTANCE), propagation)
+    corrected = np.asarray(measured_db, dtype=float)[None, :] + attenuation   # (P, M)
+    best_db = corrected.mean(axis=1)
+    residual = corrected - best_db[:, None]
+    return (residual * residual).sum(axis=1), best_db
+
+
+if __name__ == '__main__':
+    import math
+    import timeit
+    from scipy.optimize import check_grad, minimize
+
+    # main.py'deki eski skaler döngü ile karşılaştırma (18 mikrofon, 3 kaynak)
+    rng = np.random.default_rng(0)
+    mics = rng.uniform([-15, -15, -10], [25, 25, 10], size=(18, 3))
+    params = np.column_stack([rng.uniform([-15, -15, -10], [25, 25, 10], size=(3, 3)),
+                              rng.uniform(60, 90, size=3)])
+
+    def calculate_distance(mic_pos, source_pos):
+        distance = np.sqrt((mic_pos[0] - source_pos[0]) ** 2 +
+                           (mic_pos[1] - source_pos[1]) ** 2 +
+                           (mic_pos[2] - source_pos[2]) ** 2)
+        return max(distance, 1e-6)
+
+    def calculate_db(distance, source_db):
+        return source_db - 20 * math.log10(distance)
+
+    def scalar_predict():
+        result = []
+        for mic in mics:
+            total_power = 0
+            for x, y, z, D in params:
+                db = calculate_db(calculate_distance(mic, [x, y, z]), D)
+                total_power += 10 ** (db / 10)
+            result.append(10 * math.log10(total_power) if total_power > 0 else 0)
+        return result
+
+    assert np.allclose(scalar_predict(), predict_db(mics, params))
+    # Güç toplamı yolu log-sum-exp yoluyla (görünürlük maskesi ve tamamen engellenmiş mikrofon dahil) aynı
+    mask = rng.random((len(mics), len(params))) > 0.3
+    mask[0] = False
+    for m in (None, mask):
+        assert np.allclose(predict_db(mics, params, m), power_sum_db(source_db_matrix(mics, params), m),
+                           rtol=0, atol=1e-9)
+    # Sınırın altındaki D ile de güç sıfıra inebilir (çok uzak kaynak); log-sum-exp'e dönülür
+    far = np.array([[1e150, 0.0, 0.0, -299.0], [-1e150, 0.0, 0.0, -290.0]])
+    for m in (None, np.ones((len(mics), 2), dtype=bool)):
+        assert np.allclose(predict_db(mics, far, m), power_sum_db(source_db_matrix(mics, far), m))
+    n = 2000
+    t_scalar = min(timeit.repeat(scalar_predict, number=n, repeat=5)) / n
+    t_vector = min(timeit.repeat(lambda: predict_db(mics, params), number=n, repeat=5)) / n
+    print(f"Skaler döngü: {t_scalar * 1e6:.1f} us, Vektörize: {t_vector * 1e6:.1f} us, "
+          f"Hızlanma: {t_scalar / t_vector:.1f}x")
+
+    # Gradyan kontrolü: analitik gradyan ile sonlu farklar karşılaştırması
+    measured = predict_db(mics, params) + rng.normal(0, 0.5, size=len(mics))
+    visible = rng.random((len(mics), len(params))) > 0.2
+    for mask in (None, visible):
+        for _ in range(5):
+            trial = params + rng.normal(0, 2.0, size=params.shape)
+            error = check_grad(lambda p: squared_error(p, mics, measured, mask),
+                               lambda p: squared_error_and_gradient(p, mics, measured, mask)[1],
+                               trial.ravel(), epsilon=1e-6)
+            norm = np.linalg.norm(squared_error_and_gradient(trial, mics, measured, mask)[1])
+            assert error <= 1e-4 * max(norm, 1.0), (error, norm)
+    print("Gradyan kontrolü: OK")
+
+    # Atmosferik soğurmalı yayılım modeliyle de analitik gradyan sonlu farklarla uyuşmalı
+    from propagation import AtmosphericPropagation
+    atmosphere = AtmosphericPropagation(frequency=8000, temperature=15, humidity=20)
+    for _ in range(5):
+        trial = params + rng.normal(0, 2.0, size=params.shape)
+        error = check_grad(lambda p: squared_error(p, mics, measured, None, atmosphere),
+                           lambda p: squared_error_and_gradient(p, mics, measured, None, atmosphere)[1],
+                           trial.ravel(), epsilon=1e-6)
+        norm = np.linalg.norm(squared_error_and_gradient(trial, mics, measured, None, atmosphere)[1])
+        assert error <= 1e-4 * max(norm, 1.0), (error, norm)
+    print(f"Gradyan kontrolü ({atmosphere}): OK")
+
+    # Kaynak + gürültü ortak kestirimi: sonlu fark ve analitik gradyan ile hedef çağrı sayısı
+    x0 = np.concatenate([[mics[:, 0].mean(), mics[:, 1].mean(), mics[:, 2].mean(), measured.mean()],
+                         (params[1:] + rng.normal(0, 1.0, size=params[1:].shape)).ravel()])
+    bounds = [(-15, 25), (-15, 25), (-10, 10), (40, 100)] * len(params)
+    calls = {'fd': 0, 'jac': 0}
+
+    def counted(p):
+        calls['fd'] += 1
+        return squared_error(p, mics, measured)
+
+    def counted_with_jac(p):
+        calls['jac'] += 1
+        return squared_error_and_gradient(p, mics, measured)
+
+    res_fd = minimize(counted, x0, method='SLSQP', bounds=bounds)
+    res_jac = minimize(counted_with_jac, x0, method='SLSQP', bounds=bounds, jac=True)
+    print(f"SLSQP sonlu fark: {calls['fd']} çağrı (hata={res_fd.fun:.3f}), "
+          f"analitik gradyan: {calls['jac']} çağrı (hata={res_jac.fun:.3f})")
@@ -0,0 +1,468 @@
+"""
+Arayüzden bağımsız (headless) 3D ses kaynağı lokalizasyon motoru.
+
+Yalnızca NumPy / SciPy kullanır; Qt veya Matplotlib içe aktarmaz. Bir sahne
+(mikrofonlar, ambient gürültü kaynakları, binalar) ve bir ölçüm vektörü
+alır, kaynak konumu / dB tahminini ve tanılama bilgilerini döndürür.
+main.py'deki arayüz bu motorun ince bir istemcisidir; aynı motor toplu
+işçilerde ve sunucularda Qt başlatmadan çalıştırılabilir.
+"""
+import inspect
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+
+import numpy as np
+from scipy.optimize import least_squares, minimize
+from scipy.stats import qmc
+
+from forward_model import (
+    predict_db, residual_jacobian, residuals, single_source_grid_cost, squared_error_and_gradient
+)
+from occlusion import BuildingBVH
+
+# Konum ve dB sınırları (main.py ile aynı)
+POSITION_BOUNDS = ((-15, 25), (-15, 25), (-10, 10))
+DB_BOUNDS = (40, 100)
+
+# Desteklenen çözücüler: SLSQP (skaler kare hata) ve scipy least_squares yöntemleri
+SOLVER_METHODS = ('SLSQP', 'trf', 'lm')
+
+# Çoklu başlangıçta erken durma eşiği: mikrofon başına RMS artık (dB) bunun altına inerse kalan başlangıçlar
+# iptal edilir (ölçümler modelle bu doğrulukta açıklanıyor)
+MULTISTART_RMS_THRESHOLD = 0.05
+
+# Başlangıç tahmini yöntemleri: mikrofon merkezi + ortalama dB veya kabadan inceye ızgara araması
+SEEDING_MODES = ('heuristic', 'grid')
+GRID_COARSE_STEP = 2.0     # Kaba ızgara aralığı (m)
+GRID_TOP_K = 8             # İnceltilen en iyi kaba hücre sayısı
+GRID_REFINE_POINTS = 5     # İnceltmede hücre başına eksen boyunca nokta sayısı
+
+# least_squares'in callback argümanı SciPy 1.16'da eklendi; eski sürümlerde artık sarmalayıcı kullanılır
+LEAST_SQUARES_CALLBACK = 'callback' in inspect.signature(least_squares).parameters
+
+
+def _uniform(rng, low, high):
+    """rng verilmemişse main.py'deki gibi 'random' modülünü kullanır."""
+    return random.uniform(low, high) if rng is None else rng.uniform(low, high)
+
+
+def generate_random_mic_positions(num_mics=18, rng=None):
+    """
+    Tamamen rastgele mikrofon konumları oluşturur (3D düzlem üzerinde).
+    rng: İsteğe bağlı np.random.Generator (verilmezse np.random kullanılır)
+    """
+    rng = np.random if rng is None else rng
+    low, high = np.array(POSITION_BOUNDS, dtype=float).T
+    return rng.uniform(low, high, size=(num_mics, 3))
+
+
+def generate_random_noise_source(rng=None):
+    """Rastgele bir konum ve desibel değeri ile ambient gürültü kaynağı oluşturur."""
+    x = _uniform(rng, -15, 25)
+    y = _uniform(rng, -15, 25)
+    z = _uniform(rng, -10, 10)
+    db = _uniform(rng, 60, 90)
+    return {'position': np.array([x, y, z]), 'db': db}
+
+
+def generate_multiple_noise_sources(count=2, rng=None):
+    """Belirli sayıda rastgele ambient gürültü kaynağı oluşturur."""
+    return [generate_random_noise_source(rng) for _ in range(count)]
+
+
+def generate_buildings(count, rng=None):
+    """
+    Belirli sayıda rastgele bina oluşturur.
+    count: Bina sayısı
+    """
+    buildings = []
+    for _ in range(count):
+        width = _uniform(rng, 5, 10)
+        depth = _uniform(rng, 5, 10)
+        height = _uniform(rng, 10, 15)
+        x = _uniform(rng, -15, 25 - width)
+        y = _uniform(rng, -15, 25 - depth)
+        z = 0  # Binalar zeminde başlar
+        buildings.append({'position': (x, y, z), 'size': (width, depth, height)})
+    return buildings
+
+
+class Scene:
+    """Mikrofonlar, ambient gürültü kaynakları ve binalardan oluşan sabit sahne."""
+
+    def __init__(self, mic_positions, noise_sources=(), buildings=(), propagation=None):
+        """
+        mic_positions: (M, 3) mikrofon konumları
+        noise_sources: [{'position': (x, y, z), 'db': D}, ...]
+        buildings: [{'position': (x, y, z), 'size': (dx, dy, dz)}, ...]
+        propagation: İsteğe bağlı yayılım modeli (ör. propagation.AtmosphericPropagation);
+            None ise küresel yayılma. Ölçüm sentezi ve çözücü aynı modeli kullanır.
+        """
+        self.mic_positions = np.asarray(mic_positions, dtype=float).reshape(-1, 3)
+        self.noise_sources = list(noise_sources)
+        self.buildings = list(buildings)
+        self.building_bvh = BuildingBVH.from_buildings(self.buildings)
+        self.propagation = propagation
+
+    @classmethod
+    def random(cls, num_mics=18, noise_count=2, building_count=None, rng=None, propagation=None):
+        """main.py'deki dağılımlardan rastgele bir sahne oluşturur."""
+        if building_count is None:
+            building_count = random.randint(1, 3) if rng is None else int(rng.integers(1, 4))
+        return cls(generate_random_mic_positions(num_mics, rng),
+                   generate_multiple_noise_sources(noise_count, rng),
+                   generate_buildings(building_count, rng), propagation)
+
+    def noise_params(self):
+        """Gürültü kaynaklarını (K, 4) [x, y, z, D] dizisi olarak döndürür."""
+        return np.array([list(noise['position']) + [noise['db']] for noise in self.noise_sources],
+                        dtype=float).reshape(-1, 4)
+
+    def blocked(self, start_points, end_points=None):
+        """
+        Başlangıç noktalarından bitiş noktalarına (varsayılan: mikrofonlar) giden yolların
+        engellenme maskesini döndürür.
+        Dönüş: (N, M) bool maske
+        """
+        if end_points is None:
+            end_points = self.mic_positions
+        return self.building_bvh.blocked(start_points, end_points)
+
+    def synthesize_measurements(self, source_point, source_db, include_noise=False):
+        """
+        Mikrofonlarda ölçülecek dB değerlerini sentezler.
+        Engellenmiş yollar güce katkı vermez; hiç katkı almayan mikrofon 0 dB ölçer.
+        include_noise: True ise görünür gürültü kaynakları da ölçüme eklenir
+        Dönüş: (M,) ölçülen dB, (M,) ana kaynağın engellendiği mikrofonlar
+        """
+        params = np.array([[*source_point, source_db]], dtype=float)
+        if include_noise:
+            params = np.vstack([params, self.noise_params()])
+        blocked = self.blocked(params[:, :3])
+        return predict_db(self.mic_positions, params, ~blocked.T, self.propagation), blocked[0]
+
+
+@dataclass
+class LocalizationResult:
+    """Bir lokalizasyon çözümünün tahminleri ve tanılama bilgileri."""
+    success: bool
+    message: str
+    method: str
+    position: np.ndarray = None
+    db: float = None
+    noise_sources: list = field(default_factory=list)
+    params: np.ndarray = None
+    cost: float = None
+    residuals: np.ndarray = None
+    used_mics: np.ndarray = None
+    nfev: int = 0
+    nit: int = 0
+    elapsed: float = 0.0
+    notes: list = field(default_factory=list)
+    stage_times: dict = field(default_factory=dict)   # Aşama adı -> süre (s)
+    start_costs: np.ndarray = None       # Çoklu başlangıç: tamamlanan başlangıçların kare hataları
+    start_positions: np.ndarray = None   # Çoklu başlangıç: tamamlanan başlangıçların konum tahminleri
+
+    @property
+    def start_spread(self):
+        """Başlangıçlar arasındaki konum dağılımı: tahminlerin en iyi konuma ortalama uzaklığı (m)."""
+        if self.start_positions is None or self.position is None:
+            return None
+        return float(np.mean(np.linalg.norm(self.start_positions - self.position, axis=1)))
+
+
+class _IterationReporter:
+    """Çözücü iterasyonlarını callback(iteration, cost) biçiminde bildirir (callback None ise etkisizdir)."""
+
+    def __init__(self, callback, mics, targets, propagation=None):
+        self.callback = callback
+        self.mics = mics
+        self.targets = targets
+        self.propagation = propagation
+        self.iteration = 0
+
+    @property
+    def on_iteration(self):
+        """scipy minimize / least_squares callback'i; callback yoksa None."""
+        return None if self.callback is None else self._on_iteration
+
+    def _on_iteration(self, xk):
+        self.iteration += 1
+        residual = residuals(xk, self.mics, self.targets, None, self.propagation)
+        self.callback(self.iteration, float(residual @ residual))
+
+    def wrap_residuals(self, fun):
+        """Callback desteklemeyen çözücüler (LM) için her artık değerlendirmesini bildiren sarmalayıcı."""
+        if self.callback is None:
+            return fun
+
+        def reporting(params, *args):
+            residual = fun(params, *args)
+            self.iteration += 1
+            self.callback(self.iteration, float(residual @ residual))
+            return residual
+        return reporting
+
+
+class LocalizationEngine:
+    """
+    Ölçülen dB değerlerinden ana kaynağı (ve ambient gürültü kaynaklarını) kestiren çözücü.
+    Ana kaynak mikrofon merkezinden ve ortalama dB'den, gürültü kaynakları bilinen
+    değerlerinden başlatılır.
+    """
+
+    def __init__(self, scene, method='SLSQP', position_bounds=POSITION_BOUNDS, db_bounds=DB_BOUNDS):
+        if method not in SOLVER_METHODS:
+            raise ValueError(f"Bilinmeyen çözücü: {method} (seçenekler: {', '.join(SOLVER_METHODS)})")
+        self.scene = scene
+        self.method = method
+        self.position_bounds = tuple(position_bounds)
+        self.db_bounds = tuple(db_bounds)
+
+    def bounds(self):
+        """Parametre vektörünün [(alt, üst), ...] sınırları."""
+        per_source = list(self.position_bounds) + [self.db_bounds]
+        return per_source * (1 + len(self.scene.noise_sources))
+
+    def initial_guess(self, measured_db, used_mics):
+        """Başlangıç tahmini: kullanılan mikrofonların merkezi + tüm ölçümlerin ortalama dB'si."""
+        x0 = np.concatenate([self.scene.mic_positions[used_mics].mean(axis=0), [np.mean(measured_db)]])
+        return np.concatenate([x0, self.scene.noise_params().ravel()])
+
+    def grid_seed(self, measured_db, used_mics, coarse_step=GRID_COARSE_STEP, top_k=GRID_TOP_K,
+                  refine_points=GRID_REFINE_POINTS):
+        """
+        Tek kaynak modeliyle kabadan inceye ızgara araması yaparak ana kaynak için başlangıç üretir.
+        1. Konum sınırları üzerindeki kaba ızgaranın tamamı tek bir vektörize geçişte değerlendirilir.
+        2. En düşük hatalı top_k hücrenin çevresi (± bir kaba adım) daha sık bir ızgarayla taranır.
+        Dönüş: [x, y, z, D] başlangıç, {'grid': s, 'refine': s} aşama süreleri
+        """
+        mics = self.scene.mic_positions[used_mics]
+        targets = np.asarray(measured_db, dtype=float)[used_mics]
+        lower, upper = np.array(self.position_bounds, dtype=float).T
+        stage_times = {}
+
+        start = time.perf_counter()
+        axes = [np.arange(low, high + 1e-9, coarse_step) for low, high in zip(lower, upper)]
+        coarse = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, 3)
+        costs, _ = single_source_grid_cost(mics, targets, coarse, self.scene.propagation)
+        centers = coarse[np.argsort(costs)[:top_k]]
+        stage_times['grid'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        offsets = np.linspace(-coarse_step, coarse_step, refine_points)
+        local = np.stack(np.meshgrid(offsets, offsets, offsets, indexing='ij'), axis=-1).reshape(-1, 3)
+        fine = np.clip((centers[:, None, :] + local[None, :, :]).reshape(-1, 3), lower, upper)
+        costs, best_db = single_source_grid_cost(mics, targets, fine, self.scene.propagation)
+        best = np.argmin(costs)
+        seed = np.append(fine[best], np.clip(best_db[best], *self.db_bounds))
+        stage_times['refine'] = time.perf_counter() - start
+        return seed, stage_times
+
+    def latin_hypercube_starts(self, count, rng=None):
+        """
+        Parametre sınırları üzerinde Latin hiperküp örneklemesiyle başlangıç vektörleri üretir.
+        Dönüş: (count, 4 * (1 + K)) dizi
+        """
+        lower, upper = np.array(self.bounds(), dtype=float).T
+        sampler = qmc.LatinHypercube(d=len(lower), seed=rng)
+        return qmc.scale(sampler.random(count), lower, upper)
+
+    def localize_multistart(self, measured_db, blocked=None, starts=8, workers=None,
+                            rms_threshold=MULTISTART_RMS_THRESHOLD, rng=None, callback=None):
+        """
+        Sezgisel başlangıç + (starts - 1) Latin hiperküp başlangıcından çoklu başlangıçlı çözüm.
+        Varsayılan olarak başlangıçlar sırayla çözülür; bir çözümün mikrofon başına RMS artığı
+        rms_threshold (dB) altına indiğinde kalan başlangıçlar atlanır. Çözücü GIL'i bırakmadığından iş
+        parçacıkları hızlandırmaz; workers > 1 verilirse başlangıçlar bir süreç havuzunda
+        (batch_localization.py'deki gibi sahne işçiye başlatıcıyla bir kez gönderilir) çözülür
+        ve henüz başlamamış başlangıçlar erken durmada iptal edilir. Havuz her çağrıda yeniden
+        kurulduğundan süreç başlatma maliyeti yalnızca başlangıç başına çözüm süresi büyükse
+        (çok gürültü kaynağı, yayılım modeli) karşılanır.
+        workers: Süreç sayısı (None veya 1: sıralı, aynı süreçte)
+        callback: İsteğe bağlı callback(iteration, cost); sıralı çözümde tüm başlangıçların
+            iterasyonlarında, süreç havuzunda her tamamlanan başlangıçta (iteration = tamamlanan sayısı) çağrılır
+        Dönüş: En düşük kare hatalı LocalizationResult; start_costs / start_positions tüm
+        tamamlanan başlangıçları içerir.
+        """
+        start = time.perf_counter()
+        measured_db = np.asarray(measured_db, dtype=float)
+        used_mics = np.ones(len(measured_db), dtype=bool) if blocked is None else ~np.asarray(blocked, dtype=bool)
+        if not used_mics.any():
+            return self.localize(measured_db, blocked, callback=callback)
+        cost_threshold = rms_threshold ** 2 * used_mics.sum()
+
+        candidates = [self.initial_guess(measured_db, used_mics)]
+        if starts > 1:
+            candidates.extend(self.latin_hypercube_starts(starts - 1, rng))
+
+        results = []
+        if workers is None or workers <= 1:
+            for x0 in candidates:
+                results.append(self.localize(measured_db, blocked, x0, callback=callback))
+                if results[-1].cost <= cost_threshold:
+                    break
+        else:
+            init_args = (self.scene, self.method, self.position_bounds, self.db_bounds)
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_multistart_worker,
+                                     initargs=init_args) as pool:
+                pending = {pool.submit(_solve_start, measured_db, blocked, x0) for x0 in candidates}
+                try:
+                    while pending:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            results.append(future.result())
+                            if callback is not None:
+                                callback(len(results), results[-1].cost)
+                        if min(result.cost for result in results) <= cost_threshold:
+                            break
+                finally:
+                    # Erken durma veya callback'in durdurması (ör. bayat istek): başlamamış başlangıçlar iptal edilir
+                    for future in pending:
+                        future.cancel()
+                results.extend(future.result() for future in pending if not future.cancelled())
+
+        best = min(results, key=lambda result: result.cost)
+        best.start_costs = np.array([result.cost for result in results])
+        best.start_positions = np.array([result.position for result in results])
+        best.nfev = sum(result.nfev for result in results)
+        best.elapsed = time.perf_counter() - start
+        best.notes.append(f"Çoklu başlangıç: {len(results)}/{len(candidates)} başlangıç çözüldü, "
+                          f"konum dağılımı {best.start_spread:.2f} m")
+        return best
+
+    def localize(self, measured_db, blocked=None, x0=None, seeding='heuristic', callback=None,
+                 max_iterations=None):
+        """
+        Ölçümlerden kaynak konumunu ve dB değerini tahmin eder.
+        measured_db: (M,) mikrofonlarda ölçülen dB değerleri
+        blocked: İsteğe bağlı (M,) bool; True olan mikrofonlar çözüme katılmaz
+        x0: İsteğe bağlı başlangıç parametre vektörü (verilirse seeding yok sayılır)
+        seeding: 'heuristic' (mikrofon merkezi + ortalama dB) veya 'grid' (kabadan inceye ızgara araması)
+        callback: İsteğe bağlı callback(iteration, cost); her çözücü iterasyonunda güncel kare hata
+            toplamıyla çağrılır (LM scipy callback'ini desteklemediğinden her artık değerlendirmesinde).
+            Callback'in fırlattığı istisna çözümü durdurur ve çağırana iletilir.
+        max_iterations: İsteğe bağlı iterasyon sınırı (SLSQP maxiter, least_squares max_nfev);
+            sıcak başlatılan takip çözümlerinde gecikmeyi sınırlamak için kullanılır
+        """
+        if seeding not in SEEDING_MODES:
+            raise ValueError(f"Bilinmeyen başlangıç yöntemi: {seeding} (seçenekler: {', '.join(SEEDING_MODES)})")
+        start = time.perf_counter()
+        measured_db = np.asarray(measured_db, dtype=float)
+        used_mics = np.ones(len(measured_db), dtype=bool) if blocked is None else ~np.asarray(blocked, dtype=bool)
+        if not used_mics.any():
+            return LocalizationResult(False, "Bloklanmamış mikrofon bulunamadı. Tahmin yapılamıyor.",
+                                      self.method, used_mics=used_mics,
+                                      elapsed=time.perf_counter() - start)
+
+        mics = self.scene.mic_positions[used_mics]
+        targets = measured_db[used_mics]
+        stage_times = {}
+        if x0 is None:
+            x0 = self.initial_guess(measured_db, used_mics)
+            if seeding == 'grid':
+                x0[:4], stage_times = self.grid_seed(measured_db, used_mics)
+        bounds = self.bounds()
+        notes = []
+        polish_start = time.perf_counter()
+
+        method = self.method
+        if method == 'lm' and len(mics) < len(x0):
+            # LM artık sayısının parametre sayısından az olmamasını gerektirir
+            notes.append("LM için yeterli mikrofon yok, TRF kullanılıyor.")
+            method = 'trf'
+        # Artık fonksiyonlarının ek argümanları: (mikrofonlar, ölçümler, görünürlük, yayılım modeli)
+        args = (mics, targets, None, self.scene.propagation)
+        progress = _IterationReporter(callback, mics, targets, self.scene.propagation)
+        if method == 'SLSQP':
+            res = minimize(squared_error_and_gradient, x0, args=args,
+                           method='SLSQP', bounds=bounds, jac=True, callback=progress.on_iteration,
+                           options={} if max_iterations is None else {'maxiter': max_iterations})
+            nit = res.nit
+        else:
+            # Mikrofon başına artık vektörü ve Jacobian ile Gauss-Newton tipi çözüm
+            lower, upper = np.array(bounds, dtype=float).T
+            if method == 'lm':
+                res = least_squares(progress.wrap_residuals(residuals), x0, jac=residual_jacobian,
+                                    args=args, method='lm', max_nfev=max_iterations)
+            elif callback is not None and LEAST_SQUARES_CALLBACK:
+                res = least_squares(residuals, np.clip(x0, lower, upper), jac=residual_jacobian,
+                                    args=args, bounds=(lower, upper), method='trf',
+                                    max_nfev=max_iterations, callback=progress.on_iteration)
+            else:
+                res = least_squares(progress.wrap_residuals(residuals), np.clip(x0, lower, upper),
+                                    jac=residual_jacobian, args=args, bounds=(lower, upper), method='trf',
+                                    max_nfev=max_iterations)
+            nit = res.njev if res.njev is not None else res.nfev
+
+        stage_times['polish'] = time.perf_counter() - polish_start
+
+        params = np.asarray(res.x, dtype=float)
+        residual = residuals(params, *args)
+        noise_sources = [{'position': p[:3].copy(), 'db': p[3]} for p in params[4:].reshape(-1, 4)]
+        return LocalizationResult(
+            success=bool(res.success), message=str(res.message), method=method,
+            position=params[:3].copy(), db=params[3], noise_sources=noise_sources, params=params,
+            cost=float(residual @ residual), residuals=residual, used_mics=used_mics,
+            nfev=int(res.nfev), nit=int(nit), elapsed=time.perf_counter() - start, notes=notes,
+            stage_times=stage_times,
+        )
+
+
+# Çoklu başlangıç süreç havuzu işçisine özel durum (_init_multistart_worker tarafından doldurulur)
+_multistart_worker = {}
+
+
+def _init_multistart_worker(scene, method, position_bounds, db_bounds):
+    """Süreç havuzu başlatıcısı: sahne ve motor işçi başına bir kez kurulur."""
+    _multistart_worker['engine'] = LocalizationEngine(scene, method, position_bounds, db_bounds)
+
+
+def _solve_start(measured_db, blocked, x0):
+    """Tek bir başlangıç vektöründen çözüm (süreç havuzu görevi)."""
+    return _multistart_worker['engine'].localize(measured_db, blocked, x0)
+
+
+if __name__ == '__main__':
+    # Arayüz olmadan tek bir rastgele senaryo çözümü
+    rng = np.random.default_rng(0)
+    scene = Scene.random(rng=rng)
+    blocked = np.ones(len(scene.mic_positions), dtype=bool)
+    while (~blocked).sum() < 4:
+        # Kaynak bir binanın içine düşerse yeniden çek
+        source_point = rng.uniform(*np.array(POSITION_BOUNDS, dtype=float).T)
+        source_db = rng.uniform(60, 100)
+        measured_db, blocked = scene.synthesize_measurements(source_point, source_db)
+    for method in SOLVER_METHODS:
+        result = LocalizationEngine(scene, method=method).localize(measured_db, blocked)
+        if result.position is None:
+            print(f"{method:>6}: {result.message}")
+            continue
+        error = np.linalg.norm(result.position - source_point)
+        print(f"{method:>6}: konum hatası={error:.3f} m, dB={result.db:.2f} (gerçek {source_db:.2f}), "
+              f"nfev={result.nfev}, süre={result.elapsed * 1000:.1f} ms")
+
+    # Kabadan inceye ızgara tohumlama
+    result = LocalizationEngine(scene).localize(measured_db, blocked, seeding='grid')
+    error = np.linalg.norm(result.position - source_point)
+    stages = ', '.join(f"{name}={elapsed * 1000:.1f} ms" for name, elapsed in result.stage_times.items())
+    print(f"  grid: konum hatası={error:.3f} m, dB={result.db:.2f}, nit={result.nit}, {stages}")
+
+    # Çoklu başlangıç: sezgisel başlangıç + Latin hiperküp başlangıçları
+    result = LocalizationEngine(scene).localize_multistart(measured_db, blocked, starts=8, rng=rng)
+    error = np.linalg.norm(result.position - source_point)
+    # Erken durma: RMS artığı eşiğin altına inen ilk başlangıçtan sonra kalanlar çözülmez
+    assert len(result.start_costs) < 8 and np.sqrt(result.cost / (~blocked).sum()) <= MULTISTART_RMS_THRESHOLD
+    print(f" multi: konum hatası={error:.3f} m, dB={result.db:.2f}, {result.notes[-1]}, "
+          f"süre={result.elapsed * 1000:.1f} ms")
+
+    # Atmosferik soğurmalı yayılım: ölçüm sentezi ve çözücü aynı sahne modelini kullanır
+    from propagation import AtmosphericPropagation
+    scene.propagation = AtmosphericPropagation(frequency=8000, temperature=15, humidity=20)
+    measured_db, blocked = scene.synthesize_measurements(source_point, source_db)
+    result = LocalizationEngine(scene).localize(measured_db, blocked, seeding='grid')
+    error = np.linalg.norm(result.position - source_point)
+    print(f"  ISO 9613-1 (8 kHz): konum hatası={error:.3f} m, dB={result.db:.2f}, "
+          f"süre={result.elapsed * 1000:.1f} ms")
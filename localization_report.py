@@ -0,0 +1,101 @@
+"""
+Lokalizasyon hesaplama raporu.
+
+Ölçüm ve çözüm bilgileri dizi olarak bir kayıtta tutulur; metin yalnızca
+gösterileceği zaman ve sayfa sayfa üretilir. Böylece çok sayıda mikrofonlu
+dizilerde rapor üretimi çözüm süresini aşmaz ve arayüze tek seferde
+binlerce satır gönderilmez.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from forward_model import source_db_matrix, source_distances
+
+# Bir rapor sayfasında gösterilen mikrofon sayısı
+REPORT_PAGE_MICS = 50
+
+
+@dataclass
+class LocalizationReport:
+    """Bir perform_localization çağrısının yapılandırılmış kaydı."""
+    source_point: np.ndarray
+    source_db: float
+    distances: np.ndarray       # (M,) gerçek kaynak - mikrofon mesafeleri
+    source_dbs: np.ndarray      # (M,) gerçek kaynağın mikrofonlardaki dB değeri
+    blocked: np.ndarray         # (M,) ana kaynağın engellendiği mikrofonlar
+    measured_db: np.ndarray     # (M,) ölçülen toplam dB
+    result: object = None       # localization_engine.LocalizationResult
+
+    @classmethod
+    def from_measurements(cls, mic_positions, source_point, source_db, measured_db, blocked, result=None,
+                          propagation=None):
+        """
+        Ölçümlerden mesafe ve dB dizilerini tek vektörize geçişte hesaplayarak kayıt oluşturur.
+        propagation: Ölçümleri sentezleyen sahnenin yayılım modeli (Scene.propagation; None: küresel yayılma)
+        """
+        source_params = np.array([[*source_point, source_db]], dtype=float)
+        return cls(
+            source_point=np.asarray(source_point, dtype=float), source_db=float(source_db),
+            distances=source_distances(mic_positions, source_params)[:, 0],
+            source_dbs=source_db_matrix(mic_positions, source_params, propagation)[:, 0],
+            blocked=np.asarray(blocked, dtype=bool), measured_db=np.asarray(measured_db, dtype=float),
+            result=result,
+        )
+
+    @property
+    def average_db(self):
+        return float(np.mean(self.measured_db))
+
+    def page_count(self, page_size=REPORT_PAGE_MICS):
+        return max(1, -(-len(self.measured_db) // page_size))
+
+    def mic_lines(self, start, stop):
+        """[start, stop) aralığındaki mikrofonların ölçüm satırları."""
+        x, y, z = self.source_point
+        lines = []
+        for idx in range(start, stop):
+            lines.append(f"\nMikrofon {idx + 1}:\n")
+            if not self.blocked[idx]:
+                lines.append(f"  Kaynak ({x:.2f}, {y:.2f}, {z:.2f}), Mesafe: {self.distances[idx]:.2f} m, "
+                             f"dB: {self.source_dbs[idx]:.2f}, Engellenmemiş\n")
+            else:
+                lines.append(f"  Kaynak ({x:.2f}, {y:.2f}, {z:.2f}), Engellenmiş\n")
+            lines.append(f"  Toplam dB: {self.measured_db[idx]:.2f}\n")
+        return lines
+
+    def summary_lines(self):
+        """Ortalama dB, çözüm notları ve tahmin sonuçları."""
+        lines = [f"\nOrtalama dB: {self.average_db:.2f}\n"]
+        result = self.result
+        if result is None:
+            return lines
+        lines.extend(f"\n{note}\n" for note in result.notes)
+        if result.position is None:
+            lines.append(f"\n{result.message}\n")
+            return lines
+        if result.method != 'SLSQP':
+            lines.append(f"\nÇözücü: {result.method.upper()}, Değerlendirme sayısı: {result.nfev}\n")
+        if 'grid' in result.stage_times:
+            stages = ', '.join(f"{name}: {elapsed * 1000:.1f} ms" for name, elapsed in result.stage_times.items())
+            lines.append(f"\nIzgara tohumlama süreleri ({stages}), İterasyon: {result.nit}\n")
+        x, y, z = result.position
+        lines.append(f"\nTahmin Edilen Konum: ({x:.2f}, {y:.2f}, {z:.2f}), Tahmin Edilen dB: {result.db:.2f}\n")
+        for idx, noise in enumerate(result.noise_sources, start=1):
+            nx, ny, nz = noise['position']
+            lines.append(f"Gürültü {idx} Tahmin: Konum=({nx:.2f}, {ny:.2f}, {nz:.2f}), dB={noise['db']:.2f}\n")
+        return lines
+
+    def render(self, page=0, page_size=REPORT_PAGE_MICS):
+        """
+        Bir rapor sayfasının metnini üretir. Her sayfa kendi mikrofonlarını ve ortak özeti içerir;
+        tek sayfalık raporlar eski calculation_steps metniyle aynıdır.
+        """
+        pages = self.page_count(page_size)
+        page = min(max(page, 0), pages - 1)
+        start = page * page_size
+        stop = min(start + page_size, len(self.measured_db))
+        header = "Mikrofonlarda Ölçülen dB Değerleri:\n"
+        if pages > 1:
+            header = f"Mikrofonlarda Ölçülen dB Değerleri (Mikrofon {start + 1}-{stop} / {len(self.measured_db)}):\n"
+        return "".join([header] + self.mic_lines(start, stop) + self.summary_lines())
@@ -0,0 +1,123 @@
+"""
+Lokalizasyon çözümlerini Qt ana iş parçacığı dışında çalıştıran arka plan işçisi.
+
+Arayüz çözümü bir fonksiyon olarak gönderir: solve(callback) -> sonuç. Fonksiyon
+bir QThreadPool iş parçacığında çalışır; sonuç, hata ve ilerleme (iterasyon,
+güncel kare hata) Qt sinyalleriyle ana iş parçacığına döner.
+
+Her gönderim yeni bir istek numarası alır. Yeni bir istek geldiğinde veya
+cancel() çağrıldığında eski istek bayatlar: henüz başlamamışsa hiç çalışmaz,
+çalışıyorsa bir sonraki optimizer callback'inde SolveCancelled ile durdurulur,
+yine de biten bayat sonuçlar arayüze iletilmez.
+"""
+import time
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+# İlerleme sinyalleri arasındaki en kısa süre (s); arayüz olay kuyruğunu her iterasyonda doldurmamak için
+PROGRESS_INTERVAL = 0.05
+
+
+class SolveCancelled(Exception):
+    """Daha yeni bir istek geldiği için bayatlamış çözüm durduruldu."""
+
+
+class SolveSignals(QObject):
+    """QRunnable bir QObject olmadığından sinyaller ayrı bir nesnede tutulur."""
+    progress = pyqtSignal(int, int, float)  # istek numarası, iterasyon, kare hata
+    finished = pyqtSignal(int, object)      # istek numarası, sonuç
+    failed = pyqtSignal(int, str)           # istek numarası, hata mesajı
+
+
+class SolveTask(QRunnable):
+    """Tek bir çözüm isteği; is_stale(request_id) True döndüğünde kendini durdurur."""
+
+    def __init__(self, request_id, solve, signals, is_stale):
+        super().__init__()
+        self.request_id = request_id
+        self.solve = solve
+        self.signals = signals
+        self.is_stale = is_stale
+        self.last_progress = 0.0
+
+    def callback(self, iteration, cost):
+        """Optimizer callback'i: bayat isteği durdurur, ilerlemeyi seyreltilmiş olarak bildirir."""
+        if self.is_stale(self.request_id):
+            raise SolveCancelled()
+        now = time.perf_counter()
+        if now - self.last_progress >= PROGRESS_INTERVAL:
+            self.last_progress = now
+            self.signals.progress.emit(self.request_id, iteration, cost)
+
+    def run(self):
+        if self.is_stale(self.request_id):
+            return
+        try:
+            result = self.solve(self.callback)
+        except SolveCancelled:
+            return
+        except Exception as exc:
+            self.signals.failed.emit(self.request_id, str(exc))
+            return
+        self.signals.finished.emit(self.request_id, result)
+
+
+class LocalizationWorker(QObject):
+    """
+    En fazla bir güncel isteği olan arka plan çözücüsü.
+    Sinyaller yalnızca güncel istek için yayılır:
+        progress(iteration, cost), finished(result), failed(message)
+    """
+    progress = pyqtSignal(int, float)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, parent=None, max_threads=1):
+        super().__init__(parent)
+        # Ayrı havuz: tek iş parçacığıyla istekler sırayla çalışır, bayat istekler hızla atlanır
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self.request_id = 0
+        self.signals = SolveSignals(self)
+        self.signals.progress.connect(self._on_progress)
+        self.signals.finished.connect(self._on_finished)
+        self.signals.failed.connect(self._on_failed)
+
+    def is_stale(self, request_id):
+        return request_id != self.request_id
+
+    @property
+    def busy(self):
+        return self.pool.activeThreadCount() > 0
+
+    def submit(self, solve):
+        """
+        solve(callback) fonksiyonunu arka planda çalıştırır; önceki istekleri bayatlatır.
+        callback(iteration, cost) optimizer iterasyonlarında çağrılmalıdır.
+        Dönüş: istek numarası
+        """
+        self.request_id += 1
+        self.pool.start(SolveTask(self.request_id, solve, self.signals, self.is_stale))
+        return self.request_id
+
+    def cancel(self):
+        """Güncel isteği bayatlatır; sonucu arayüze iletilmez."""
+        self.request_id += 1
+
+    def shutdown(self, msecs=-1):
+        """Bekleyen istekleri iptal eder ve çalışan çözümün durmasını bekler (pencere kapanırken)."""
+        self.cancel()
+        self.pool.clear()
+        return self.pool.waitForDone(msecs)
+
+    def _on_progress(self, request_id, iteration, cost):
+        if not self.is_stale(request_id):
+            self.progress.emit(iteration, cost)
+
+    def _on_finished(self, request_id, result):
+        if not self.is_stale(request_id):
+            self.finished.emit(result)
+
+    def _on_failed(self, request_id, message):
+        if not self.is_stale(request_id):
+            self.failed.emit(message)
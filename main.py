@@ -3,55 +3,92 @@ import numpy as np
 from PyQt5 import QtCore, QtWidgets
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QVBoxLayout, QHBoxLayout,
-    QWidget, QPushButton, QTextEdit, QLabel, QScrollArea
+    QWidget, QPushButton, QTextEdit, QLabel, QScrollArea, QComboBox, QSpinBox, QCheckBox
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
-from scipy.optimize import minimize
-import math
+import os
 import random
+import time
 from mpl_toolkits.mplot3d import Axes3D
+from localization_engine import (
+    LocalizationEngine, Scene, generate_buildings, generate_multiple_noise_sources,
+    generate_random_mic_positions
+)
+from localization_report import REPORT_PAGE_MICS, LocalizationReport
+from localization_worker import LocalizationWorker
+from tracking import SourceTracker, circle_trajectory
+from scene_artists import SceneArtists, ray_segments
 
 # Ses hızı (m/s)
 SOUND_SPEED = 343
 
+# Lokalizasyon çözücüleri: arayüzde gösterilen ad -> yöntem
+# SLSQP: skaler kare hata toplamı, TRF/LM: mikrofon başına artık vektörü (scipy least_squares)
+SOLVER_METHODS = {
+    'SLSQP': 'SLSQP',
+    'Trust Region (TRF)': 'trf',
+    'Levenberg-Marquardt (LM)': 'lm',
+}
+
+# Çoklu başlangıçta eşzamanlı çözüm süreci sayısı (başlangıç sayısıyla sınırlanır)
+MULTISTART_WORKERS = max(2, os.cpu_count() or 1)
+
+# Takip modunda ölçüm / çözüm aralığı (ms); 10 ms = 100 Hz
+TRACKING_INTERVAL_MS = 10
+# Takip modunda grafiğin yeniden çizilme aralığı (s); çizim çözümden çok yavaş olduğundan her karede yapılmaz
+TRACKING_REDRAW_INTERVAL = 0.25
+
 class SoundSourceLocalization3D(QMainWindow):
     def __init__(self):
         super().__init__()
         self.setWindowTitle('3D Ses Kaynağı Simülasyonu')
         self.setGeometry(100, 100, 1500, 910)  # Pencere boyutunu belirler
         # Mikrofonların başlangıç konumları (18 mikrofon, tamamen rastgele dağılım)
-        self.default_mic_positions = self.generate_random_mic_positions(num_mics=18)
+        self.default_mic_positions = generate_random_mic_positions(num_mics=18)
         self.mic_positions = np.copy(self.default_mic_positions)  # Aktif mikrofon konumları
         self.source_point = None  # Gerçek ses kaynağı konumu
         self.source_db = None  # Gerçek ses kaynağı desibel değeri
         self.estimated_point = None  # Tahmin edilen ses kaynağı konumu
         self.estimated_D = None  # Tahmin edilen ses kaynağı desibel değeri
-        self.calculation_steps = ""  # Hesaplama adımlarını tutar
+        self.report = None  # Son lokalizasyonun yapılandırılmış raporu (metin gösterilirken üretilir)
+        self.report_page = 0  # Gösterilen rapor sayfası
         self.average_db = None  # Ortalama desibel değeri
+        self.solver_method = 'SLSQP'  # Lokalizasyonda kullanılan çözücü
+        self.start_count = 1  # Çoklu başlangıç sayısı (1: yalnızca sezgisel başlangıç)
+        self.seeding = 'heuristic'  # Başlangıç tahmini: 'heuristic' veya 'grid'
 
         # Ambient (ortam) gürültü kaynakları (3 Boyutlu)
-        self.noise_sources = self.generate_multiple_noise_sources(count=2)
+        self.noise_sources = generate_multiple_noise_sources(count=2)
         self.estimated_noise_sources = []  # Tahmin edilen gürültü kaynakları
 
         # Binalar
         self.buildings = []  # Bina verilerini saklamak için liste
-
-        # Grafik öğelerini saklamak için değişkenler
-        self.mic_scatter = None
-        self.mic_texts = []
-        self.noise_scatter = []
-        self.noise_texts = []
-        self.estimated_noise_scatter = []
-        self.estimated_noise_texts = []
-        self.source_scatter = None
-        self.source_text = None
-        self.estimated_scatter = None
-        self.estimated_text = None
-
-        # Ses kaynağından mikrofonlara çizilen çizgileri saklamak için liste
-        self.source_to_mic_lines = []
+        self.update_scene()  # Headless lokalizasyon sahnesi
+
+        # Grafik öğeleri bir kez oluşturulur ve yerinde güncellenir (initial_plot)
+        self.artists = None
+        self.info_labels = []  # Bilgi panelinde yeniden kullanılan QLabel'lar
+
+        # Lokalizasyon arka planda çözülür; yeni bir istek devam eden eski isteği geçersiz kılar
+        self.worker = LocalizationWorker(self)
+        self.worker.progress.connect(self.on_localization_progress)
+        self.worker.finished.connect(self.on_localization_finished)
+        self.worker.failed.connect(self.on_localization_failed)
+
+        # Takip modu: kaynak bir yörüngede hareket eder, her kare önceki tahminden sıcak başlatılır
+        self.tracker = None
+        self.use_kalman = True  # Sıcak başlangıç konumu sabit hızlı Kalman öngörüsüyle
+        self.tracking_start = None
+        self.tracking_last_redraw = 0.0
+        self.tracking_timer = QTimer(self)
+        self.tracking_timer.timeout.connect(self.tracking_step)
+        # Takip kareleri ayrı bir arka plan işçisinde çözülür; bir kare çözülürken gelen kareler atlanır
+        self.tracking_worker = LocalizationWorker(self)
+        self.tracking_worker.finished.connect(self.on_tracking_frame)
+        self.tracking_worker.failed.connect(self.on_tracking_failed)
+        self.tracking_busy = False
 
         # Kullanıcı arayüzünü başlat
         self.initUI()
@@ -109,12 +146,63 @@ class SoundSourceLocalization3D(QMainWindow):
         self.random_source_button.clicked.connect(self.add_random_sound_source)
         control_layout.addWidget(self.random_source_button)
 
-        # Hesaplama Adımları metin kutusu: Hesaplama süreçlerini gösterir
+        # Çözüm durumu: arka plandaki çözücünün iterasyon sayısı ve güncel kare hatası
+        self.solve_status_label = QLabel("Çözücü: Hazır")
+        control_layout.addWidget(self.solve_status_label)
+
+        # Takip modu: kaynak çembersel bir yörüngede hareket eder ve her karede izlenir
+        self.tracking_checkbox = QCheckBox("Takip Modu (Hareketli Kaynak)")
+        self.tracking_checkbox.toggled.connect(self.set_tracking)
+        control_layout.addWidget(self.tracking_checkbox)
+        self.kalman_checkbox = QCheckBox("Kalman Öngörüsü")
+        self.kalman_checkbox.setChecked(self.use_kalman)
+        self.kalman_checkbox.toggled.connect(self.set_kalman)
+        control_layout.addWidget(self.kalman_checkbox)
+
+        # Çözücü seçimi: SLSQP veya artık vektörü tabanlı en küçük kareler (TRF / LM)
+        control_layout.addWidget(QLabel("Çözücü:"))
+        self.solver_combo = QComboBox()
+        self.solver_combo.addItems(list(SOLVER_METHODS.keys()))
+        self.solver_combo.currentTextChanged.connect(self.set_solver_method)
+        control_layout.addWidget(self.solver_combo)
+
+        # Çoklu başlangıç: sezgisel başlangıca ek Latin hiperküp başlangıçları sırayla çözülür (erken durmalı)
+        control_layout.addWidget(QLabel("Başlangıç Sayısı:"))
+        self.start_count_spin = QSpinBox()
+        self.start_count_spin.setRange(1, 64)
+        self.start_count_spin.setValue(self.start_count)
+        self.start_count_spin.valueChanged.connect(self.set_start_count)
+        control_layout.addWidget(self.start_count_spin)
+
+        # Izgara tohumlama: çözücü, kabadan inceye ızgara aramasının en iyi hücresinden başlar
+        self.grid_seed_checkbox = QCheckBox("Izgara Araması ile Başlat")
+        self.grid_seed_checkbox.toggled.connect(self.set_grid_seeding)
+        control_layout.addWidget(self.grid_seed_checkbox)
+
+        # Hesaplama Adımları: rapor yalnızca panel görünürken ve sayfa sayfa metne dönüştürülür
+        self.report_checkbox = QCheckBox("Hesaplama Adımlarını Göster")
+        self.report_checkbox.setChecked(True)
+        self.report_checkbox.toggled.connect(self.set_report_visible)
+        control_layout.addWidget(self.report_checkbox)
         self.text_box = QTextEdit()
         self.text_box.setReadOnly(True)
-        control_layout.addWidget(QLabel("Hesaplama Adımları:"))
         control_layout.addWidget(self.text_box)
 
+        # Rapor sayfalama: büyük mikrofon dizilerinde her sayfada REPORT_PAGE_MICS mikrofon gösterilir
+        self.report_page_widget = QWidget()
+        page_layout = QHBoxLayout(self.report_page_widget)
+        page_layout.setContentsMargins(0, 0, 0, 0)
+        self.prev_page_button = QPushButton('<')
+        self.prev_page_button.clicked.connect(lambda: self.change_report_page(-1))
+        self.page_label = QLabel("Sayfa 1/1")
+        self.page_label.setAlignment(Qt.AlignCenter)
+        self.next_page_button = QPushButton('>')
+        self.next_page_button.clicked.connect(lambda: self.change_report_page(1))
+        page_layout.addWidget(self.prev_page_button)
+        page_layout.addWidget(self.page_label)
+        page_layout.addWidget(self.next_page_button)
+        control_layout.addWidget(self.report_page_widget)
+
         # Ambient Gürültü Bilgisi bölümü (Scroll Area ile)
         control_layout.addWidget(QLabel("Ses Bilgileri:"))
         self.noise_info_scroll = QScrollArea()
@@ -130,72 +218,114 @@ class SoundSourceLocalization3D(QMainWindow):
         layout.addWidget(self.canvas, 70)
         layout.addLayout(control_layout, 30)
 
-    def generate_random_mic_positions(self, num_mics=18):
-        """Tamamen rastgele mikrofon konumları oluşturur (3D düzlem üzerinde)."""
-        positions = []
-        for _ in range(num_mics):
-            x = np.random.uniform(-15, 25)
-            y = np.random.uniform(-15, 25)
-            z = np.random.uniform(-10, 10)
-            positions.append([x, y, z])
-        return np.array(positions)
-
-    def generate_random_noise_source(self):
-        """
-        Rastgele bir konum ve desibel değeri ile ambient gürültü kaynağı oluşturur.
-        """
-        x = random.uniform(-15, 25)
-        y = random.uniform(-15, 25)
-        z = random.uniform(-10, 10)
-        db = random.uniform(60, 90)
-        return {'position': np.array([x, y, z]), 'db': db}
-
-    def generate_multiple_noise_sources(self, count=2):
-        """Belirli sayıda rastgele ambient gürültü kaynağı oluşturur."""
-        noise_sources = []
-        for _ in range(count):
-            noise = self.generate_random_noise_source()
-            noise_sources.append(noise)
-        return noise_sources
-
-    def generate_buildings(self, count):
-        """
-        Belirli sayıda rastgele bina oluşturur.
-        count: Bina sayısı
-        """
-        buildings = []
-        for _ in range(count):
-            width = random.uniform(5, 10)
-            depth = random.uniform(5, 10)
-            height = random.uniform(10, 15)
-            x = random.uniform(-15, 25 - width)
-            y = random.uniform(-15, 25 - depth)
-            z = 0  # Binalar zeminde başlar
-            buildings.append({'position': (x, y, z), 'size': (width, depth, height)})
-        return buildings
-
-    def calculate_distance(self, mic_pos, source_pos):
+    def set_solver_method(self, name):
+        """Arayüzde seçilen çözücüyü ayarlar."""
+        self.solver_method = SOLVER_METHODS[name]
+
+    def set_start_count(self, value):
+        """Lokalizasyonda kullanılacak başlangıç sayısını ayarlar."""
+        self.start_count = value
+
+    def set_grid_seeding(self, enabled):
+        """Başlangıç tahmininin ızgara aramasıyla yapılıp yapılmayacağını ayarlar."""
+        self.seeding = 'grid' if enabled else 'heuristic'
+
+    def set_kalman(self, enabled):
+        """Takip modunda Kalman öngörüsünün kullanılıp kullanılmayacağını ayarlar."""
+        self.use_kalman = enabled
+        if self.tracker is not None:
+            self.set_tracking(True)  # Takibi yeni ayarla yeniden başlat
+
+    def set_tracking(self, enabled):
+        """Takip modunu başlatır / durdurur."""
+        self.tracking_timer.stop()
+        self.tracking_worker.cancel()  # Eski takipçinin bekleyen karesi arayüze uygulanmaz
+        self.tracking_busy = False
+        self.tracker = None
+        if not enabled:
+            self.solve_status_label.setText("Çözücü: Hazır")
+            return
+        self.worker.cancel()  # Arka planda devam eden tek seferlik çözüm varsa sonucu gösterilmez
+        engine = LocalizationEngine(self.scene, method=self.solver_method)
+        self.tracker = SourceTracker(engine, predictor=True if self.use_kalman else None)
+        self.source_db = 80.0 if self.source_db is None else self.source_db
+        self.tracking_start = time.perf_counter()
+        self.tracking_last_redraw = 0.0
+        self.tracking_timer.start(TRACKING_INTERVAL_MS)
+
+    def tracking_step(self):
         """
-        Mikrofon ile ses kaynağı arasındaki mesafeyi hesaplar (3D).
-        mic_pos: Mikrofonun (x, y, z) koordinatları
-        source_pos: Ses kaynağının (x, y, z) koordinatları
+        Takip karesi: kaynağı yörüngede ilerletir, ölçümleri sentezler ve sıcak başlatılmış çözüm yapar.
+        Kare arka plan işçisinde çözülür (yeniden yakalama ızgara araması arayüzü bloklamaz);
+        önceki kare hâlâ çözülüyorsa bu kare atlanır.
         """
-        distance = np.sqrt((mic_pos[0] - source_pos[0]) ** 2 +
-                           (mic_pos[1] - source_pos[1]) ** 2 +
-                           (mic_pos[2] - source_pos[2]) ** 2)
-        return max(distance, 1e-6)  # Sıfıra çok yakın değerlerde hata önleme
+        if self.tracking_busy:
+            return
+        self.tracking_busy = True
+        tracker, scene, source_db, tracking_start = self.tracker, self.scene, self.source_db, self.tracking_start
+
+        def solve(callback):
+            t = time.perf_counter() - tracking_start
+            source_point = circle_trajectory(t)
+            measured_db, mic_blocked_status = scene.synthesize_measurements(source_point, source_db)
+            result = tracker.step(measured_db, mic_blocked_status, timestamp=t)
+            return t, source_point, result, tracker.stats()
+        self.tracking_worker.submit(solve)
+
+    def on_tracking_frame(self, frame):
+        """Arka planda çözülen takip karesini arayüze uygular (ana iş parçacığında)."""
+        self.tracking_busy = False
+        t, self.source_point, result, stats = frame
+        if result.position is not None:
+            self.estimated_point = result.position
+            self.estimated_D = result.db
+            self.estimated_noise_sources = result.noise_sources
+        self.solve_status_label.setText(
+            f"Takip: {stats.update_rate:.0f} Hz, Gecikme p50/p95: {stats.latency_p50 * 1000:.1f}/"
+            f"{stats.latency_p95 * 1000:.1f} ms, Çözücü sınırı: {stats.solver_rate:.0f} Hz")
+        if t - self.tracking_last_redraw >= TRACKING_REDRAW_INTERVAL:
+            self.tracking_last_redraw = t
+            self.update_plot_elements()
+
+    def on_tracking_failed(self, message):
+        """Takip karesi hata ile sonlandı; sonraki kare yeniden denenir."""
+        self.tracking_busy = False
+        self.solve_status_label.setText(f"Takip: Hata - {message}")
+
+    def set_report_visible(self, visible):
+        """Hesaplama adımları panelini gösterir / gizler; gösterilirken rapor metni güncellenir."""
+        self.text_box.setVisible(visible)
+        self.report_page_widget.setVisible(visible)
+        self.refresh_report()
+
+    def change_report_page(self, step):
+        """Rapor sayfasını ileri / geri alır."""
+        if self.report is None:
+            return
+        self.report_page = min(max(self.report_page + step, 0), self.report.page_count() - 1)
+        self.refresh_report()
 
-    def calculate_db(self, distance, source_db):
+    def refresh_report(self):
+        """Rapor panelini günceller; panel gizliyse metin üretilmez."""
+        if not self.text_box.isVisibleTo(self):
+            return
+        if self.report is None:
+            self.text_box.setPlainText("")
+            self.page_label.setText("Sayfa 1/1")
+            return
+        pages = self.report.page_count(REPORT_PAGE_MICS)
+        self.report_page = min(self.report_page, pages - 1)
+        self.text_box.setPlainText(self.report.render(self.report_page, REPORT_PAGE_MICS))
+        self.page_label.setText(f"Sayfa {self.report_page + 1}/{pages}")
+        self.prev_page_button.setEnabled(self.report_page > 0)
+        self.next_page_button.setEnabled(self.report_page < pages - 1)
+
+    def update_scene(self):
         """
-        Verilen mesafeye ve kaynak desibeline göre desibel değerini hesaplar.
-        distance: Mikrofon ile ses kaynağı arasındaki mesafe (m)
-        source_db: Ses kaynağının desibel değeri (dB)
+        Mikrofon, gürültü kaynağı veya bina değişikliklerinden sonra headless sahneyi yeniden oluşturur.
+        Tüm sayısal hesaplamalar (engelleme, ölçüm sentezi, lokalizasyon) bu sahne üzerinden yapılır.
         """
-        if distance <= 0:
-            return source_db  # Maksimum desibel
-        # Desibel azalması: dB = kaynak_dB - 20 * log10(r)
-        db = source_db - 20 * math.log10(distance)
-        return db
+        self.scene = Scene(self.mic_positions, self.noise_sources, self.buildings)
 
     def initial_plot(self):
         """
@@ -218,65 +348,32 @@ class SoundSourceLocalization3D(QMainWindow):
         # Grafiğin başlangıç görünümünü ayarla
         self.ax.view_init(elev=30, azim=-60)  # İstediğiniz açıları ayarlayabilirsiniz
 
-        # Mikrofonları çiz
-        self.mic_scatter = self.ax.scatter(
-            self.mic_positions[:, 0], self.mic_positions[:, 1], self.mic_positions[:, 2],
-            color='blue', label="Mikrofonlar", s=100
-        )
-        # Mikrofon etiketlerini ekle
-        for i, pos in enumerate(self.mic_positions):
-            text = self.ax.text(pos[0], pos[1], pos[2], f'M{i+1}', fontsize=8, ha='right', va='bottom')
-            self.mic_texts.append(text)
-
-        # Ambient Gürültü Bilgisi bölümünü temizle
-        for i in reversed(range(self.noise_info_layout.count())):
-            widget_to_remove = self.noise_info_layout.itemAt(i).widget()
-            self.noise_info_layout.removeWidget(widget_to_remove)
-            widget_to_remove.setParent(None)
-
-        # Ambient Gürültü Kaynaklarını çiz ve bilgilerini ekle
-        for idx, noise in enumerate(self.noise_sources, start=1):
-            # Marker boyutunu dB seviyesine göre ayarla (60-90 dB arasında 50-150 büyüklük)
-            marker_size = 50 + (noise['db'] - 60) * 2
-            marker_size = max(marker_size, 10)  # Marker boyutu en az 10 olmalı
-            scatter = self.ax.scatter(
-                noise['position'][0], noise['position'][1], noise['position'][2],
-                color='orange',  # Turuncu renkte işaretçi
-                label=f"Gürültü Kaynağı {idx}" if idx == 1 else "",
-                s=marker_size,
-                marker='x'  # X işaretçi
-            )
-            self.noise_scatter.append(scatter)
-            # Desibel seviyesini marker'ın yanında göster
-            text = self.ax.text(
-                noise['position'][0], noise['position'][1], noise['position'][2],
-                f' {noise["db"]:.1f} dB', fontsize=8,
-                ha='left', va='bottom'
-            )
-            self.noise_texts.append(text)
-            # Gürültü bilgilerini kontrol paneline ekle
-            noise_info = QLabel(f"Gürültü {idx} Bilinen: Konum=({noise['position'][0]:.2f}, {noise['position'][1]:.2f}, {noise['position'][2]:.2f}), dB={noise['db']:.2f}")
-            self.noise_info_layout.addWidget(noise_info)
-
-        # Binaları çiz
-        for building in self.buildings:
-            x, y, z = building['position']
-            dx, dy, dz = building['size']
-            self.ax.bar3d(x, y, z, dx, dy, dz, color='brown', alpha=0.8, shade=True, edgecolor='black')
-
-        # Gerçek Ses Kaynağı (Başlangıçta boş)
-        self.source_scatter = self.ax.scatter([], [], [], color='red', label="Gerçek Ses Kaynağı", s=300, marker='o', edgecolors='black', linewidths=1)
-        self.source_text = None  # Başlangıçta None
-
-        # Tahmin Edilen Ses Kaynağı (Başlangıçta boş)
-        self.estimated_scatter = self.ax.scatter([], [], [], color='green', label="Tahmin Edilen Ses Kaynağı", s=200, marker='o', edgecolors='black', linewidths=1)
-        self.estimated_text = None  # Başlangıçta None
+        # Sahne öğelerini bir kez oluştur; sonraki değişiklikler update_plot_elements ile yerinde yapılır
+        self.artists = SceneArtists(self.ax)
+        self.update_plot_elements()
 
         # Legend ekle
         self.ax.legend(loc='upper right', fontsize=8)
         # Grafiği çiz
         self.canvas.draw()
 
+    @staticmethod
+    def noise_marker_sizes(noise_sources):
+        """Marker boyutunu dB seviyesine göre ayarlar (60-90 dB arasında 50-110 büyüklük, en az 10)."""
+        return [max(50 + (noise['db'] - 60) * 2, 10) for noise in noise_sources]
+
+    def update_info_panel(self, lines):
+        """Bilgi panelindeki etiketleri günceller; var olan QLabel'lar yeniden kullanılır."""
+        while len(self.info_labels) < len(lines):
+            label = QLabel()
+            self.noise_info_layout.addWidget(label)
+            self.info_labels.append(label)
+        for label, line in zip(self.info_labels, lines):
+            label.setText(line)
+            label.setVisible(True)
+        for label in self.info_labels[len(lines):]:
+            label.setVisible(False)
+
     def on_click(self, event):
         """
         Mouse tıklama event handler.
@@ -287,6 +384,7 @@ class SoundSourceLocalization3D(QMainWindow):
 
     def add_random_sound_source(self):
         """Rastgele bir ses kaynağı ekler."""
+        self.tracking_checkbox.setChecked(False)  # Takip modundaki hareketli kaynak durdurulur
         # Ses kaynağı için tamamen rastgele bir konum belirle
         x = random.uniform(-15, 25)
         y = random.uniform(-15, 25)
@@ -295,180 +393,96 @@ class SoundSourceLocalization3D(QMainWindow):
 
         self.source_point = new_pos
         self.source_db = random.uniform(60, 100)
+        # Önceki kaynağın tahmini, yeni çözüm gelene kadar gösterilmez
+        self.estimated_point = None
+        self.estimated_D = None
+        self.estimated_noise_sources = []
         self.update_plot_elements()  # Grafiği güncelle
         self.perform_localization()
 
-    def is_path_blocked(self, start_point, end_point):
-        """
-        Ses kaynağı ile mikrofon arasındaki yolun bir bina tarafından engellenip engellenmediğini kontrol eder.
-        start_point: Başlangıç noktası (ses kaynağı)
-        end_point: Bitiş noktası (mikrofon)
-        """
-        for building in self.buildings:
-            if self.line_intersects_box(start_point, end_point, building):
-                return True  # Yol engellenmiş
-        return False  # Yol engellenmemiş
-
-    def line_intersects_box(self, p0, p1, box):
+    def perform_localization(self):
         """
-        Bir çizginin (p0, p1) bir kutu (box) ile kesişip kesişmediğini kontrol eder.
-        p0: Çizginin başlangıç noktası (x, y, z)
-        p1: Çizginin bitiş noktası (x, y, z)
-        box: Kutu verileri {'position': (x, y, z), 'size': (dx, dy, dz)}
+        Ses kaynağının yerini ve desibel değerini tahmin eder.
+        Ölçümler ana iş parçacığında sentezlenir; çözüm arka plan işçisinde çalışır ve sonuç
+        on_localization_finished ile gelir. Devam eden eski bir çözüm bu istekle geçersiz olur.
         """
-        x_min = box['position'][0]
-        y_min = box['position'][1]
-        z_min = box['position'][2]
-        x_max = x_min + box['size'][0]
-        y_max = y_min + box['size'][1]
-        z_max = z_min + box['size'][2]
-
-        box_min = np.array([x_min, y_min, z_min])
-        box_max = np.array([x_max, y_max, z_max])
-        p0 = np.array(p0)
-        p1 = np.array(p1)
-
-        # Çizgi segmentinin parametreleri
-        direction = p1 - p0
-        tmin = 0.0
-        tmax = 1.0
-
-        for i in range(3):  # x, y, z için
-            if abs(direction[i]) < 1e-8:
-                # Çizgi bu eksene paralel
-                if p0[i] < box_min[i] or p0[i] > box_max[i]:
-                    return False  # Çizgi kutunun dışında
-            else:
-                ood = 1.0 / direction[i]
-                t1 = (box_min[i] - p0[i]) * ood
-                t2 = (box_max[i] - p0[i]) * ood
-                t_enter = min(t1, t2)
-                t_exit = max(t1, t2)
-                tmin = max(tmin, t_enter)
-                tmax = min(tmax, t_exit)
-                if tmin > tmax:
-                    return False  # Kesişim yok
-        return True  # Kesişim var
-
-    def perform_localization(self):
-        """Ses kaynağının yerini ve desibel değerini tahmin eder."""
         if self.source_point is None:
             return
 
-        measured_db = []
-        self.calculation_steps = "Mikrofonlarda Ölçülen dB Değerleri:\n"
-        mic_blocked_status = []
-
-        # Ölçülen dB değerlerini hesapla
-        for idx_mic, mic in enumerate(self.mic_positions):
-            total_power = 0
-            self.calculation_steps += f"\nMikrofon {idx_mic + 1}:\n"
-            blocked = self.is_path_blocked(self.source_point, mic)
-            mic_blocked_status.append(blocked)
-            
-            if not blocked:
-                distance = self.calculate_distance(mic, self.source_point)
-                db = self.calculate_db(distance, self.source_db)
-                power = 10 ** (db / 10)
-                total_power += power
-                self.calculation_steps += f"  Kaynak ({self.source_point[0]:.2f}, {self.source_point[1]:.2f}, {self.source_point[2]:.2f}), Mesafe: {distance:.2f} m, dB: {db:.2f}, Engellenmemiş\n"
-            else:
-                self.calculation_steps += f"  Kaynak ({self.source_point[0]:.2f}, {self.source_point[1]:.2f}, {self.source_point[2]:.2f}), Engellenmiş\n"
-            
-            total_db = 10 * math.log10(total_power) if total_power > 0 else 0
-            measured_db.append(total_db)
-            self.calculation_steps += f"  Toplam dB: {total_db:.2f}\n"
-
-        # Ortalama dB değerini hesapla
+        # Ölçülen dB değerlerini headless sahne üzerinden sentezle
+        measured_db, mic_blocked_status = self.scene.synthesize_measurements(self.source_point, self.source_db)
         self.average_db = np.mean(measured_db)
-        self.calculation_steps += f"\nOrtalama dB: {self.average_db:.2f}\n"
-
-        # Engellenmemiş mikrofonları filtrele
-        unblocked_mic_indices = [i for i, blocked in enumerate(mic_blocked_status) if not blocked]
-        filtered_measured_db = [measured_db[i] for i in unblocked_mic_indices]
-        filtered_mic_positions = [self.mic_positions[i] for i in unblocked_mic_indices]
-
-        def objective_function(params):
-            """Optimizasyon fonksiyonu"""
-            x, y, z, D = params[:4]
-            noise_params = params[4:]
-            total_error = 0
-
-            # Her mikrofon için hata hesapla
-            for i, mic in enumerate(filtered_mic_positions):
-                # Ana ses kaynağından gelen güç
-                distance = self.calculate_distance(mic, [x, y, z])
-                predicted_db = self.calculate_db(distance, D)
-                total_power = 10 ** (predicted_db / 10)
-
-                # Gürültü kaynaklarından gelen güç
-                for j in range(0, len(noise_params), 4):
-                    n_x, n_y, n_z, n_dB = noise_params[j:j+4]
-                    n_distance = self.calculate_distance(mic, [n_x, n_y, n_z])
-                    n_db = self.calculate_db(n_distance, n_dB)
-                    n_power = 10 ** (n_db / 10)
-                    total_power += n_power
-
-                # Toplam dB hesapla
-                total_db = 10 * math.log10(total_power) if total_power > 0 else 0
-                
-                # Kare hatayı hesapla
-                error = (total_db - filtered_measured_db[i]) ** 2
-                total_error += error
-
-            return total_error
-
-        # Optimizasyon için başlangıç tahminini belirle
-        x0 = list(np.mean(filtered_mic_positions, axis=0)) + [self.average_db]
-        for noise in self.noise_sources:
-            x0.extend(noise['position'].tolist() + [noise['db']])
-
-        # Optimizasyon sınırlarını belirle
-        bounds = []
-        # Konum sınırları
-        bounds.extend([(-15, 25), (-15, 25), (-10, 10)])
-        # dB sınırları
-        bounds.extend([(40, 100)])
-        # Gürültü kaynakları için sınırlar
-        for _ in range(len(self.noise_sources)):
-            bounds.extend([(-15, 25), (-15, 25), (-10, 10), (40, 100)])
-
-        # Optimizasyon işlemini gerçekleştir
-        res = minimize(objective_function, x0, method='SLSQP', bounds=bounds)
-        
-        # Sonuçları sakla
-        self.estimated_point = res.x[:3]
-        self.estimated_D = res.x[3]
-        
-        # Tahmin edilen gürültü kaynaklarını güncelle
-        self.estimated_noise_sources = []
-        for j in range(4, len(res.x), 4):
-            n_x, n_y, n_z, n_dB = res.x[j:j+4]
-            self.estimated_noise_sources.append({'position': np.array([n_x, n_y, n_z]), 'db': n_dB})
+        self.report = LocalizationReport.from_measurements(
+            self.mic_positions, self.source_point, self.source_db, measured_db, mic_blocked_status,
+            propagation=self.scene.propagation)
+        self.report_page = 0
+        self.refresh_report()
+
+        # Lokalizasyonu headless motor ile gerçekleştir (engellenmiş mikrofonlar çözüme katılmaz)
+        engine = LocalizationEngine(self.scene, method=self.solver_method)
+        if self.start_count > 1:
+            starts = self.start_count
+            workers = min(starts, MULTISTART_WORKERS)
+            solve = lambda callback: engine.localize_multistart(
+                measured_db, mic_blocked_status, starts=starts, workers=workers, callback=callback)
+        else:
+            seeding = self.seeding
+            solve = lambda callback: engine.localize(
+                measured_db, mic_blocked_status, seeding=seeding, callback=callback)
+        self.worker.submit(solve)
+        self.solve_status_label.setText("Çözücü: Çözülüyor...")
+
+    def on_localization_progress(self, iteration, cost):
+        """Arka plandaki çözücünün ilerlemesini gösterir."""
+        self.solve_status_label.setText(f"Çözücü: İterasyon {iteration}, Kare hata: {cost:.4g}")
+
+    def on_localization_failed(self, message):
+        """Arka plandaki çözüm hata ile sonlandı."""
+        self.solve_status_label.setText(f"Çözücü: Hata - {message}")
+
+    def on_localization_finished(self, result):
+        """Güncel lokalizasyon isteğinin sonucunu rapora ve grafiğe işler."""
+        self.solve_status_label.setText(
+            f"Çözücü: Tamamlandı ({result.nit} iterasyon, {result.elapsed * 1000:.0f} ms)")
+        self.report.result = result
+        if result.position is None:
+            self.refresh_report()
+            return
 
-        # Hesaplama adımlarına tahmin sonuçlarını ekle
-        self.calculation_steps += f"\nTahmin Edilen Konum: ({self.estimated_point[0]:.2f}, {self.estimated_point[1]:.2f}, {self.estimated_point[2]:.2f}), Tahmin Edilen dB: {self.estimated_D:.2f}\n"
-        for idx, noise in enumerate(self.estimated_noise_sources, start=1):
-            self.calculation_steps += f"Gürültü {idx} Tahmin: Konum=({noise['position'][0]:.2f}, {noise['position'][1]:.2f}, {noise['position'][2]:.2f}), dB={noise['db']:.2f}\n"
+        # Sonuçları sakla
+        self.estimated_point = result.position
+        self.estimated_D = result.db
+        self.estimated_noise_sources = result.noise_sources
 
-        # Metin kutusunu güncelle
-        self.text_box.setPlainText(self.calculation_steps)
+        # Rapor panelini güncelle (yalnızca görünürse metin üretilir)
+        self.refresh_report()
         # Grafiği güncelle
         self.update_plot_elements()
 
+    def closeEvent(self, event):
+        """Pencere kapanırken takip zamanlayıcısını ve arka plandaki çözümü durdurur."""
+        self.tracking_timer.stop()
+        self.tracking_worker.shutdown()
+        self.worker.shutdown()
+        super().closeEvent(event)
+
     def clear(self):
         """
         Ses kaynağı ve tahmin edilen noktaları siler.
         Grafiği ve hesaplama adımlarını temizler.
         Ayrıca Ambient Gürültü Bilgisi alanındaki ses kaynağı ve tahmin etiketlerini kaldırır.
         """
+        self.tracking_checkbox.setChecked(False)  # Takip modu durdurulur
+        self.worker.cancel()  # Devam eden çözümün sonucu artık gösterilmez
+        self.solve_status_label.setText("Çözücü: Hazır")
         self.source_point = None
         self.source_db = None
         self.estimated_point = None
         self.estimated_D = None
-        self.calculation_steps = ""
+        self.report = None
+        self.report_page = 0
         self.average_db = None
-        self.text_box.setPlainText("")
+        self.refresh_report()
 
         self.estimated_noise_sources = []
 
@@ -480,10 +494,11 @@ class SoundSourceLocalization3D(QMainWindow):
         Ayrıca ses kaynağı ve tahmin edilen noktaları temizler.
         """
         self.mic_positions = np.copy(self.default_mic_positions)  # Mikrofon konumlarını varsayılan değerlere döndür
-        self.noise_sources = self.generate_multiple_noise_sources(count=2)  # Gürültü kaynaklarını yenile
+        self.noise_sources = generate_multiple_noise_sources(count=2)  # Gürültü kaynaklarını yenile
         # Binaları oluştur
         building_count = random.randint(2, 3)
-        self.buildings = self.generate_buildings(building_count)
+        self.buildings = generate_buildings(building_count)
+        self.update_scene()  # Sahne değişti, headless sahneyi yeniden oluştur
         self.clear()  # Ses kaynağı ve tahminleri temizle
         self.update_plot_elements()  # Grafiği güncelle
 
@@ -492,150 +507,69 @@ class SoundSourceLocalization3D(QMainWindow):
         Mikrofon, gürültü kaynakları ve binaların pozisyonlarını rastgele olarak değiştirir.
         Ses kaynağı ve tahmin edilen noktaları temizler.
         """
-        self.mic_positions = self.generate_random_mic_positions(num_mics=18)  # Mikrofonları rastgele konumlandır
-        self.noise_sources = self.generate_multiple_noise_sources(count=2)  # Gürültü kaynaklarını rastgele konumlandır
+        self.mic_positions = generate_random_mic_positions(num_mics=18)  # Mikrofonları rastgele konumlandır
+        self.noise_sources = generate_multiple_noise_sources(count=2)  # Gürültü kaynaklarını rastgele konumlandır
         # Binaları oluştur
         building_count = random.randint(1, 3)
-        self.buildings = self.generate_buildings(building_count)
+        self.buildings = generate_buildings(building_count)
+        self.update_scene()  # Sahne değişti, headless sahneyi yeniden oluştur
         self.clear()  # Ses kaynağı ve tahminleri temizle
         self.update_plot_elements()  # Grafiği güncelle
 
     def update_plot_elements(self):
         """
-        Grafik öğelerini günceller (mikrofonlar, gürültü kaynakları, ses kaynakları).
-        Gerçek ses kaynağı ve tahmin edilen ses kaynağı grafiğe eklenir.
+        Grafik öğelerini günceller (mikrofonlar, gürültü kaynakları, binalar, ses kaynakları).
+        Öğeler initial_plot'ta bir kez oluşturulur; burada yalnızca verileri yerinde değiştirilir.
         Ambient Gürültü Bilgisi alanındaki bilgileri günceller.
         """
-        self.ax.clear()  # Grafiği temizle
-        self.initial_plot()  # Başlangıç grafiğini yeniden oluştur
+        artists = self.artists
+        artists.set_mics(self.mic_positions)
+        artists.set_noise_sources(self.noise_sources, self.noise_marker_sizes(self.noise_sources))
+        artists.set_buildings(self.buildings)
 
-        # Silinen çizgi referanslarını temizle
-        self.source_to_mic_lines = []
-
-        # Fare ile döndürme ayarlarını tekrar uygula
-        self.ax.mouse_init(rotate_btn=3, zoom_btn=None)
-
-        # Arka plan panellerinin renklerini tekrar ayarla
-        self.ax.xaxis.pane.set_facecolor((0.95, 0.95, 0.95, 1.0))  # Çok açık gri
-        self.ax.yaxis.pane.set_facecolor((0.88, 0.88, 0.88, 1.0))  # Daha açık gri
-        self.ax.zaxis.pane.set_facecolor((0.75, 0.75, 0.75, 1.0))  # Açık gri
-
-        # Grid çizgilerinin renklerini ayarla
-        self.ax.xaxis._axinfo["grid"]["color"] = "grey"
-        self.ax.yaxis._axinfo["grid"]["color"] = "grey"
-        self.ax.zaxis._axinfo["grid"]["color"] = "grey"
+        # Kaynaklardan mikrofonlara ışınlar tek bir Line3DCollection'da toplanır
+        segments, colors, linestyles = [], [], []
 
         # Gerçek Ses Kaynağı
         if self.source_point is not None:
-            # Ses kaynağını grafiğe ekle
-            self.source_scatter._offsets3d = (self.source_point[0:1], self.source_point[1:2], self.source_point[2:3])
             x, y, z = self.source_point
-            # Z koordinatına offset ekle
-            offset = 0.9
-            self.source_text = self.ax.text(
-                x, y, z - offset,
-                f'({x:.2f}, {y:.2f}, {z:.2f})', color='red', fontsize=10, fontweight='bold',
-                ha='center', va='top'
-            )
-
-            # Ses kaynağından mikrofonlara çizgileri çiz
-            for idx, mic_pos in enumerate(self.mic_positions):
-                blocked = self.is_path_blocked(self.source_point, mic_pos)
-                if blocked:
-                    color = 'red'
-                    linestyle = '--'
-                else:
-                    color = 'gray'
-                    linestyle = '-'
-                line, = self.ax.plot(
-                    [self.source_point[0], mic_pos[0]],
-                    [self.source_point[1], mic_pos[1]],
-                    [self.source_point[2], mic_pos[2]],
-                    color=color,
-                    linestyle=linestyle,
-                    linewidth=0.7
-                )
-                self.source_to_mic_lines.append(line)
-
+            artists.set_source(self.source_point, f'({x:.2f}, {y:.2f}, {z:.2f})')
+            # Engellenmiş yollar kırmızı kesikli, açık yollar gri düz çizgi
+            source_blocked = self.scene.blocked([self.source_point])[0]
+            segments.append(ray_segments(self.source_point, self.mic_positions))
+            colors.extend(np.where(source_blocked, 'red', 'gray'))
+            linestyles.extend(np.where(source_blocked, '--', '-'))
         else:
-            # Ses kaynağı yoksa scatter noktalarını temizle
-            self.source_scatter._offsets3d = ([], [], [])
+            artists.set_source(None)
 
         # Tahmin Edilen Ses Kaynağı
         if self.estimated_point is not None:
-            # Tahmin edilen ses kaynağını grafiğe ekle
-            self.estimated_scatter._offsets3d = (self.estimated_point[0:1], self.estimated_point[1:2], self.estimated_point[2:3])
-            x, y, z = self.estimated_point
-            # Z koordinatına offset ekle
-            offset = 0.9
-            self.estimated_text = self.ax.text(
-                x, y, z + offset,
-                f'Tahmin (dB: {self.estimated_D:.2f})', color='green', fontsize=9, fontweight='bold', 
-                ha='left', va='bottom'
-            )
-
-            # Tahmin edilen ses kaynağından mikrofonlara çizgileri çiz
-            for idx, mic_pos in enumerate(self.mic_positions):
-                blocked = self.is_path_blocked(self.estimated_point, mic_pos)
-                if blocked:
-                    color = 'red'
-                    linestyle = 'dashdot'
-                else:
-                    color = 'gray'
-                    linestyle = '--'
-                line, = self.ax.plot(
-                    [self.estimated_point[0], mic_pos[0]],
-                    [self.estimated_point[1], mic_pos[1]],
-                    [self.estimated_point[2], mic_pos[2]],
-                    color=color,
-                    linestyle=linestyle,
-                    linewidth=0.7
-                )
-                self.source_to_mic_lines.append(line)
-
-        # Ambient Gürültü Bilgisi bölümünü temizle
-        for i in reversed(range(self.noise_info_layout.count())):
-            widget_to_remove = self.noise_info_layout.itemAt(i).widget()
-            self.noise_info_layout.removeWidget(widget_to_remove)
-            widget_to_remove.setParent(None)
+            artists.set_estimate(self.estimated_point, f'Tahmin (dB: {self.estimated_D:.2f})')
+            # Engellenmiş yollar kırmızı noktalı-kesikli, açık yollar gri kesikli çizgi
+            estimated_blocked = self.scene.blocked([self.estimated_point])[0]
+            segments.append(ray_segments(self.estimated_point, self.mic_positions))
+            colors.extend(np.where(estimated_blocked, 'red', 'gray'))
+            linestyles.extend(np.where(estimated_blocked, 'dashdot', '--'))
+        else:
+            artists.set_estimate(None)
 
-        if self.source_point is not None:
-            source_info = QLabel(f"Ses Kaynağı: Konum=({self.source_point[0]:.2f}, {self.source_point[1]:.2f}, {self.source_point[2]:.2f}), dB={self.source_db:.2f}")
-            self.noise_info_layout.addWidget(source_info)
+        artists.set_rays(np.concatenate(segments) if segments else [], list(colors), list(linestyles))
 
-        # Tahmin edilen ses kaynağı bilgisini ekle
-        if self.estimated_point is not None:
-            estimated_source = QLabel(f"Ses Kaynağı Tahmin: Konum=({self.estimated_point[0]:.2f}, {self.estimated_point[1]:.2f}, {self.estimated_point[2]:.2f}), dB={self.estimated_D:.2f}")
-            self.noise_info_layout.addWidget(estimated_source)
+        # Tahmin edilen gürültü kaynakları
+        artists.set_estimated_noise_sources(self.estimated_noise_sources,
+                                            self.noise_marker_sizes(self.estimated_noise_sources))
 
-        # Gerçek gürültü kaynakları bilgisini ekle
+        # Ambient Gürültü Bilgisi bölümü
+        info = []
+        if self.source_point is not None:
+            info.append(f"Ses Kaynağı: Konum=({self.source_point[0]:.2f}, {self.source_point[1]:.2f}, {self.source_point[2]:.2f}), dB={self.source_db:.2f}")
+        if self.estimated_point is not None:
+            info.append(f"Ses Kaynağı Tahmin: Konum=({self.estimated_point[0]:.2f}, {self.estimated_point[1]:.2f}, {self.estimated_point[2]:.2f}), dB={self.estimated_D:.2f}")
         for idx, noise in enumerate(self.noise_sources, start=1):
-            noise_info = QLabel(f"Gürültü {idx} Bilinen: Konum=({noise['position'][0]:.2f}, {noise['position'][1]:.2f}, {noise['position'][2]:.2f}), dB={noise['db']:.2f}")
-            self.noise_info_layout.addWidget(noise_info)
-
-        # Tahmin edilen gürültü kaynaklarını çiz ve bilgilerini ekle
+            info.append(f"Gürültü {idx} Bilinen: Konum=({noise['position'][0]:.2f}, {noise['position'][1]:.2f}, {noise['position'][2]:.2f}), dB={noise['db']:.2f}")
         for idx, est_noise in enumerate(self.estimated_noise_sources, start=1):
-            # Tahmin edilen gürültü kaynaklarını çiz
-            marker_size = 50 + (est_noise['db'] - 60) * 2
-            marker_size = max(marker_size, 10)  # Marker boyutu en az 10 olmalı
-            scatter = self.ax.scatter(
-                est_noise['position'][0], est_noise['position'][1], est_noise['position'][2],
-                color='purple',  # Mor renkte işaretçi
-                label=f"Gürültü Tahmin {idx}" if idx == 1 else "",
-                s=marker_size,
-                marker='^'  # Üçgen işaretçi
-            )
-            self.estimated_noise_scatter.append(scatter)
-            # Desibel seviyesini marker'ın yanında göster
-            text = self.ax.text(
-                est_noise['position'][0], est_noise['position'][1], est_noise['position'][2],
-                f' {est_noise["db"]:.1f} dB', fontsize=8,
-                ha='left', va='bottom'
-            )
-            self.estimated_noise_texts.append(text)
-            # Tahmin edilen gürültü bilgilerini kontrol paneline ekle
-            est_noise_info = QLabel(f"Gürültü {idx} Tahmin: Konum=({est_noise['position'][0]:.2f}, {est_noise['position'][1]:.2f}, {est_noise['position'][2]:.2f}), dB={est_noise['db']:.2f}")
-            self.noise_info_layout.addWidget(est_noise_info)
+            info.append(f"Gürültü {idx} Tahmin: Konum=({est_noise['position'][0]:.2f}, {est_noise['position'][1]:.2f}, {est_noise['position'][2]:.2f}), dB={est_noise['db']:.2f}")
+        self.update_info_panel(info)
 
         # Güncellenmiş çizimleri ekrana yansıt
         self.canvas.draw_idle()
@@ -0,0 +1,315 @@
+"""
+Kalıcı MFCC özellik deposu ve kütüphane ölçeğinde ses benzerliği araması.
+
+Her kayıt, MFCC katsayılarının zaman boyunca ortalama ve standart sapmasından
+oluşan sabit uzunluklu bir gömme (embedding) vektörüyle temsil edilir; kayıt
+uzunlukları farklı olabilir. Gömmeler L2 normalize edildiğinden kosinüs
+benzerliği tek bir matris-vektör çarpımıdır ve en iyi k sonuç
+np.argpartition ile seçilir.
+
+Disk düzeni (dizin başına):
+    index.json              Sürüm, boyutlar, parça (shard) listesi ve kayıt adları
+    embeddings_00000.npy    (n, 2 * n_mfcc) float32 gömmeler
+    frames_00000.npy        (toplam çerçeve, n_mfcc) float32 MFCC çerçeveleri (isteğe bağlı)
+    offsets_00000.npy       (n + 1,) int64 çerçeve başlangıçları
+
+Her add çağrısı yeni parça(lar) yazar; mevcut dosyalar yerinde değiştirilmez.
+Arayüz kayıtları tek tek eklediğinden küçük parçalar ikili sayaç gibi birleştirilir:
+son parça bir öncekinden küçük değilse ikisi tek parçada yeniden yazılır (en fazla
+SHARD_SIZE kayıt). Böylece SHARD_SIZE kayıtlık blok başına ~log2(SHARD_SIZE) parça
+kalır ve her kayıt ortalama O(log N) kez yeniden yazılır. Eski biçimde çok sayıda
+küçük parça içeren depolar açılışta aynı kuralla sıkıştırılır.
+
+Parçalar np.load(mmap_mode='r') ile bellek eşlemeli açılır. Sorgu matrisi ilk
+aramada bir kez birleştirilir; sonraki eklemeler yalnızca yeni satırları kapasiteli
+bir tampona ekler.
+"""
+import json
+import os
+
+import numpy as np
+
+INDEX_FILE = 'index.json'
+STORE_VERSION = 1
+DEFAULT_N_MFCC = 13
+DEFAULT_HOP_LENGTH = 512
+# Tek bir parçadaki en fazla kayıt sayısı
+SHARD_SIZE = 65536
+
+
+def extract_mfcc(audio, sample_rate, n_mfcc=DEFAULT_N_MFCC, hop_length=DEFAULT_HOP_LENGTH):
+    """
+    Spektrogram_v0.0.1 ile aynı MFCC çıkarımı: mono, tepe normalizasyonu, HTK mel ölçeği.
+    Dönüş: (n_mfcc, çerçeve) float32
+    """
+    import librosa
+
+    mono = np.squeeze(np.asarray(audio, dtype=np.float32))
+    if np.any(mono):
+        mono = librosa.util.normalize(mono)
+    return librosa.feature.mfcc(y=mono, sr=sample_rate, n_mfcc=n_mfcc, hop_length=hop_length,
+                                htk=True).astype(np.float32)
+
+
+def pooled_embedding(mfcc):
+    """
+    (n_mfcc, çerçeve) MFCC'den sabit uzunluklu, L2 normalize gömme: [katsayı ortalamaları, katsayı std'leri].
+    mfcc: Tek kayıt (n_mfcc, T) veya toplu (B, n_mfcc, T)
+    """
+    mfcc = np.asarray(mfcc, dtype=np.float32)
+    embedding = np.concatenate([mfcc.mean(axis=-1), mfcc.std(axis=-1)], axis=-1)
+    norm = np.linalg.norm(embedding, axis=-1, keepdims=True)
+    return embedding / np.maximum(norm, 1e-12)
+
+
+class MFCCStore:
+    """
+    Dizin tabanlı MFCC gömme deposu.
+    directory: Depo dizini (yoksa oluşturulur)
+    """
+
+    def __init__(self, directory, n_mfcc=DEFAULT_N_MFCC):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, INDEX_FILE)
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.index = json.load(f)
+            if self.index['version'] != STORE_VERSION:
+                raise ValueError(f"Desteklenmeyen depo sürümü: {self.index['version']}")
+        else:
+            self.index = {'version': STORE_VERSION, 'n_mfcc': n_mfcc, 'dim': 2 * n_mfcc,
+                          'shards': [], 'names': [], 'next_shard': 0}
+            self._write_index()
+        # Eski indekslerde parça dosyaları 0..len-1 numaralıdır
+        self.index.setdefault('next_shard', len(self.index['shards']))
+        self.shards = [self._open_shard(shard) for shard in self.index['shards']]
+        self._matrix = None   # Birleşik gömme matrisi; ilk len(self) satırı geçerli, kalanı kapasite
+        obsolete = self._compact()
+        if obsolete:
+            self._write_index()
+            self._remove(obsolete)
+
+    @property
+    def n_mfcc(self):
+        return self.index['n_mfcc']
+
+    @property
+    def dim(self):
+        return self.index['dim']
+
+    @property
+    def names(self):
+        return self.index['names']
+
+    def __len__(self):
+        return len(self.index['names'])
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _write_index(self):
+        # Önce geçici dosyaya yaz, sonra değiştir: yarım kalan yazma indeksi bozmaz
+        path = self._path(INDEX_FILE)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, ensure_ascii=False)
+        os.replace(path + '.tmp', path)
+
+    def _open_shard(self, shard):
+        opened = {'start': shard['start'], 'count': shard['count'],
+                  'embeddings': np.load(self._path(shard['embeddings']), mmap_mode='r'),
+                  'frames': None, 'offsets': None}
+        if shard.get('frames'):
+            opened['frames'] = np.load(self._path(shard['frames']), mmap_mode='r')
+            opened['offsets'] = np.load(self._path(shard['offsets']))
+        return opened
+
+    def _write_shard(self, start, names_count, embeddings, frames=None, offsets=None):
+        """Yeni numaralı parça dosyalarını yazar; indeks girdisini döndürür."""
+        number = self.index['next_shard']
+        self.index['next_shard'] += 1
+        shard = {'start': start, 'count': names_count, 'embeddings': f'embeddings_{number:05d}.npy'}
+        np.save(self._path(shard['embeddings']), np.ascontiguousarray(embeddings, dtype=np.float32))
+        if frames is not None:
+            shard['frames'] = f'frames_{number:05d}.npy'
+            shard['offsets'] = f'offsets_{number:05d}.npy'
+            np.save(self._path(shard['frames']), np.ascontiguousarray(frames, dtype=np.float32))
+            np.save(self._path(shard['offsets']), np.asarray(offsets, dtype=np.int64))
+        return shard
+
+    def _append_shard(self, names, embeddings, mfccs=None):
+        frames = offsets = None
+        if mfccs is not None:
+            lengths = [mfcc.shape[1] for mfcc in mfccs]
+            offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+            frames = np.concatenate([np.asarray(mfcc, dtype=np.float32).T for mfcc in mfccs], axis=0)
+        shard = self._write_shard(len(self), len(names), embeddings, frames, offsets)
+        self.index['shards'].append(shard)
+        self.index['names'].extend(names)
+        self.shards.append(self._open_shard(shard))
+
+    def _compact(self):
+        """
+        Parça listesini ikili sayaç kuralıyla sıkıştırır: bir grup, kendinden önceki grup kadar
+        veya ondan büyükse (toplam SHARD_SIZE'ı aşmadan, çerçeve saklama durumları aynıysa)
+        birleştirilir. Her grup tek dosyada bir kez yazılır; sıkıştırılmış bir listede etkisizdir.
+        Dönüş: Artık kullanılmayan dosya adları (indeks yazıldıktan sonra silinmeli)
+        """
+        groups = []
+        for position, shard in enumerate(self.index['shards']):
+            groups.append([position])
+            while len(groups) >= 2:
+                last, previous = groups[-1], groups[-2]
+                last_count = sum(self.index['shards'][i]['count'] for i in last)
+                previous_count = sum(self.index['shards'][i]['count'] for i in previous)
+                same_kind = (bool(self.index['shards'][last[0]].get('frames'))
+                             == bool(self.index['shards'][previous[0]].get('frames')))
+                if last_count < previous_count or last_count + previous_count > SHARD_SIZE or not same_kind:
+                    break
+                groups[-2:] = [previous + last]
+        if all(len(group) == 1 for group in groups):
+            return []
+
+        entries, opened, obsolete = [], [], []
+        for group in groups:
+            if len(group) == 1:
+                entries.append(self.index['shards'][group[0]])
+                opened.append(self.shards[group[0]])
+                continue
+            parts = [self.shards[i] for i in group]
+            frames = offsets = None
+            if parts[0]['frames'] is not None:
+                frames = np.concatenate([part['frames'] for part in parts], axis=0)
+                bases = np.cumsum([0] + [part['offsets'][-1] for part in parts[:-1]])
+                offsets = np.concatenate([parts[0]['offsets'][:1]] +
+                                         [part['offsets'][1:] + base for part, base in zip(parts, bases)])
+            shard = self._write_shard(parts[0]['start'], sum(part['count'] for part in parts),
+                                      np.concatenate([part['embeddings'] for part in parts], axis=0),
+                                      frames, offsets)
+            for i in group:
+                old = self.index['shards'][i]
+                obsolete.extend(old[key] for key in ('embeddings', 'frames', 'offsets') if old.get(key))
+            entries.append(shard)
+            opened.append(self._open_shard(shard))
+        self.index['shards'] = entries
+        self.shards = opened   # Eski bellek eşlemeleri bırakılır
+        return obsolete
+
+    def _remove(self, filenames):
+        for filename in filenames:
+            try:
+                os.remove(self._path(filename))
+            except OSError:
+                pass  # Hâlâ eşlenmiş bir dosya (ör. Windows); indekste olmadığından yok sayılır
+
+    def add(self, names, mfccs):
+        """
+        MFCC matrislerini (gömmeleri ve çerçeveleriyle) depoya ekler.
+        names: Kayıt adları; mfccs: (n_mfcc, T_i) matrisleri (uzunluklar farklı olabilir)
+        Dönüş: Eklenen kayıtların indisleri
+        """
+        names, mfccs = list(names), list(mfccs)
+        if len(names) != len(mfccs):
+            raise ValueError("names ve mfccs aynı uzunlukta olmalı")
+        for mfcc in mfccs:
+            if mfcc.shape[0] != self.n_mfcc:
+                raise ValueError(f"MFCC katsayı sayısı {mfcc.shape[0]}, depo {self.n_mfcc} bekliyor")
+        embeddings = np.array([pooled_embedding(mfcc) for mfcc in mfccs], dtype=np.float32).reshape(-1, self.dim)
+        return self._add(names, embeddings, mfccs)
+
+    def add_embeddings(self, names, embeddings):
+        """Hazır gömmeleri (çerçevesiz) ekler; gömmeler L2 normalize edilir."""
+        names = list(names)
+        embeddings = np.asarray(embeddings, dtype=np.float32).reshape(len(names), self.dim)
+        embeddings = embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        return self._add(names, embeddings, None)
+
+    def _add(self, names, embeddings, mfccs):
+        start = len(self)
+        for offset in range(0, len(names), SHARD_SIZE):
+            stop = offset + SHARD_SIZE
+            self._append_shard(names[offset:stop], embeddings[offset:stop],
+                               None if mfccs is None else mfccs[offset:stop])
+        obsolete = self._compact()
+        self._write_index()
+        self._remove(obsolete)
+        if self._matrix is not None:
+            # Önbellek geçersizleştirilmez: yeni satırlar kapasiteli tampona eklenir (gerekirse iki katına çıkar)
+            if len(self) > len(self._matrix):
+                grown = np.empty((max(len(self), 2 * len(self._matrix)), self.dim), dtype=np.float32)
+                grown[:start] = self._matrix[:start]
+                self._matrix = grown
+            self._matrix[start:len(self)] = embeddings
+        return np.arange(start, len(self))
+
+    @property
+    def embeddings(self):
+        """(N, dim) gömme matrisi; parçalar ilk erişimde bir kez birleştirilir, eklemeler önbelleğe işlenir."""
+        if self._matrix is None:
+            if self.shards:
+                self._matrix = np.concatenate([shard['embeddings'] for shard in self.shards], axis=0)
+            else:
+                self._matrix = np.empty((0, self.dim), dtype=np.float32)
+        return self._matrix[:len(self)]
+
+    def frames(self, index):
+        """Bir kaydın (n_mfcc, T) MFCC çerçeveleri (bellek eşlemeli görünüm)."""
+        for shard in self.shards:
+            if shard['start'] <= index < shard['start'] + shard['count']:
+                if shard['frames'] is None:
+                    raise KeyError(f"{self.names[index]} için MFCC çerçeveleri saklanmamış")
+                row = index - shard['start']
+                return shard['frames'][shard['offsets'][row]:shard['offsets'][row + 1]].T
+        raise IndexError(index)
+
+    def query(self, embedding, k=10):
+        """
+        Kosinüs benzerliği en yüksek k kayıt.
+        embedding: pooled_embedding çıktısı (dim,)
+        Dönüş: [(indis, ad, benzerlik), ...] azalan benzerlik sırasıyla
+        """
+        matrix = self.embeddings
+        if len(matrix) == 0:
+            return []
+        scores = matrix @ np.asarray(embedding, dtype=np.float32)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(i), self.names[i], float(scores[i])) for i in top]
+
+    def query_mfcc(self, mfcc, k=10):
+        """MFCC matrisiyle sorgu."""
+        return self.query(pooled_embedding(mfcc), k)
+
+
+if __name__ == '__main__':
+    import tempfile
+
+    # Farklı uzunluklu kayıtlar: her kayıt, biraz gürültü eklenmiş kendi sürümünü en benzer bulmalı
+    rng = np.random.default_rng(0)
+    clips = [rng.normal(rng.normal(0, 5, (13, 1)), rng.uniform(0.5, 3, (13, 1)), (13, rng.integers(200, 700)))
+             for _ in range(50)]
+    with tempfile.TemporaryDirectory() as directory:
+        store = MFCCStore(directory)
+        store.add([f'kayıt {i}' for i in range(25)], clips[:25])
+        store.add([f'kayıt {i}' for i in range(25, 50)], clips[25:])
+        reopened = MFCCStore(directory)
+        assert len(reopened) == 50 and np.array_equal(reopened.frames(30), clips[30].astype(np.float32))
+        for i, clip in enumerate(clips):
+            noisy = clip[:, 10:] + rng.normal(0, 0.05, clip[:, 10:].shape)
+            assert reopened.query_mfcc(noisy, k=3)[0][0] == i
+
+    # Arayüzdeki gibi tek tek ekleme: parça sayısı logaritmik kalır, sorgu önbelleği eklemelerle güncel
+    with tempfile.TemporaryDirectory() as directory:
+        store = MFCCStore(directory)
+        store.embeddings  # Önbellek eklemelerden önce kurulur
+        for i, clip in enumerate(clips * 20):
+            store.add([f'kayıt {i}'], [clip])
+            assert store.query(store.embeddings[i], k=1)[0][2] > 0.999
+        assert len(store) == 1000 and len(store.shards) <= 10, len(store.shards)
+        assert len(os.listdir(directory)) == 3 * len(store.shards) + 1
+        reopened = MFCCStore(directory)
+        assert np.array_equal(reopened.embeddings, store.embeddings)
+        for i in (0, 499, 999):
+            assert np.array_equal(reopened.frames(i), clips[i % 50].astype(np.float32))
+    print("MFCC deposu kontrolü: OK")
@@ -0,0 +1,227 @@
+"""
+Ses yayılım kaybı: küresel yayılma + ISO 9613-1 atmosferik soğurma.
+
+db-hz.py ... db-hz4.py tek bir eğri çizer (ters kare yasası, frekansla doğrusal
+örnek bir hava soğurması ve tek bir malzeme). Bu modül aynı kaybı herhangi bir
+(mesafe × frekans bandı × sıcaklık × nem) ızgarası için tek bir broadcast NumPy
+işlemiyle hesaplar:
+
+    kayıp(r, f, T, h) = 20 * log10(r) + alpha(f, T, h, p) * r        (dB, 1 m referanslı)
+
+alpha, ISO 9613-1:1993 saf ton soğurma katsayısıdır (dB/m); oksijen ve azot
+moleküler gevşeme frekansları sıcaklık, bağıl nem ve basınçtan hesaplanır.
+Soğurma mesafeden bağımsız olduğundan ızgarada yalnızca (F, T, H) boyutunda bir
+kez hesaplanır; mesafe boyutu tek bir çarpma-toplamayla eklenir.
+
+AtmosphericPropagation (tek bant) ve BroadbandPropagation (oktav bantlarının güç
+toplamı) forward_model'in beklediği arayüzü sağlar: loss(r), slope(r) = d kayıp / dr
+ve ikisini birlikte döndüren loss_and_slope(r) (Jacobian için).
+"""
+import numpy as np
+
+# Sıfıra bölme / log10(0) hatasını önlemek için minimum mesafe (forward_model ile aynı)
+MIN_DISTANCE = 1e-6
+
+# ISO 9613-1 referans koşulları
+REFERENCE_PRESSURE = 101.325      # kPa
+REFERENCE_TEMPERATURE = 293.15    # K (20 °C)
+TRIPLE_POINT_TEMPERATURE = 273.16 # K (suyun üçlü noktası)
+KELVIN = 273.15
+
+# Varsayılan hava koşulları (db-hz4 ile aynı)
+DEFAULT_TEMPERATURE = 20.0   # °C
+DEFAULT_HUMIDITY = 50.0      # Bağıl nem (%)
+DEFAULT_FREQUENCY = 1000.0   # Hz
+
+# Oktav bandı orta frekansları (ISO 266 tam değerleri: 1000 * 2^k), 62.5 Hz - 8 kHz
+OCTAVE_BANDS = 1000.0 * 2.0 ** np.arange(-4, 4)
+
+
+def sound_speed(temperature):
+    """Sesin sıcaklığa bağlı hızı (m/s); temperature °C (db-hz4 ile aynı)."""
+    return 331.3 + 0.606 * np.asarray(temperature, dtype=float)
+
+
+def atmospheric_absorption(frequency, temperature=DEFAULT_TEMPERATURE, humidity=DEFAULT_HUMIDITY,
+                           pressure=REFERENCE_PRESSURE):
+    """
+    ISO 9613-1 atmosferik soğurma katsayısı (dB/m).
+    frequency: Hz; temperature: °C; humidity: bağıl nem (%); pressure: kPa
+    Tüm girişler NumPy kurallarıyla broadcast edilir.
+    """
+    f = np.asarray(frequency, dtype=float)
+    T = np.asarray(temperature, dtype=float) + KELVIN
+    relative_pressure = np.asarray(pressure, dtype=float) / REFERENCE_PRESSURE
+    relative_temperature = T / REFERENCE_TEMPERATURE
+
+    # Su buharının molar konsantrasyonu (%): doymuş buhar basıncı üçlü nokta bağıntısından
+    saturation = 10.0 ** (-6.8346 * (TRIPLE_POINT_TEMPERATURE / T) ** 1.261 + 4.6151)
+    h = np.asarray(humidity, dtype=float) * saturation / relative_pressure
+
+    # Oksijen ve azotun gevşeme frekansları (Hz)
+    relaxation_o = relative_pressure * (24.0 + 4.04e4 * h * (0.02 + h) / (0.391 + h))
+    relaxation_n = relative_pressure * relative_temperature ** -0.5 * (
+        9.0 + 280.0 * h * np.exp(-4.170 * (relative_temperature ** (-1.0 / 3.0) - 1.0)))
+
+    f2 = f * f
+    return 8.686 * f2 * (
+        1.84e-11 / relative_pressure * np.sqrt(relative_temperature)
+        + relative_temperature ** -2.5 * (
+            0.01275 * np.exp(-2239.1 / T) / (relaxation_o + f2 / relaxation_o)
+            + 0.1068 * np.exp(-3352.0 / T) / (relaxation_n + f2 / relaxation_n)))
+
+
+def spreading_loss(distance):
+    """Küresel yayılma kaybı 20 * log10(r) (dB, 1 m referanslı)."""
+    return 20.0 * np.log10(np.maximum(np.asarray(distance, dtype=float), MIN_DISTANCE))
+
+
+def attenuation(distance, frequency=DEFAULT_FREQUENCY, temperature=DEFAULT_TEMPERATURE,
+                humidity=DEFAULT_HUMIDITY, pressure=REFERENCE_PRESSURE):
+    """Toplam yayılım kaybı (dB): küresel yayılma + ISO 9613-1 soğurma; girişler broadcast edilir."""
+    distance = np.maximum(np.asarray(distance, dtype=float), MIN_DISTANCE)
+    return spreading_loss(distance) + atmospheric_absorption(frequency, temperature, humidity, pressure) * distance
+
+
+def attenuation_grid(distances, frequencies=OCTAVE_BANDS, temperatures=DEFAULT_TEMPERATURE,
+                     humidities=DEFAULT_HUMIDITY, pressure=REFERENCE_PRESSURE, out=None):
+    """
+    Tam (mesafe × frekans × sıcaklık × nem) kayıp ızgarası.
+    Her eksen 1B dizi (veya skaler) olarak verilir.
+    out: İsteğe bağlı (D, F, T, H) float64 çıktı dizisi (tekrarlı çağrılarda bellek ayırmayı önler)
+    Dönüş: (D, F, T, H) kayıp (dB)
+    """
+    distances = np.maximum(np.atleast_1d(np.asarray(distances, dtype=float)), MIN_DISTANCE)
+    frequencies = np.atleast_1d(np.asarray(frequencies, dtype=float))
+    temperatures = np.atleast_1d(np.asarray(temperatures, dtype=float))
+    humidities = np.atleast_1d(np.asarray(humidities, dtype=float))
+    # Soğurma mesafeden bağımsızdır: (F, T, H) boyutunda bir kez hesaplanır
+    alpha = atmospheric_absorption(frequencies[:, None, None], temperatures[None, :, None],
+                                   humidities[None, None, :], pressure)
+    shape = (len(distances),) + alpha.shape
+    if out is None:
+        out = np.empty(shape)
+    np.multiply(distances[:, None, None, None], alpha[None], out=out)
+    out += spreading_loss(distances)[:, None, None, None]
+    return out
+
+
+class AtmosphericPropagation:
+    """
+    Tek bir frekans ve hava koşulu için yayılım modeli; forward_model'e propagation olarak verilir.
+    frequency: Kaynağın (bant) frekansı (Hz); temperature: °C; humidity: %; pressure: kPa
+    """
+
+    def __init__(self, frequency=DEFAULT_FREQUENCY, temperature=DEFAULT_TEMPERATURE,
+                 humidity=DEFAULT_HUMIDITY, pressure=REFERENCE_PRESSURE):
+        self.frequency = float(frequency)
+        self.temperature = float(temperature)
+        self.humidity = float(humidity)
+        self.pressure = float(pressure)
+        self.alpha = float(atmospheric_absorption(frequency, temperature, humidity, pressure))
+
+    @property
+    def speed(self):
+        """Bu sıcaklıkta ses hızı (m/s)."""
+        return float(sound_speed(self.temperature))
+
+    def loss(self, distances):
+        """Mesafelerdeki yayılım kaybı (dB); distances en az MIN_DISTANCE olmalı."""
+        return 20.0 * np.log10(distances) + self.alpha * distances
+
+    def slope(self, distances):
+        """Kaybın mesafeye göre türevi (dB/m)."""
+        return 20.0 / (np.log(10.0) * distances) + self.alpha
+
+    def loss_and_slope(self, distances):
+        """Kayıp ve türev birlikte (forward_model Jacobian'ı için)."""
+        return self.loss(distances), self.slope(distances)
+
+    def __repr__(self):
+        return (f"AtmosphericPropagation({self.frequency:g} Hz, {self.temperature:g} °C, "
+                f"%{self.humidity:g} nem, alpha={self.alpha * 1000:.2f} dB/km)")
+
+
+class BroadbandPropagation:
+    """
+    Geniş bantlı kaynak için yayılım modeli: bant güçleri ayrı ayrı soğurulur ve toplanır.
+        kayıp(r) = 20 * log10(r) - 10 * log10(sum_b w_b * 10 ** (-alpha_b * r / 10))
+    spectrum_db: Bant başına göreli kaynak seviyesi (dB); None ise düz spektrum
+    Ağırlıklar toplamı 1'dir; D, 1 m'deki (soğurmasız) toplam seviyedir.
+    Her değerlendirme bant sayısı kadar üstel fonksiyon gerektirir (bkz. attenuation_table).
+    """
+
+    def __init__(self, spectrum_db=None, frequencies=OCTAVE_BANDS, temperature=DEFAULT_TEMPERATURE,
+                 humidity=DEFAULT_HUMIDITY, pressure=REFERENCE_PRESSURE):
+        self.frequencies = np.asarray(frequencies, dtype=float)
+        spectrum_db = np.zeros(len(self.frequencies)) if spectrum_db is None else np.asarray(spectrum_db, dtype=float)
+        power = 10.0 ** (spectrum_db / 10.0)
+        self.weights = power / power.sum()
+        self.temperature = float(temperature)
+        self.humidity = float(humidity)
+        self.alpha = atmospheric_absorption(self.frequencies, temperature, humidity, pressure)
+        # 10 ** (-alpha * r / 10) = exp(r * decay)
+        self.decay = -self.alpha * np.log(10.0) / 10.0
+
+    def band_loss(self, distances):
+        """Bant başına kayıp (dB); dönüş (..., F)."""
+        distances = np.asarray(distances, dtype=float)[..., None]
+        return 20.0 * np.log10(distances) + self.alpha * distances
+
+    def loss(self, distances):
+        """Toplam (güç toplamı) yayılım kaybı (dB)."""
+        transmitted = np.exp(np.asarray(distances, dtype=float)[..., None] * self.decay) @ self.weights
+        return 20.0 * np.log10(distances) - 10.0 * np.log10(transmitted)
+
+    def slope(self, distances):
+        """Kaybın mesafeye göre türevi (dB/m): küresel terim + bant güçleriyle ağırlıklı ortalama soğurma."""
+        return self.loss_and_slope(distances)[1]
+
+    def loss_and_slope(self, distances):
+        """Kayıp ve türev, bant üstelleri bir kez hesaplanarak."""
+        distances = np.asarray(distances, dtype=float)
+        transmitted = np.exp(distances[..., None] * self.decay) * self.weights
+        total = transmitted.sum(axis=-1)
+        loss = 20.0 * np.log10(distances) - 10.0 * np.log10(total)
+        return loss, 20.0 / (np.log(10.0) * distances) + (transmitted @ self.alpha) / total
+
+    def __repr__(self):
+        return (f"BroadbandPropagation({len(self.frequencies)} bant, {self.temperature:g} °C, "
+                f"%{self.humidity:g} nem)")
+
+
+if __name__ == '__main__':
+    # ISO 9613-2 Tablo 2 (dB/km, oktav bandı orta frekansları 63 Hz - 8 kHz)
+    table = {
+        (10, 70): [0.1, 0.4, 1.0, 1.9, 3.7, 9.7, 32.8, 117],
+        (20, 70): [0.1, 0.3, 1.1, 2.8, 5.0, 9.0, 22.9, 76.6],
+        (15, 20): [0.3, 0.6, 1.2, 2.7, 8.2, 28.2, 88.8, 202],
+        (15, 50): [0.1, 0.5, 1.2, 2.2, 4.2, 10.8, 36.2, 129],
+        (15, 80): [0.1, 0.3, 1.1, 2.4, 4.1, 8.3, 23.7, 82.8],
+    }
+    nominal = np.array([63, 125, 250, 500, 1000, 2000, 4000, 8000], dtype=float)
+    for (temperature, humidity), expected in table.items():
+        alpha = atmospheric_absorption(nominal, temperature, humidity) * 1000
+        assert np.allclose(alpha, expected, rtol=0.03, atol=0.06), (temperature, humidity, alpha.round(2))
+
+    # Izgara, noktasal hesapla aynı olmalı
+    distances = np.linspace(1, 500, 7)
+    temperatures = np.array([-10.0, 0.0, 20.0, 35.0])
+    humidities = np.array([10.0, 50.0, 90.0])
+    grid = attenuation_grid(distances, OCTAVE_BANDS, temperatures, humidities)
+    assert np.allclose(grid[3, 5, 2, 1], attenuation(distances[3], OCTAVE_BANDS[5], temperatures[2], humidities[1]))
+
+    # slope, loss'un sayısal türevine eşit olmalı
+    model = AtmosphericPropagation(4000, 15, 50)
+    r = np.array([0.5, 3.0, 40.0])
+    assert np.allclose(model.slope(r), (model.loss(r + 1e-6) - model.loss(r - 1e-6)) / 2e-6, rtol=1e-5)
+    print(f"ISO 9613-1 kontrolü: OK ({model})")
+
+    # Geniş bant: tek bantlı spektrum AtmosphericPropagation'a indirgenmeli
+    spectrum = np.full(len(OCTAVE_BANDS), -300.0)
+    spectrum[6] = 0.0
+    single = BroadbandPropagation(spectrum, temperature=15, humidity=50)
+    assert np.allclose(single.loss(r), model.loss(r)) and np.allclose(single.slope(r), model.slope(r))
+    broadband = BroadbandPropagation(temperature=15, humidity=50)
+    assert np.allclose(broadband.slope(r), (broadband.loss(r + 1e-6) - broadband.loss(r - 1e-6)) / 2e-6, rtol=1e-5)
+    print(f"Geniş bant kontrolü: OK ({broadband})")
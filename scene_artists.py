@@ -0,0 +1,166 @@
+"""
+3D sahne grafiği için kalıcı Matplotlib sanatçıları (artist).
+
+Arayüzler her değişiklikte ax.clear() ile tüm grafiği yeniden kurmak yerine
+öğeleri bir kez oluşturur ve verileri yerinde günceller:
+
+- Mikrofon, kaynak ve gürültü scatter'ları: _offsets3d / set_sizes
+- Etiketler: yeniden kullanılan Text3D havuzu (set_position_3d / set_text)
+- Kaynak -> mikrofon ışınları: tek bir Line3DCollection (set_segments)
+- Binalar: bar3d Poly3DCollection'ları bina listesi değişmedikçe önbellekte kalır
+"""
+import numpy as np
+from matplotlib.colors import to_rgba_array
+from mpl_toolkits.mplot3d.art3d import Line3DCollection
+
+# main.py görünümü; diğer arayüzler kendi stillerini verebilir (etiket stili None: etiket çizilmez)
+DEFAULT_STYLE = {
+    'mics': dict(color='blue', s=100, label="Mikrofonlar"),
+    'mic_labels': dict(fontsize=8, ha='right', va='bottom'),
+    'noise': dict(color='orange', marker='x', label="Gürültü Kaynağı 1"),
+    'noise_labels': dict(fontsize=8, ha='left', va='bottom'),
+    'estimated_noise': dict(color='purple', marker='^', label="Gürültü Tahmin 1"),
+    'estimated_noise_labels': dict(fontsize=8, ha='left', va='bottom'),
+    'source': dict(color='red', s=300, marker='o', edgecolors='black', linewidths=1, label="Gerçek Ses Kaynağı"),
+    'source_label': dict(color='red', fontsize=10, fontweight='bold', ha='center', va='top'),
+    'estimate': dict(color='green', s=200, marker='o', edgecolors='black', linewidths=1,
+                     label="Tahmin Edilen Ses Kaynağı"),
+    'estimate_label': dict(color='green', fontsize=9, fontweight='bold', ha='left', va='bottom'),
+    'building': dict(color='brown', alpha=0.8, shade=True, edgecolor='black'),
+    'rays': dict(linewidths=0.7),
+}
+
+
+def _columns(points):
+    """(N, 3) noktaları _offsets3d için (xs, ys, zs) dizilerine ayırır."""
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    return points[:, 0], points[:, 1], points[:, 2]
+
+
+def ray_segments(origin, targets):
+    """Bir noktadan hedeflere giden (N, 2, 3) doğru parçaları."""
+    targets = np.asarray(targets, dtype=float).reshape(-1, 3)
+    return np.stack([np.broadcast_to(np.asarray(origin, dtype=float), targets.shape), targets], axis=1)
+
+
+class RayCollection(Line3DCollection):
+    """
+    Işın koleksiyonu; derinlik sıralamasında her zaman en arkada çizilir.
+    Eski ax.plot çizgileri (Line3D) gibi kaynak, mikrofon ve bina öğelerinin altında kalır.
+    """
+
+    def do_3d_projection(self):
+        super().do_3d_projection()
+        return np.inf
+
+
+class LabelPool:
+    """Yeniden kullanılan 3D metin etiketleri; fazla etiketler gizlenir."""
+
+    def __init__(self, ax, text_kwargs):
+        """text_kwargs: ax.text parametreleri; None ise etiket çizilmez."""
+        self.ax = ax
+        self.text_kwargs = text_kwargs
+        self.texts = []
+
+    def update(self, positions, labels):
+        if self.text_kwargs is None:
+            return
+        positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+        while len(self.texts) < len(positions):
+            self.texts.append(self.ax.text(0, 0, 0, '', **self.text_kwargs))
+        for text, position, label in zip(self.texts, positions, labels):
+            text.set_position_3d(position)
+            text.set_text(label)
+            text.set_visible(True)
+        for text in self.texts[len(positions):]:
+            text.set_visible(False)
+
+
+class SceneArtists:
+    """Bir 3D eksen üzerindeki sahne öğelerini bir kez oluşturur ve yerinde günceller."""
+
+    def __init__(self, ax, style=None):
+        self.ax = ax
+        self.style = {**DEFAULT_STYLE, **(style or {})}
+        empty = ([], [], [])
+        self.mic_scatter = ax.scatter(*empty, **self.style['mics'])
+        self.noise_scatter = ax.scatter(*empty, **self.style['noise'])
+        self.estimated_noise_scatter = ax.scatter(*empty, **self.style['estimated_noise'])
+        self.source_scatter = ax.scatter(*empty, **self.style['source'])
+        self.estimated_scatter = ax.scatter(*empty, **self.style['estimate'])
+        self.rays = RayCollection([], **self.style['rays'])
+        ax.add_collection(self.rays, autolim=False)
+
+        self.mic_labels = LabelPool(ax, self.style['mic_labels'])
+        self.noise_labels = LabelPool(ax, self.style['noise_labels'])
+        self.estimated_noise_labels = LabelPool(ax, self.style['estimated_noise_labels'])
+        self.source_label = LabelPool(ax, self.style['source_label'])
+        self.estimate_label = LabelPool(ax, self.style['estimate_label'])
+
+        self.building_collections = []
+        self._building_key = None
+
+    def set_mics(self, positions):
+        """Mikrofon konumlarını ve M1..Mn etiketlerini günceller."""
+        positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+        self.mic_scatter._offsets3d = _columns(positions)
+        self.mic_labels.update(positions, [f'M{i + 1}' for i in range(len(positions))])
+
+    def _set_sources(self, scatter, labels, sources, sizes):
+        positions = np.array([source['position'] for source in sources], dtype=float).reshape(-1, 3)
+        scatter._offsets3d = _columns(positions)
+        if sizes is not None:
+            scatter.set_sizes(np.asarray(sizes, dtype=float))
+        labels.update(positions, [f" {source['db']:.1f} dB" for source in sources])
+
+    def set_noise_sources(self, noise_sources, sizes=None):
+        """Bilinen gürültü kaynaklarını günceller; sizes: isteğe bağlı kaynak başına marker boyutu."""
+        self._set_sources(self.noise_scatter, self.noise_labels, noise_sources, sizes)
+
+    def set_estimated_noise_sources(self, noise_sources, sizes=None):
+        """Tahmin edilen gürültü kaynaklarını günceller."""
+        self._set_sources(self.estimated_noise_scatter, self.estimated_noise_labels, noise_sources, sizes)
+
+    def _set_point(self, scatter, label_pool, point, label, label_offset):
+        if point is None:
+            scatter._offsets3d = ([], [], [])
+            label_pool.update(np.empty((0, 3)), [])
+            return
+        point = np.asarray(point, dtype=float)
+        scatter._offsets3d = _columns(point)
+        label_pool.update(point + [0.0, 0.0, label_offset], [label] if label is not None else [''])
+
+    def set_source(self, point, label=None, label_offset=-0.9):
+        """Gerçek ses kaynağını günceller (None: gizle)."""
+        self._set_point(self.source_scatter, self.source_label, point, label, label_offset)
+
+    def set_estimate(self, point, label=None, label_offset=0.9):
+        """Tahmin edilen ses kaynağını günceller (None: gizle)."""
+        self._set_point(self.estimated_scatter, self.estimate_label, point, label, label_offset)
+
+    def set_rays(self, segments, colors='gray', linestyles='-', alpha=None):
+        """
+        Tüm kaynak -> mikrofon ışınlarını tek koleksiyonda günceller.
+        segments: (N, 2, 3) doğru parçaları
+        colors / linestyles: Tek değer veya parça başına liste
+        """
+        segments = np.asarray(segments, dtype=float).reshape(-1, 2, 3)
+        self.rays.set_segments(segments)
+        if len(segments):
+            self.rays.set_color(to_rgba_array(colors, alpha))
+            self.rays.set_linestyle(linestyles)
+
+    def set_buildings(self, buildings):
+        """Binaları çizer; bina listesi değişmediyse önbellekteki koleksiyonlar korunur."""
+        key = tuple((tuple(building['position']), tuple(building['size'])) for building in buildings)
+        if key == self._building_key:
+            return
+        for collection in self.building_collections:
+            collection.remove()
+        self.building_collections = []
+        for building in buildings:
+            x, y, z = building['position']
+            dx, dy, dz = building['size']
+            self.building_collections.append(self.ax.bar3d(x, y, z, dx, dy, dz, **self.style['building']))
+        self._building_key = key
@@ -0,0 +1,179 @@
+"""
+Akan ses için spektral analiz yardımcıları.
+
+amplitude_spectrum / dominant_frequency gerçek girişli FFT (rfft) ve önbellekteki
+pencere fonksiyonuyla çalışır; dominant frekans, tepe bin'i ve komşularına
+uydurulan parabolle bin çözünürlüğünün altında kestirilir. Böylece 100 ms gibi
+kısa pencerelerde (10 Hz bin aralığı) de frekans doğruluğu korunur.
+
+WaterfallSTFT, gelen örnekleri parça parça alıp yalnızca yeni tamamlanan
+STFT çerçevelerini hesaplar: pencere fonksiyonu bir kez üretilir, çerçeveler
+arası taşınan örnekler ve spektrogram sütunları önceden ayrılmış dizilerde
+tutulur. Bellek kullanımı akış süresinden bağımsızdır.
+"""
+from functools import lru_cache
+
+import numpy as np
+from scipy.signal import get_window
+
+# Spektrogram dB aralığı alt sınırı (log10(0) yerine)
+POWER_FLOOR = 1e-12
+
+
+@lru_cache(maxsize=16)
+def cached_window(name, size):
+    """Pencere fonksiyonu; aynı (ad, uzunluk) için bir kez üretilir (salt okunur)."""
+    window = get_window(name, size)
+    window.setflags(write=False)
+    return window
+
+
+def amplitude_spectrum(signal, fs, window='hann'):
+    """
+    Tek taraflı genlik spektrumu (rfft).
+    Pencerenin tutarlı kazancıyla normalize edilir: A genlikli bir sinüs tepe bin'inde ~A verir.
+    Dönüş: (N // 2 + 1,) frekanslar, (N // 2 + 1,) genlikler
+    """
+    signal = np.asarray(signal, dtype=float)
+    taper = cached_window(window, len(signal))
+    magnitude = np.abs(np.fft.rfft(signal * taper)) * (2.0 / taper.sum())
+    return np.fft.rfftfreq(len(signal), 1 / fs), magnitude
+
+
+def interpolate_peak(magnitude, index):
+    """
+    Tepe bin'i ve iki komşusunun log genliklerine parabol uydurarak kesirli tepe konumunu döndürür.
+    Kenar bin'lerde veya düz tepede indisin kendisi döner.
+    """
+    if index <= 0 or index >= len(magnitude) - 1:
+        return float(index)
+    a, b, c = np.log(magnitude[index - 1:index + 2] + 1e-20)
+    denominator = a - 2 * b + c
+    if denominator >= 0:
+        return float(index)
+    return index + 0.5 * (a - c) / denominator
+
+
+def dominant_frequency(signal, fs, window='hann', interpolate=True):
+    """
+    Genliği en büyük frekans (Hz).
+    interpolate: True ise tepe, bin çözünürlüğünün (fs / N) altında parabolik olarak inceltilir
+    """
+    freqs, magnitude = amplitude_spectrum(signal, fs, window)
+    index = int(np.argmax(magnitude))
+    if not interpolate:
+        return freqs[index]
+    return interpolate_peak(magnitude, index) * fs / len(signal)
+
+
+class WaterfallSTFT:
+    """
+    Akan örneklerden kayan (waterfall) spektrogram.
+    fs: Örnekleme frekansı (Hz)
+    nperseg: STFT çerçeve uzunluğu; stride: çerçeveler arası kayma (varsayılan nperseg // 2)
+    columns: Saklanan sütun (çerçeve) sayısı; görüntülenen süre = columns * stride / fs
+    max_freq: Saklanan en yüksek frekans (Hz); None ise Nyquist
+    """
+
+    def __init__(self, fs, nperseg=1024, stride=None, columns=400, max_freq=None, window='hann'):
+        self.fs = fs
+        self.nperseg = nperseg
+        self.stride = nperseg // 2 if stride is None else stride
+        self.window = cached_window(window, nperseg).astype(np.float32)
+        # scipy.signal.spectrogram ile aynı 'density' ölçeklemesi (tek taraflı)
+        self.scale = 1.0 / (fs * float((self.window ** 2).sum()))
+        freqs = np.fft.rfftfreq(nperseg, 1 / fs)
+        self.bins = len(freqs) if max_freq is None else int(np.searchsorted(freqs, max_freq, side='right'))
+        self.freqs = freqs[:self.bins]
+        self.doubled_bins = min(self.bins, len(freqs) - 1 if nperseg % 2 == 0 else len(freqs))
+
+        self.columns = columns
+        self.power_db = np.full((self.bins, columns), 10 * np.log10(POWER_FLOOR), dtype=np.float32)
+        self.display = np.empty_like(self.power_db)  # Zaman sırasına dizilmiş görüntü (en yeni sütun sağda)
+        self.position = 0       # Sıradaki sütunun power_db içindeki indisi
+        self.frames = 0         # Akış başından beri hesaplanan çerçeve sayısı
+
+        # Bir sonraki çerçeve için bekleyen örnekler (önceki çerçeveyle örtüşen kısım dahil)
+        self.pending = np.zeros(nperseg, dtype=np.float32)
+        self.pending_count = 0
+        self.frame = np.empty(nperseg, dtype=np.float32)
+
+    def reset(self):
+        """Akışı ve spektrogramı sıfırlar (ör. kayıp pencereden sonra süreklilik bozulduğunda)."""
+        self.power_db.fill(10 * np.log10(POWER_FLOOR))
+        self.position = 0
+        self.frames = 0
+        self.pending_count = 0
+
+    def _column(self, frame):
+        np.multiply(frame, self.window, out=self.frame)
+        spectrum = np.fft.rfft(self.frame)[:self.bins]
+        power = (spectrum.real ** 2 + spectrum.imag ** 2) * self.scale
+        power[1:self.doubled_bins] *= 2  # Tek taraflı spektrum (DC ve Nyquist hariç)
+        return 10 * np.log10(power + POWER_FLOOR)
+
+    def push(self, samples):
+        """
+        Yeni örnekleri ekler ve tamamlanan çerçevelerin sütunlarını yazar.
+        Dönüş: Eklenen sütun sayısı
+        """
+        samples = np.asarray(samples, dtype=np.float32).ravel()
+        added = 0
+        offset = 0
+        while offset < len(samples):
+            # Bekleyen tamponu bir sonraki çerçeve tamamlanana kadar doldur
+            take = min(len(samples) - offset, self.nperseg - self.pending_count)
+            self.pending[self.pending_count:self.pending_count + take] = samples[offset:offset + take]
+            self.pending_count += take
+            offset += take
+            if self.pending_count < self.nperseg:
+                break
+            self.power_db[:, self.position] = self._column(self.pending[:self.nperseg])
+            self.position = (self.position + 1) % self.columns
+            self.frames += 1
+            added += 1
+            # Çerçeveler arası örtüşen kısım bir sonraki çerçevenin başına taşınır
+            keep = self.nperseg - self.stride
+            self.pending[:keep] = self.pending[self.stride:self.nperseg]
+            self.pending_count = keep
+        return added
+
+    def image(self):
+        """En eski sütun solda, en yeni sütun sağda olacak şekilde (bins, columns) görüntü dizisi."""
+        tail = self.columns - self.position
+        self.display[:, :tail] = self.power_db[:, self.position:]
+        self.display[:, tail:] = self.power_db[:, :self.position]
+        return self.display
+
+    @property
+    def duration(self):
+        """Görüntülenen zaman aralığı (s)."""
+        return self.columns * self.stride / self.fs
+
+
+if __name__ == '__main__':
+    from scipy.signal import spectrogram
+
+    # Parça parça beslenen akış, tüm sinyal üzerindeki scipy spektrogramıyla aynı sütunları vermeli
+    fs = 8000
+    rng = np.random.default_rng(0)
+    signal = (np.sin(2 * np.pi * 440 * np.arange(fs * 2) / fs) + 0.1 * rng.standard_normal(fs * 2)).astype(np.float32)
+    waterfall = WaterfallSTFT(fs, nperseg=256, columns=50)
+    for chunk in np.array_split(signal, 37):
+        waterfall.push(chunk)
+    f, t, Sxx = spectrogram(signal, fs=fs, nperseg=256, noverlap=128, detrend=False, window='hann')
+    expected = 10 * np.log10(Sxx[:, -50:] + POWER_FLOOR)
+    assert waterfall.frames == Sxx.shape[1]
+    assert np.allclose(waterfall.image(), expected, atol=1e-3)
+    print(f"Waterfall STFT kontrolü: OK ({waterfall.frames} çerçeve)")
+
+    # 100 ms pencerede (10 Hz bin) parabolik tepe kestirimi bin aralığının çok altında hata vermeli
+    fs = 44100
+    t = np.arange(int(0.1 * fs)) / fs
+    for frequency in (440.0, 1234.5, 3001.7):
+        tone = 0.3 * np.sin(2 * np.pi * frequency * t + 0.7)
+        _, magnitude = amplitude_spectrum(tone, fs)
+        assert abs(magnitude.max() - 0.3) < 0.3 * 0.2
+        assert abs(dominant_frequency(tone, fs) - frequency) < 0.5
+        assert abs(dominant_frequency(tone, fs, interpolate=False) - frequency) <= 5.0
+    print("Dominant frekans kontrolü: OK")
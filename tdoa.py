@@ -0,0 +1,110 @@
+"""
+Kapalı form TDOA (varış zamanı farkı) konum kestirimi.
+
+Referans mikrofon r'ye göre mesafe farkları Δ_i = c * (t_i - t_r) ile verilir.
+Mikrofonlar referans orijine taşındığında (m_i <- m_i - m_r, u = x - m_r)
+||u - m_i||^2 = (d_r + Δ_i)^2 eşitliği, bilinmeyenler [u, d_r] için doğrusaldır:
+
+    2 * m_i · u + 2 * Δ_i * d_r = ||m_i||^2 - Δ_i^2
+
+1. adım (küresel kesişim): bu sistem ağırlıklı en küçük kareler ile çözülür.
+2. adım (Chan): d_r^2 = ||u||^2 kısıtı, 1. adımın kovaryansıyla ağırlıklandırılmış
+   ikinci bir küçük doğrusal sistemle uygulanır.
+
+Sonuç tek başına hızlı bir tahmin olarak veya Nelder-Mead gibi yinelemeli bir
+iyileştirmenin başlangıç noktası olarak kullanılabilir. 2D ve 3D mikrofon
+dizileriyle çalışır.
+"""
+import numpy as np
+
+# Ses hızı (m/s)
+SOUND_SPEED = 343
+
+
+def _weighted_lstsq(G, h, W):
+    """W ağırlıklı en küçük kareler çözümü ve (G^T W G)^-1 kovaryansı."""
+    GtW = G.T * W if W.ndim == 1 else G.T @ W
+    normal = GtW @ G
+    solution = np.linalg.lstsq(normal, GtW @ h, rcond=None)[0]
+    return solution, np.linalg.pinv(normal)
+
+
+def spherical_intersection(mic_positions, time_stamps, weights=None, reference=0, sound_speed=SOUND_SPEED):
+    """
+    Küresel kesişim (1. adım) ile kaynak konumunu tahmin eder.
+    mic_positions: (M, d) mikrofon konumları (d = 2 veya 3)
+    time_stamps: (M,) varış zamanları (s)
+    weights: İsteğe bağlı (M,) mikrofon ağırlıkları (ör. v0.3.8 compute_weights)
+    reference: Referans mikrofon indisi
+    Dönüş: (d,) konum, referans mesafesi d_r, (d + 1, d + 1) kovaryans
+    """
+    mics = np.asarray(mic_positions, dtype=float)
+    times = np.asarray(time_stamps, dtype=float)
+    others = np.arange(len(mics)) != reference
+    shifted = mics[others] - mics[reference]
+    delta = (times[others] - times[reference]) * sound_speed
+
+    G = np.column_stack([2.0 * shifted, 2.0 * delta])
+    h = (shifted * shifted).sum(axis=1) - delta * delta
+    W = np.ones(len(h)) if weights is None else np.asarray(weights, dtype=float)[others] * weights[reference]
+    phi, covariance = _weighted_lstsq(G, h, W)
+    return phi[:-1] + mics[reference], phi[-1], covariance
+
+
+def chan(mic_positions, time_stamps, weights=None, reference=0, sound_speed=SOUND_SPEED):
+    """
+    Chan'ın iki adımlı ağırlıklı en küçük kareler yöntemiyle kaynak konumunu tahmin eder.
+    2. adım sayısal olarak geçersiz bir sonuç verirse 1. adımın tahmini döndürülür.
+    Dönüş: (d,) konum
+    """
+    mics = np.asarray(mic_positions, dtype=float)
+    position, d_ref, covariance = spherical_intersection(mics, time_stamps, weights, reference, sound_speed)
+    u = position - mics[reference]
+    phi = np.append(u, d_ref)
+
+    # ||u||^2 = d_r^2 kısıtı: z = u^2 için [I; 1...1] z = phi^2
+    dim = len(u)
+    G2 = np.vstack([np.eye(dim), np.ones(dim)])
+    B = np.diag(2.0 * phi)
+    W2 = np.linalg.pinv(B @ covariance @ B)
+    z, _ = _weighted_lstsq(G2, phi * phi, W2)
+    if not np.all(np.isfinite(z)):
+        return position
+    return np.sign(u) * np.sqrt(np.abs(z)) + mics[reference]
+
+
+def tdoa_loss(source_pos, mic_positions, time_stamps, weights, sound_speed=SOUND_SPEED):
+    """
+    Ağırlıklı çiftli TDOA kaybı (echoTrace_v0.3.7 / v0.3.8 ve benchmark'lar bunu kullanır).
+    Çift artığı r_ij = a_i - a_j, a = c * t - d olduğundan çift toplamı O(M) olarak hesaplanır:
+        Σ_{i<j} w_i w_j (a_i - a_j)^2 = W * Σ_i w_i (a_i - ā)^2,  W = Σ w,  ā = Σ w a / W
+    """
+    diff = mic_positions - np.asarray(source_pos)
+    distances = np.maximum(np.sqrt(np.einsum('ij,ij->i', diff, diff)), 1e-6)
+    a = np.asarray(time_stamps) * sound_speed - distances
+    total_weight = np.sum(weights)
+    centered = a - np.dot(weights, a) / total_weight
+    return total_weight * np.dot(weights, centered * centered)
+
+if __name__ == '__main__':
+    # v0.3.8 düzeni: 10 m yarıçaplı çember üzerinde 18 mikrofon, gürültüsüz zaman damgaları
+    angles = np.linspace(0, 2 * np.pi, 18, endpoint=False)
+    mics = np.column_stack([10 * np.cos(angles), 10 * np.sin(angles)])
+    for source in (np.array([3.0, -4.0]), np.array([18.0, 7.5])):
+        times = np.linalg.norm(mics - source, axis=1) / SOUND_SPEED
+        assert np.allclose(spherical_intersection(mics, times)[0], source, atol=1e-6)
+        assert np.allclose(chan(mics, times), source, atol=1e-6)
+    rng = np.random.default_rng(0)
+    mics3 = rng.uniform([-15, -15, -10], [25, 25, 10], size=(18, 3))
+    source = np.array([4.0, 6.0, -2.0])
+    assert np.allclose(chan(mics3, np.linalg.norm(mics3 - source, axis=1) / SOUND_SPEED), source, atol=1e-6)
+
+    # O(M) kayıp, çift toplamıyla aynı
+    times = np.linalg.norm(mics3 - source, axis=1) / SOUND_SPEED + rng.normal(0, 1e-4, len(mics3))
+    weights = rng.uniform(0.1, 2.0, len(mics3))
+    i, j = np.triu_indices(len(mics3), k=1)
+    for trial in rng.uniform([-15, -15, -10], [25, 25, 10], size=(20, 3)):
+        d = np.linalg.norm(mics3 - trial, axis=1)
+        pairwise = np.sum(weights[i] * weights[j] * ((times[i] - times[j]) * SOUND_SPEED - (d[i] - d[j])) ** 2)
+        assert np.isclose(tdoa_loss(trial, mics3, times, weights), pairwise, rtol=1e-9)
+    print("Kapalı form TDOA kontrolü: OK")
@@ -0,0 +1,196 @@
+"""
+Hareketli ses kaynakları için gerçek zamanlı takip.
+
+Her karede yeni bir ölçüm vektörü gelir. İlk kare (ve takip koptuğunda)
+ızgara tohumlamasıyla soğuk çözülür; sonraki kareler bir önceki tahminden
+sıcak başlatılır ve iterasyon sayısı sınırlanır. İsteğe bağlı sabit hızlı
+Kalman öngörücüsü, başlangıç konumunu kaynağın bir sonraki karedeki
+öngörülen konumuna taşır.
+
+Yalnızca NumPy kullanır; arayüz (main.py takip modu) ve benchmark_tracking.py
+aynı SourceTracker'ı kullanır.
+"""
+import time
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+
+# Sıcak başlatılan çözümlerde iterasyon sınırı
+TRACKING_MAX_ITERATIONS = 10
+# Sıcak çözümün kare hatası (dB^2) bunu aşarsa takip koptu sayılır ve soğuk çözüm yapılır
+REACQUIRE_COST = 1.0
+# Hız / gecikme istatistiklerinde kullanılan son kare sayısı
+STATS_WINDOW = 200
+
+
+class ConstantVelocityKalman:
+    """
+    3D sabit hız modeli: durum [x, y, z, vx, vy, vz].
+    process_noise: Beyaz ivme gürültüsünün standart sapması (m/s^2)
+    measurement_noise: Konum tahmininin standart sapması (m)
+    """
+
+    def __init__(self, process_noise=5.0, measurement_noise=0.05):
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.state = None
+        self.covariance = None
+
+    def reset(self):
+        self.state = None
+        self.covariance = None
+
+    def _transition(self, dt):
+        F = np.eye(6)
+        F[:3, 3:] = dt * np.eye(3)
+        # Ayrık beyaz ivme modeli: Q = q^2 * [[dt^4/4, dt^3/2], [dt^3/2, dt^2]] (eksen başına)
+        q = self.process_noise ** 2
+        Q = np.zeros((6, 6))
+        Q[:3, :3] = q * dt ** 4 / 4 * np.eye(3)
+        Q[:3, 3:] = Q[3:, :3] = q * dt ** 3 / 2 * np.eye(3)
+        Q[3:, 3:] = q * dt ** 2 * np.eye(3)
+        return F, Q
+
+    def predict(self, dt):
+        """Durumu dt saniye ileri taşır; öngörülen konumu döndürür (başlatılmamışsa None)."""
+        if self.state is None:
+            return None
+        F, Q = self._transition(dt)
+        self.state = F @ self.state
+        self.covariance = F @ self.covariance @ F.T + Q
+        return self.state[:3].copy()
+
+    def update(self, position):
+        """Konum ölçümüyle durumu düzeltir; ilk ölçüm durumu sıfır hızla başlatır."""
+        position = np.asarray(position, dtype=float)
+        if self.state is None:
+            self.state = np.concatenate([position, np.zeros(3)])
+            self.covariance = np.diag([self.measurement_noise ** 2] * 3 + [10.0 ** 2] * 3)
+            return
+        H = np.hstack([np.eye(3), np.zeros((3, 3))])
+        S = H @ self.covariance @ H.T + self.measurement_noise ** 2 * np.eye(3)
+        K = self.covariance @ H.T @ np.linalg.inv(S)
+        self.state = self.state + K @ (position - self.state[:3])
+        self.covariance = (np.eye(6) - K @ H) @ self.covariance
+
+    @property
+    def velocity(self):
+        return None if self.state is None else self.state[3:].copy()
+
+
+@dataclass
+class TrackingStats:
+    """Son karelerin hız ve gecikme özeti."""
+    frames: int
+    update_rate: float      # Sürdürülen güncelleme hızı: kare / duvar saati süresi (Hz)
+    solver_rate: float      # Yalnızca çözüm süresiyle sınırlı hız: 1 / ortalama gecikme (Hz)
+    latency_p50: float      # s
+    latency_p95: float      # s
+    reacquisitions: int     # Takibin koptuğu ve soğuk çözüm yapılan kare sayısı
+
+
+class SourceTracker:
+    """
+    Ölçüm akışından kaynak konumunu kare kare izler.
+    engine: localization_engine.LocalizationEngine
+    predictor: True (varsayılan Kalman), bir ConstantVelocityKalman nesnesi veya None
+    """
+
+    def __init__(self, engine, max_iterations=TRACKING_MAX_ITERATIONS, predictor=None,
+                 reacquire_cost=REACQUIRE_COST, acquire_seeding='grid'):
+        self.engine = engine
+        self.max_iterations = max_iterations
+        self.predictor = ConstantVelocityKalman() if predictor is True else predictor
+        self.reacquire_cost = reacquire_cost
+        self.acquire_seeding = acquire_seeding
+        self.previous = None
+        self.last_timestamp = None
+        self.latencies = deque(maxlen=STATS_WINDOW)
+        self.timestamps = deque(maxlen=STATS_WINDOW)
+        self.reacquisitions = 0
+
+    def reset(self):
+        """Takibi sıfırlar; bir sonraki kare soğuk çözülür."""
+        self.previous = None
+        self.last_timestamp = None
+        self.latencies.clear()
+        self.timestamps.clear()
+        self.reacquisitions = 0
+        if self.predictor is not None:
+            self.predictor.reset()
+
+    def warm_start(self, dt):
+        """Önceki çözümün parametreleri; konum, varsa Kalman öngörüsüyle değiştirilir."""
+        x0 = self.previous.params.copy()
+        if self.predictor is not None and dt is not None:
+            predicted = self.predictor.predict(dt)
+            if predicted is not None:
+                lower, upper = np.array(self.engine.position_bounds, dtype=float).T
+                x0[:3] = np.clip(predicted, lower, upper)
+        return x0
+
+    def step(self, measured_db, blocked=None, timestamp=None):
+        """
+        Bir ölçüm karesini işler.
+        timestamp: Karenin zamanı (s); verilmezse time.perf_counter() kullanılır
+        Dönüş: LocalizationResult (konum bulunamazsa önceki tahmin korunur)
+        """
+        start = time.perf_counter()
+        timestamp = start if timestamp is None else timestamp
+        dt = None if self.last_timestamp is None else timestamp - self.last_timestamp
+
+        result = None
+        if self.previous is not None:
+            result = self.engine.localize(measured_db, blocked, x0=self.warm_start(dt),
+                                          max_iterations=self.max_iterations)
+            if result.position is None or result.cost > self.reacquire_cost:
+                self.reacquisitions += 1
+                result = None
+        if result is None:
+            result = self.engine.localize(measured_db, blocked, seeding=self.acquire_seeding)
+            if self.predictor is not None:
+                self.predictor.reset()
+
+        if result.position is not None:
+            self.previous = result
+            if self.predictor is not None:
+                self.predictor.update(result.position)
+        self.last_timestamp = timestamp
+        self.latencies.append(time.perf_counter() - start)
+        self.timestamps.append(time.perf_counter())
+        return result
+
+    def stats(self):
+        """Son STATS_WINDOW karenin güncelleme hızı ve gecikme istatistikleri."""
+        latencies = np.array(self.latencies)
+        if len(latencies) == 0:
+            return TrackingStats(0, 0.0, 0.0, 0.0, 0.0, self.reacquisitions)
+        span = self.timestamps[-1] - self.timestamps[0]
+        update_rate = (len(self.timestamps) - 1) / span if span > 0 else 0.0
+        return TrackingStats(
+            frames=len(latencies), update_rate=update_rate, solver_rate=1.0 / latencies.mean(),
+            latency_p50=float(np.percentile(latencies, 50)), latency_p95=float(np.percentile(latencies, 95)),
+            reacquisitions=self.reacquisitions,
+        )
+
+
+def circle_trajectory(t, center=(5.0, 5.0, 3.0), radius=8.0, speed=2.0):
+    """Yatay çember üzerinde sabit hızlı (m/s) yörünge."""
+    omega = speed / radius
+    cx, cy, cz = center
+    return np.array([cx + radius * np.cos(omega * t), cy + radius * np.sin(omega * t), cz])
+
+
+def figure_eight_trajectory(t, center=(5.0, 5.0, 3.0), size=8.0, speed=2.0):
+    """Sekiz şeklinde (Lissajous) yörünge; yükseklik yavaşça salınır."""
+    omega = speed / size
+    cx, cy, cz = center
+    return np.array([cx + size * np.sin(omega * t), cy + size * np.sin(2 * omega * t) / 2,
+                     cz + 2.0 * np.sin(omega * t / 2)])
+
+
+TRAJECTORIES = {
+    'circle': circle_trajectory,
+    'figure8': figure_eight_trajectory,
+}
@@ -0,0 +1,93 @@
+"""
+Önceden hesaplanmış mikrofon görünürlük alanları.
+
+Bir çözüm boyunca mikrofonlar ve binalar hareket etmez; bu yüzden her
+mikrofonun simülasyon sınırları içindeki bir 3D voksel ızgarasından
+görünür olup olmadığı bir kez hesaplanır. Optimizasyon sırasında aday
+kaynak konumları için engelleme kontrolü, ızgaradan en yakın komşu veya
+üç doğrusal (trilinear) okuma ile O(1) dizi erişimine dönüşür.
+"""
+import hashlib
+
+import numpy as np
+
+# echoTrace_v0.4.6 simülasyon / optimizasyon sınırları (x, y, z). localization_engine.POSITION_BOUNDS
+# farklıdır (z ∈ [-10, 10]); başka bir sahne kutusunda alan o kutunun bounds'uyla kurulmalıdır.
+SIMULATION_BOUNDS = ((-15.0, 25.0), (-15.0, 25.0), (-5.0, 15.0))
+
+
+def geometry_key(mic_positions, box_min, box_max):
+    """Mikrofon ve bina geometrisinden görünürlük alanını tanımlayan bir anahtar üretir."""
+    digest = hashlib.sha1()
+    for array in (mic_positions, box_min, box_max):
+        digest.update(np.ascontiguousarray(array, dtype=float).tobytes())
+    return digest.hexdigest()
+
+
+class VisibilityField:
+    """
+    Mikrofon başına 3D görünürlük voksel alanı.
+
+    visible[m, i, j, k]: (i, j, k) ızgara düğümünden m. mikrofona giden yol engellenmemişse True.
+    """
+
+    def __init__(self, mic_positions, building_bvh, bounds=SIMULATION_BOUNDS, resolution=1.0):
+        """
+        mic_positions: (M, 3) mikrofon konumları
+        building_bvh: Binalar üzerindeki occlusion.BuildingBVH
+        bounds: ((x_min, x_max), (y_min, y_max), (z_min, z_max)) ızgara sınırları
+        resolution: Voksel kenar uzunluğu (m)
+        """
+        self.mic_positions = np.asarray(mic_positions, dtype=float).reshape(-1, 3)
+        self.key = geometry_key(self.mic_positions, building_bvh.box_min, building_bvh.box_max)
+        self.resolution = float(resolution)
+        self.origin = np.array([low for low, _ in bounds], dtype=float)
+        self.shape = tuple(int(np.floor((high - low) / self.resolution)) + 1 for low, high in bounds)
+
+        axes = [self.origin[i] + self.resolution * np.arange(n) for i, n in enumerate(self.shape)]
+        grid = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, 3)
+        blocked = building_bvh.blocked(grid, self.mic_positions)   # (düğüm, M)
+        self.visible = np.ascontiguousarray((~blocked).T.reshape((len(self.mic_positions),) + self.shape))
+
+    @property
+    def nbytes(self):
+        """Görünürlük alanının bellek kullanımı (bayt)."""
+        return self.visible.nbytes
+
+    def describe(self):
+        """Izgara boyutu ve bellek kullanımını özetleyen metin."""
+        nx, ny, nz = self.shape
+        return (f"{len(self.mic_positions)} mikrofon x {nx}x{ny}x{nz} voksel "
+                f"({self.resolution:g} m), {self.nbytes / 1e6:.2f} MB")
+
+    def matches(self, mic_positions, building_bvh):
+        """Alanın verilen mikrofon ve bina geometrisi için hâlâ geçerli olup olmadığını döndürür."""
+        return self.key == geometry_key(mic_positions, building_bvh.box_min, building_bvh.box_max)
+
+    def _grid_coordinates(self, points):
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        coords = (points - self.origin) / self.resolution
+        return np.clip(coords, 0, np.array(self.shape) - 1)
+
+    def lookup(self, points, mic_indices=None, method='nearest'):
+        """
+        Verilen noktalardan mikrofonların görünür olup olmadığını döndürür.
+        points: (P, 3) aday kaynak konumları (sınır dışındakiler ızgara kenarına kırpılır)
+        mic_indices: İsteğe bağlı mikrofon alt kümesi
+        method: 'nearest' (en yakın düğüm) veya 'linear' (trilinear, 0.5 eşik)
+        Dönüş: (P, M) bool görünürlük maskesi
+        """
+        field = self.visible if mic_indices is None else self.visible[mic_indices]
+        coords = self._grid_coordinates(points)
+        if method == 'nearest':
+            i, j, k = np.rint(coords).astype(int).T
+            return field[:, i, j, k].T
+
+        base = np.minimum(np.floor(coords).astype(int), np.array(self.shape) - 2).clip(min=0)
+        frac = coords - base
+        value = np.zeros((len(field), len(coords)))
+        for corner in np.ndindex(2, 2, 2):
+            weight = np.prod(np.where(corner, frac, 1.0 - frac), axis=1)
+            i, j, k = (base + corner).T
+            value += weight * field[:, i, j, k]
+        return (value >= 0.5).T